@@ -0,0 +1,420 @@
+"""On disk caches shared between tsblender runs."""
+
+import functools
+import hashlib
+import io
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import time
+from contextlib import suppress
+from importlib.metadata import PackageNotFoundError, version
+
+import numpy as np
+import pandas as pd
+
+# The subdirectories of the cache directory.
+KINDS = ("plans", "blocks", "files", "digests")
+
+# The digests of the files hashed by this process, by path, size, and
+# modification time.
+_digests = {}
+
+
+def default_cache_dir(cache_dir=None):
+    """Return the cache directory.
+
+    The default is the value of the TSBLENDER_CACHE_DIR environment variable or
+    ".tsblender_cache" in the current working directory.
+    """
+    if cache_dir is None:
+        cache_dir = os.environ.get("TSBLENDER_CACHE_DIR", ".tsblender_cache")
+    return cache_dir
+
+
+def default_max_size():
+    """Return the maximum size in bytes of the parsed file cache.
+
+    The default is the value of the TSBLENDER_CACHE_MAX_MB environment
+    variable or 1024 megabytes.
+    """
+    return int(float(os.environ.get("TSBLENDER_CACHE_MAX_MB", "1024")) * 2**20)
+
+
+def tsblender_version():
+    """Return the installed tsblender version."""
+    try:
+        return version("tsblender")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+@functools.cache
+def source_digest():
+    """Return the sha256 of the version and the source of the tsblender package.
+
+    The version alone does not change when the source of an editable or
+    development install is edited, so the source is part of every cache key.
+    """
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256(tsblender_version().encode("utf-8"))
+    for root, dirs, files in os.walk(package_dir, followlinks=True):
+        dirs.sort()
+        for fname in sorted(files):
+            if fname.endswith(".py"):
+                path = os.path.join(root, fname)
+                digest.update(b"\0")
+                digest.update(os.path.relpath(path, package_dir).encode("utf-8"))
+                digest.update(b"\0")
+                with open(path, "rb") as fpi:
+                    digest.update(fpi.read())
+    return digest.hexdigest()
+
+
+def _write_atomic(path, data):
+    """Write bytes to "path" so that readers never see a partial file."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fpo:
+            fpo.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def plan_key(infile, running_context=None):
+    """Key of the plan from the script content, context, and source."""
+    digest = hashlib.sha256()
+    digest.update(source_digest().encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(str(running_context).encode("utf-8"))
+    digest.update(b"\0")
+    with open(infile, "rb") as fpi:
+        digest.update(fpi.read())
+    return digest.hexdigest()
+
+
+def _plan_path(cache_dir, key):
+    return os.path.join(cache_dir, "plans", f"{key}.json")
+
+
+def load_plan(cache_dir, key):
+    """Return the cached plan for "key" or None."""
+    try:
+        with open(_plan_path(cache_dir, key), encoding="utf-8") as fpi:
+            return json.load(fpi)
+    except (OSError, ValueError):
+        return None
+
+
+def save_plan(cache_dir, key, plan):
+    """Store the plan under "key"."""
+    _write_atomic(_plan_path(cache_dir, key), json.dumps(plan).encode("utf-8"))
+
+
+def _digest_path(cache_dir, path):
+    name = hashlib.sha256(path.encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, "digests", f"{name}.json")
+
+
+def file_digest(path, cache_dir=None):
+    """Return the sha256 of the content of "path" or "missing".
+
+    The file is not read again while its size and modification time are the
+    same as when it was last hashed.  If "cache_dir" is not None the
+    digests are also kept in "cache_dir" for later runs.  A file modified
+    less than a second before it is hashed could change again without a
+    new modification time, so its digest is not kept.
+    """
+    path = os.path.abspath(path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return "missing"
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    if key in _digests:
+        return _digests[key]
+    if cache_dir is not None:
+        with suppress(OSError, ValueError):
+            with open(_digest_path(cache_dir, path), encoding="utf-8") as fpi:
+                size, mtime_ns, hexdigest = json.load(fpi)
+            if (size, mtime_ns) == key[1:]:
+                _digests[key] = hexdigest
+                return hexdigest
+
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as fpi:
+            for chunk in iter(lambda: fpi.read(1 << 20), b""):
+                digest.update(chunk)
+    except OSError:
+        return "missing"
+    hexdigest = digest.hexdigest()
+    if time.time_ns() - stat.st_mtime_ns > 10**9:
+        _digests[key] = hexdigest
+        if cache_dir is not None:
+            _write_atomic(
+                _digest_path(cache_dir, path),
+                json.dumps([*key[1:], hexdigest]).encode("utf-8"),
+            )
+    return hexdigest
+
+
+def block_key(block_name, parameters, files=(), upstream=(), cache_dir=None):
+    """Key of a block result.
+
+    Parameters
+    ----------
+    block_name : str
+        The upper case block name.
+    parameters : dict
+        The lower case keyword parameters of the block.
+    files : list
+        The names of the files read by the block.  The content of each file
+        is part of the key.
+    upstream : list
+        The keys of the blocks that created the entities read by the block.
+    cache_dir : str
+        The cache directory that keeps the digests of the files.
+    """
+    digest = hashlib.sha256()
+    digest.update(source_digest().encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(block_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(json.dumps(parameters, sort_keys=True, default=str).encode("utf-8"))
+    for fname in files:
+        digest.update(b"\0")
+        digest.update(fname.encode("utf-8"))
+        digest.update(file_digest(fname, cache_dir).encode("utf-8"))
+    for key in upstream:
+        digest.update(b"\0")
+        digest.update(key.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _block_path(cache_dir, key):
+    return os.path.join(cache_dir, "blocks", f"{key}.pickle")
+
+
+def load_block(cache_dir, key):
+    """Return the cached block result for "key" or None.
+
+    A result that can't be loaded, for example one pickled with other
+    versions of the libraries, is treated as not cached.
+    """
+    try:
+        with open(_block_path(cache_dir, key), "rb") as fpi:
+            return pickle.load(fpi)
+    except Exception:  # noqa: BLE001
+        return None
+
+
+def save_block(cache_dir, key, result):
+    """Store the block result under "key"."""
+    _write_atomic(
+        _block_path(cache_dir, key),
+        pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL),
+    )
+
+
+def parsed_key(reader, options, path, cache_dir=None):
+    """Key of a parsed file from the reader, its options, and file content."""
+    digest = hashlib.sha256()
+    digest.update(source_digest().encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(reader.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(json.dumps(options, default=str).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(file_digest(path, cache_dir).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _parsed_path(cache_dir, key):
+    return os.path.join(cache_dir, "files", f"{key}.npz")
+
+
+def _pack(obj, prefix, arrays):
+    """Add the numpy arrays that describe "obj" to "arrays"."""
+    if isinstance(obj, tuple):
+        arrays[f"{prefix}kind"] = np.array("tuple")
+        arrays[f"{prefix}length"] = np.array(len(obj))
+        for index, item in enumerate(obj):
+            _pack(item, f"{prefix}{index}/", arrays)
+        return
+    if isinstance(obj, pd.DataFrame):
+        arrays[f"{prefix}kind"] = np.array("frame")
+        _pack(obj.index, f"{prefix}index/", arrays)
+        _pack(obj.columns, f"{prefix}columns/", arrays)
+        for index in range(obj.shape[1]):
+            _pack(obj.iloc[:, index], f"{prefix}{index}/", arrays)
+        return
+    if not isinstance(obj, (pd.Series, pd.Index)):
+        raise TypeError(f"Cannot store {type(obj).__name__} in the file cache.")
+
+    if isinstance(obj, pd.Series):
+        arrays[f"{prefix}kind"] = np.array("series")
+        _pack(obj.index, f"{prefix}index/", arrays)
+    else:
+        arrays[f"{prefix}kind"] = np.array("index")
+    if obj.name is not None:
+        arrays[f"{prefix}name"] = np.array(obj.name)
+    if isinstance(obj.dtype, pd.CategoricalDtype):
+        arrays[f"{prefix}codes"] = obj.cat.codes.to_numpy()
+        _pack(pd.Index(obj.cat.categories), f"{prefix}categories/", arrays)
+        return
+    if isinstance(obj, pd.DatetimeIndex) and obj.freq is not None:
+        arrays[f"{prefix}freq"] = np.array(obj.freqstr)
+    values = obj.to_numpy()
+    if values.dtype == object:
+        if not all(isinstance(i, str) for i in values):
+            raise TypeError("Only strings can be stored in the file cache.")
+        values = values.astype(str)
+    arrays[f"{prefix}values"] = values
+
+
+def _unpack(arrays, prefix):
+    """Return the object described by the arrays under "prefix"."""
+    kind = arrays[f"{prefix}kind"].item()
+    if kind == "tuple":
+        return tuple(
+            _unpack(arrays, f"{prefix}{index}/")
+            for index in range(arrays[f"{prefix}length"].item())
+        )
+    if kind == "frame":
+        columns = _unpack(arrays, f"{prefix}columns/")
+        frame = pd.concat(
+            [_unpack(arrays, f"{prefix}{index}/") for index in range(len(columns))],
+            axis="columns",
+        )
+        frame.columns = columns
+        return frame
+
+    name = arrays[f"{prefix}name"].item() if f"{prefix}name" in arrays else None
+    if f"{prefix}codes" in arrays:
+        values = pd.Categorical.from_codes(
+            arrays[f"{prefix}codes"], _unpack(arrays, f"{prefix}categories/")
+        )
+    else:
+        values = arrays[f"{prefix}values"]
+        if values.dtype.kind == "U":
+            values = values.astype(object)
+    if kind == "series":
+        return pd.Series(values, index=_unpack(arrays, f"{prefix}index/"), name=name)
+    index = pd.Index(values, name=name)
+    if f"{prefix}freq" in arrays:
+        index.freq = arrays[f"{prefix}freq"].item()
+    return index
+
+
+def load_parsed(cache_dir, key):
+    """Return the cached parsed file for "key" or None."""
+    path = _parsed_path(cache_dir, key)
+    try:
+        with np.load(path, allow_pickle=False) as npz:
+            arrays = {name: npz[name] for name in npz.files}
+        # The modification time of the entry is the time of the last use.
+        os.utime(path)
+    except (OSError, ValueError):
+        return None
+    return _unpack(arrays, "")
+
+
+def save_parsed(cache_dir, key, parsed, source="", max_size=None):
+    """Store the parsed file under "key" and evict the least recently used.
+
+    Parameters
+    ----------
+    cache_dir : str
+        The cache directory.
+    key : str
+        The key from parsed_key.
+    parsed : pandas.DataFrame, pandas.Series, pandas.Index, or tuple
+        The parsed file.  Nothing is stored if it contains something other
+        than numbers, dates, or strings.
+    source : str
+        The name of the parsed file, listed by "tsblender cache".
+    max_size : int
+        The maximum total size in bytes of the parsed files in the cache.
+        The default is from default_max_size.
+    """
+    arrays = {"source": np.array(source)}
+    try:
+        _pack(parsed, "", arrays)
+    except TypeError:
+        return
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    path = _parsed_path(cache_dir, key)
+    _write_atomic(path, buffer.getvalue())
+    _evict(os.path.dirname(path), default_max_size() if max_size is None else max_size)
+
+
+def _evict(directory, max_size):
+    """Remove the least recently used files until the total fits in max_size.
+
+    The most recently used file is always kept.
+    """
+    entries = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith(".npz"):
+            stat = entry.stat()
+            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in entries[:-1]:
+        if total <= max_size:
+            break
+        with suppress(FileNotFoundError):
+            os.unlink(path)
+        total -= size
+
+
+def parsed_files(cache_dir=None):
+    """Return the last use, size, and source of each parsed file in the cache.
+
+    The most recently used entries are first.
+    """
+    cache_dir = default_cache_dir(cache_dir)
+    files = []
+    with suppress(FileNotFoundError):
+        for entry in os.scandir(os.path.join(cache_dir, "files")):
+            if not entry.name.endswith(".npz"):
+                continue
+            stat = entry.stat()
+            try:
+                with np.load(entry.path, allow_pickle=False) as npz:
+                    source = npz["source"].item()
+            except (OSError, ValueError, KeyError):
+                source = ""
+            files.append((stat.st_mtime, stat.st_size, source))
+    return sorted(files, reverse=True)
+
+
+def cache_usage(cache_dir=None):
+    """Return the number of entries and bytes of each kind of cache entry."""
+    cache_dir = default_cache_dir(cache_dir)
+    usage = {}
+    for kind in KINDS:
+        count = 0
+        size = 0
+        with suppress(FileNotFoundError):
+            for entry in os.scandir(os.path.join(cache_dir, kind)):
+                if entry.is_file() and not entry.name.startswith(".tmp"):
+                    count += 1
+                    size += entry.stat().st_size
+        usage[kind] = (count, size)
+    return usage
+
+
+def clear_cache(cache_dir=None, kind=None):
+    """Remove all entries, or only the entries of one kind, from the cache."""
+    cache_dir = default_cache_dir(cache_dir)
+    for name in KINDS if kind is None else (kind,):
+        shutil.rmtree(os.path.join(cache_dir, name), ignore_errors=True)
@@ -0,0 +1,535 @@
+"""Compiled Fortran formats for writing single records or whole columns.
+
+The results are the same as ``fortranformat.FortranRecordWriter`` for the edit
+descriptors used by tsblender: quoted strings, "Tn", "TLn", "TRn", "nX", "/",
+"Aw", "kP", and "Gw.d".  Like ``fortranformat`` every value is first written
+with 38 significant digits and then rounded half up to the number of digits of
+the edit descriptor, so the rounding matches exactly.
+
+A format is parsed once by ``record_writer`` into a ``RecordWriter`` that can
+write one record at a time with ``write`` or all the records of a set of
+columns with ``write_columns``.  Both write the "G" edit descriptors with
+``g_edit``, so there is only one implementation of the G editing to keep the
+same as ``fortranformat``.
+"""
+
+import functools
+import itertools
+import re
+
+import numpy as np
+
+# Number of significant digits written before rounding, from the
+# PROC_MIN_FIELD_WIDTH of fortranformat.
+_NDIGITS = 38
+
+
+def a_edit(strings, width):
+    """Return the strings as written by the "Aw" edit descriptor.
+
+    Shorter strings are right justified and longer strings are truncated to
+    the first "width" characters.
+    """
+    return [i[:width].rjust(width) for i in strings]
+
+
+def _digits(tmp):
+    """Return the matrix of the first _NDIGITS digits and the exponents."""
+    text = np.array(
+        [f"{i:.{_NDIGITS - 1}e}" for i in tmp.tolist()], dtype=f"S{_NDIGITS + 6}"
+    )
+    chars = text.view(np.uint8).reshape(len(tmp), _NDIGITS + 6)
+    digits = np.empty((len(tmp), _NDIGITS), dtype=np.int64)
+    digits[:, 0] = chars[:, 0] - ord("0")
+    digits[:, 1:] = chars[:, 2 : _NDIGITS + 1] - ord("0")
+
+    # The exponent is "e+dd" or "e+ddd" after the digits.
+    exponent = np.zeros(len(tmp), dtype=np.int64)
+    for column in range(_NDIGITS + 3, _NDIGITS + 6):
+        digit = chars[:, column]
+        present = digit != 0
+        exponent = np.where(present, exponent * 10 + (digit - ord("0")), exponent)
+    exponent = np.where(chars[:, _NDIGITS + 2] == ord("-"), -exponent, exponent)
+    return digits, exponent
+
+
+def _round(digits, ndigits):
+    """Round half up to "ndigits" digits of each row.
+
+    Returns the digits with an extra first column for the carry and whether
+    the carry overflowed into that column.
+    """
+    rows = np.arange(len(digits))
+    columns = np.arange(_NDIGITS)
+    rounded = np.zeros((len(digits), _NDIGITS + 1), dtype=np.int64)
+    rounded[:, 1:] = digits
+
+    # Only the rows that are rounded to fewer digits than were written.
+    rounds = ndigits < _NDIGITS
+    up = rounds & (digits[rows, np.minimum(ndigits, _NDIGITS - 1)] >= 5)
+    kept = columns[None, :] < ndigits[:, None]
+    last = np.where(kept & (digits != 9), columns[None, :], -1).max(axis=1)
+    carried = up[:, None] & (columns[None, :] > last[:, None]) & kept
+    rounded[:, 1:][carried] = 0
+    rounded[up, last[up] + 1] += 1
+    overflow = up & (last < 0)
+    return rounded, overflow
+
+
+def g_edit(values, width, digits, scale=0):
+    """Return the values as written by the "kPGw.d" edit descriptor.
+
+    Parameters
+    ----------
+    values : array_like
+        The float values.
+    width : int
+        The field width "w".
+    digits : int
+        The number of significant digits "d", greater than zero.
+    scale : int
+        The scale factor "k" of a preceding "kP" edit descriptor, only used
+        for values written with E editing.
+
+    Returns
+    -------
+    numpy.ndarray
+        The strings of length "width".
+    """
+    values = np.asarray(values, dtype=np.float64)
+    count = len(values)
+    finite = np.isfinite(values)
+    tmp = np.where(finite, np.abs(values), 1.0)
+    zero = tmp == 0
+    sign = (values < 0) & ~zero & finite
+
+    # Small and large values use E editing, the others use F editing with
+    # the number of decimals set so that there are "digits" significant
+    # digits followed by four blanks.
+    exp_d = 10**digits
+    use_e = (tmp < (0.1 - 0.05 / exp_d)) | (tmp >= (exp_d - 0.5))
+    low = np.array(
+        [10 ** (m - 1) - 5 * 10 ** (-digits - 1 + m) for m in range(digits + 2)]
+    )
+    high = np.array([10**m - 0.5 * 10 ** (-digits + m) for m in range(digits + 2)])
+    with np.errstate(divide="ignore"):
+        mag = np.abs(np.round(np.log10(np.where(use_e, 1.0, tmp)))).astype(np.int64)
+    mag = np.clip(mag, 0, digits + 1)
+    for _ in range(digits + 2):
+        down = ~use_e & (tmp < low[mag]) & (mag > 0)
+        up = ~use_e & (tmp >= high[mag]) & (mag < digits + 1)
+        if not (down.any() or up.any()):
+            break
+        mag = mag - down + up
+
+    digit_matrix, exponent = _digits(tmp)
+    ex = np.where(zero, 0, exponent + 1)
+
+    # Where the decimal point goes.
+    decimals = digits - mag
+    f_nbefore = np.maximum(ex, 0)
+    f_nzero = np.where(ex < 0, np.minimum(-ex, decimals), 0)
+    f_nafter = np.where(ex < 0, decimals - f_nzero, decimals)
+    if scale < 0:
+        e_nbefore, e_nzero, e_nafter = 0, -scale, digits + scale
+    elif scale > 0:
+        e_nbefore, e_nzero, e_nafter = scale, 0, digits - scale + 1
+    else:
+        e_nbefore, e_nzero, e_nafter = 0, 0, digits
+    nbefore = np.where(use_e, e_nbefore, f_nbefore)
+    nzero = np.where(use_e, e_nzero, f_nzero)
+    nafter = np.where(use_e, e_nafter, f_nafter)
+    ex = np.where(use_e & ~zero, ex - scale, ex)
+
+    # Round, moving the decimal point or the exponent on overflow.
+    ndigits = np.minimum(nbefore + nafter, _NDIGITS)
+    rounded, overflow = _round(digit_matrix, ndigits)
+
+    # Like fortranformat nothing is rounded if no digits are kept, unless all
+    # of the decimals are zeros.
+    none_kept = ndigits == 0
+    overflow = overflow & ~none_kept
+    rounded[none_kept, 0] = 0
+    rounded[none_kept, 1:] = digit_matrix[none_kept]
+    one = none_kept & ~use_e & (ex < 0) & (-ex == decimals)
+    one &= digit_matrix[:, 0] >= 5
+    rounded[one, 1] = 1
+    nzero = nzero - one
+    nafter = nafter + one
+    ndigits = ndigits + one
+
+    f_overflow = overflow & ~use_e
+    nafter = nafter + (f_overflow & (nzero > 0))
+    nbefore = nbefore + (f_overflow & (nzero == 0))
+    nzero = nzero - (f_overflow & (nzero > 0))
+    ex = ex + (overflow & use_e)
+    first = np.where(overflow, 0, 1)
+
+    edigits = np.where(use_e, 4, 0)
+    field = np.where(use_e, width, width - 4)
+    nblanks = field - (nbefore + nzero + nafter + edigits + 1) - sign
+    stars = (nblanks < 0) | (use_e & (np.abs(ex) > 999))
+    leadzero = (nbefore == 0) & (nblanks > 0)
+    nblanks = nblanks - leadzero
+
+    # Fill a matrix of characters, one row for each value.
+    position = np.arange(width)[None, :]
+    chars = np.full((count, width), ord(" "), dtype=np.uint8)
+    start = nblanks + sign
+    chars[(position == nblanks[:, None]) & sign[:, None]] = ord("-")
+    chars[(position == start[:, None]) & leadzero[:, None]] = ord("0")
+    start = start + leadzero
+
+    def put_digits(begin, length, offset, available, pad):
+        """Put the rounded digits from "offset" at "begin:begin + length".
+
+        Positions past the "available" digits are filled with "pad".
+        """
+        inside = (position >= begin[:, None]) & (position < (begin + length)[:, None])
+        index = position - begin[:, None]
+        from_digits = inside & (index < available[:, None])
+        column = np.clip(first[:, None] + offset[:, None] + index, 0, _NDIGITS)
+        digit = np.take_along_axis(rounded, column, axis=1)
+        chars[from_digits] = (digit + ord("0"))[from_digits]
+        chars[inside & ~from_digits] = ord(pad)
+
+    # Like fortranformat, missing digits before the decimal point are blank.
+    put_digits(start, nbefore, np.zeros(count, dtype=np.int64), ndigits, " ")
+    start = start + nbefore
+    chars[position == start[:, None]] = ord(".")
+    start = start + 1
+    chars[(position >= start[:, None]) & (position < (start + nzero)[:, None])] = ord(
+        "0"
+    )
+    start = start + nzero
+    put_digits(start, nafter, nbefore, ndigits - nbefore, "0")
+    start = start + nafter
+
+    # The exponent of E editing is "E+dd" or, if larger than 99, "+ddd".
+    magnitude = np.abs(ex)
+    large = magnitude > 99
+    exponent_chars = np.empty((count, 4), dtype=np.uint8)
+    exponent_chars[:, 0] = np.where(
+        large, np.where(ex < 0, ord("-"), ord("+")), ord("E")
+    )
+    exponent_chars[:, 1] = np.where(
+        large, magnitude // 100 + ord("0"), np.where(ex < 0, ord("-"), ord("+"))
+    )
+    exponent_chars[:, 2] = magnitude // 10 % 10 + ord("0")
+    exponent_chars[:, 3] = magnitude % 10 + ord("0")
+    where = use_e & ~stars
+    exponent_at = (position >= start[:, None]) & (position < (start + 4)[:, None])
+    exponent_at &= where[:, None]
+    chars[exponent_at] = exponent_chars[where].ravel()
+
+    chars[stars] = ord("*")
+    text = chars.view(f"S{width}").ravel().astype(str)
+
+    # NaN and infinity.
+    if not finite.all():
+        nan = np.isnan(values)
+        text[nan] = "NaN".rjust(width)
+        if width > 8:
+            infinity = ["+Infinity".rjust(width), "-Infinity".rjust(width)]
+        else:
+            infinity = ["+Inf".rjust(width), "-Inf".rjust(width)]
+        text[np.isposinf(values)] = infinity[0]
+        text[np.isneginf(values)] = infinity[1]
+    return text
+
+
+# Marks the end of the values.
+_MISSING = object()
+
+# Quoted strings, scale factors, edit descriptors, and separators.
+_TOKEN = re.compile(
+    r"""\s*(?:
+    '(?P<single>(?:[^']|'')*)'
+    |"(?P<double>(?:[^"]|"")*)"
+    |(?P<scale>[+-]?\d+)\s*P
+    |(?P<count>\d*)\s*(?P<name>TL|TR|T|X|A|G)\s*(?P<width>\d*)(?:\.(?P<digits>\d+))?
+    |(?P<separator>[,/()])
+    )""",
+    re.IGNORECASE | re.VERBOSE,
+)
+
+
+def _parse(fmt):
+    """Return the list of operations of a Fortran format.
+
+    The operations are ("text", string), ("A", width or None), ("G", width,
+    digits), ("P", scale), ("T", column), and ("move", characters).
+    """
+    text = fmt.strip()
+    if text.startswith("(") and text.endswith(")"):
+        text = text[1:-1]
+    operations = []
+    position = 0
+    while position < len(text.rstrip()):
+        match = _TOKEN.match(text, position)
+        if match is None:
+            raise ValueError(
+                f'Cannot parse the Fortran format "{fmt}" at "{text[position:]}".'
+            )
+        position = match.end()
+        if match["single"] is not None:
+            operations.append(("text", match["single"].replace("''", "'")))
+        elif match["double"] is not None:
+            operations.append(("text", match["double"].replace('""', '"')))
+        elif match["scale"] is not None:
+            operations.append(("P", int(match["scale"])))
+        elif match["separator"] == "/":
+            operations.append(("text", "\n"))
+        elif match["separator"] in ("(", ")"):
+            raise ValueError(
+                f'Groups in parentheses are not supported in the format "{fmt}".'
+            )
+        elif match["name"] is not None:
+            name = match["name"].upper()
+            count = int(match["count"] or 1)
+            width = int(match["width"]) if match["width"] else None
+            if name in ("T", "TL", "TR") and (width is None or match["count"]):
+                raise ValueError(f'"{match[0].strip()}" needs a column in "{fmt}".')
+            if name == "G" and (width is None or match["digits"] is None):
+                raise ValueError(
+                    f'"{match[0].strip()}" needs a width and digits in "{fmt}".'
+                )
+            if name == "T":
+                operations.append(("T", width))
+            elif name == "TL":
+                operations.append(("move", -width))
+            elif name == "TR":
+                operations.append(("move", width))
+            elif name == "X":
+                operations.append(("move", count if width is None else width))
+            elif name == "A":
+                operations.extend([("A", width)] * count)
+            else:
+                operations.extend([("G", width, int(match["digits"]))] * count)
+    return operations
+
+
+def _numbers(column):
+    """Return a column of numbers as floats with None as zero."""
+    values = np.asarray(column)
+    if values.dtype == object:
+        values = np.where(np.equal(values, None), 0.0, values)
+    return values.astype(np.float64, copy=False)
+
+
+def _format_column(operation, column, scale):
+    """Return a column of values as written by an "A" or "G" operation.
+
+    Like fortranformat a missing value is written as an empty string or zero.
+    """
+    if operation[0] == "A":
+        strings = ["" if i is None else str(i) for i in column]
+        if operation[1] is None:
+            return strings
+        return a_edit(strings, operation[1])
+    return g_edit(_numbers(column), *operation[1:], scale).tolist()
+
+
+class RecordWriter:
+    """Write records with a Fortran format.
+
+    The same as ``fortranformat.FortranRecordWriter``, including the quirks
+    of positioning with "T" and "X" over characters that were already written
+    and the reversion of the format if there are more values than edit
+    descriptors, for the edit descriptors used by tsblender.
+    """
+
+    def __init__(self, fmt):
+        self.format = fmt
+        self.operations = _parse(fmt)
+        self.nvalues = sum(i[0] in ("A", "G") for i in self.operations)
+
+    def _value_operations(self, nvalues):
+        """Return the operation and scale factor that write each value.
+
+        The format is used again from the start while there are values left,
+        but without its scale factors, like fortranformat.
+        """
+        result = []
+        if not self.nvalues:
+            return result
+        scale = 0
+        reversion = False
+        while len(result) < nvalues:
+            for operation in self.operations:
+                if operation[0] == "P" and not reversion:
+                    scale = operation[1]
+                elif operation[0] in ("A", "G") and len(result) < nvalues:
+                    result.append((operation, scale))
+            reversion = True
+        return result
+
+    def _format_columns(self, columns):
+        """Return the strings of each column of values.
+
+        The columns written by the same "G" edit descriptor and scale factor
+        are formatted together with one call of ``g_edit``.
+        """
+        operations = self._value_operations(len(columns))
+        formatted = [None] * len(operations)
+        groups = {}
+        for number, (operation, scale) in enumerate(operations):
+            if operation[0] == "A":
+                formatted[number] = _format_column(operation, columns[number], scale)
+            else:
+                groups.setdefault((operation, scale), []).append(number)
+        for (operation, scale), numbers in groups.items():
+            strings = _format_column(
+                operation,
+                np.concatenate([_numbers(columns[i]) for i in numbers]),
+                scale,
+            )
+            start = 0
+            for number in numbers:
+                end = start + len(columns[number])
+                formatted[number] = strings[start:end]
+                start = end
+        return formatted
+
+    def _assemble(self, strings):
+        """Place the formatted values into a record like fortranformat."""
+        record = []
+        tell = 0
+        position = 0
+        strings = iter(strings)
+        operations = self.operations
+        index = 0
+        while True:
+            if index == len(operations):
+                string = next(strings, _MISSING)
+                if string is _MISSING or not self.nvalues:
+                    break
+                # Start a new record and go back to the start of the format.
+                strings = itertools.chain([string], strings)
+                record[tell : tell + 1] = "\n"
+                tell = tell + 1
+                position = tell
+                index = 0
+            operation = operations[index]
+            index = index + 1
+            kind = operation[0]
+            if kind == "P":
+                continue
+            if kind == "T":
+                position = operation[1] - 1
+                continue
+            if kind == "move":
+                position = position + operation[1]
+                continue
+            if kind == "text":
+                string = operation[1]
+            else:
+                string = next(strings, _MISSING)
+                if string is _MISSING:
+                    break
+            if position > tell:
+                record[tell:position] = " " * (position - tell)
+            tell = max(0, position)
+            record[tell : tell + len(string)] = string
+            tell = tell + len(string)
+            position = tell
+        return "".join(record)
+
+    def write(self, values):
+        """Return the record with the values.
+
+        Parameters
+        ----------
+        values : list
+            The values for the "A" and "G" edit descriptors.
+
+        Returns
+        -------
+        str
+            The record, with a new line for every "/" edit descriptor.
+        """
+        columns = [[value] for value in values]
+        return self._assemble(i[0] for i in self._format_columns(columns))
+
+    def write_columns(self, columns):
+        """Return the records for every row of the columns.
+
+        Each column is formatted all at once, only rows where "T" moves back
+        over characters that were already written are put together one at a
+        time.
+
+        Parameters
+        ----------
+        columns : list
+            The values for each "A" and "G" edit descriptor.  A column can be
+            a sequence of values or a single value that is repeated for
+            every row.
+
+        Returns
+        -------
+        list
+            The records, the same as ``write`` for each row.
+        """
+        single = [isinstance(i, str) or np.ndim(i) == 0 for i in columns]
+        nrows = max(
+            (len(i) for i, one in zip(columns, single) if not one),
+            default=1,
+        )
+        columns = [[i] * nrows if one else i for i, one in zip(columns, single)]
+        if len(columns) > self.nvalues:
+            # The format is used more than once for each row.
+            return list(map(self._assemble, zip(*self._format_columns(columns))))
+
+        # Format each column and keep track of where it goes in each record.
+        parts = []
+        formatted = []
+        tell = np.zeros(nrows, dtype=np.int64)
+        position = tell
+        overlaid = np.zeros(nrows, dtype=bool)
+        scale = 0
+        remaining = iter(columns)
+        for operation in self.operations:
+            kind = operation[0]
+            if kind == "P":
+                scale = operation[1]
+                continue
+            if kind == "T":
+                position = np.full(nrows, operation[1] - 1)
+                continue
+            if kind == "move":
+                position = position + operation[1]
+                continue
+            if kind == "text":
+                strings = operation[1]
+                lengths = len(strings)
+            else:
+                column = next(remaining, _MISSING)
+                if column is _MISSING:
+                    break
+                strings = _format_column(operation, column, scale)
+                formatted.append(strings)
+                lengths = np.array([len(i) for i in strings], dtype=np.int64)
+            overlaid |= position < tell
+            blanks = np.maximum(position - tell, 0)
+            if blanks.any():
+                parts.append(
+                    [" " * i for i in blanks.tolist()]
+                    if (blanks != blanks[0]).any()
+                    else itertools.repeat(" " * int(blanks[0]), nrows)
+                )
+            parts.append(
+                itertools.repeat(strings, nrows) if kind == "text" else strings
+            )
+            tell = np.maximum(position, tell) + lengths
+            position = tell
+
+        records = list(map("".join, zip(*parts))) if parts else [""] * nrows
+        for row in np.flatnonzero(overlaid).tolist():
+            records[row] = self._assemble(i[row] for i in formatted)
+        return records
+
+
+@functools.cache
+def record_writer(fmt):
+    """Return the RecordWriter for a Fortran format, parsed only once."""
+    return RecordWriter(fmt)
@@ -13,6 +13,36 @@ from typing_extensions import Annotated
 from tsblender.toolbox_utils.src.toolbox_utils import tsutils
 
 
+def _read_gsflow_gage(
+    file, model_reference_date, model_reference_time, time_units_per_day
+):
+    """Read all of the data types in a GSFLOW gage file into a DataFrame."""
+    with open(file, encoding="ascii") as f:
+        _ = f.readline()
+        headers = f.readline()
+    headers = headers.replace('"', "").split()
+    headers = headers[1:]
+    headers = [i.upper() for i in headers]
+    ts = pd.read_csv(
+        file,
+        skiprows=2,
+        sep=r"\s+",
+        quoting=3,
+        header=None,
+        names=headers,
+        index_col=0,
+        engine="c",
+    )
+
+    unit = pd.Timedelta(1, "D") / time_units_per_day
+
+    ts.index = (
+        unit * ts.index
+        + pd.to_datetime(f"{model_reference_date} {model_reference_time}")
+    ) - unit
+    return ts
+
+
 @validate_call
 def get_series_gsflow_gage(
     self,
@@ -57,30 +87,14 @@ def get_series_gsflow_gage(
         data_type = [data_type]
     if isinstance(new_series_name, str):
         new_series_name = [new_series_name]
-    with open(file, encoding="ascii") as f:
-        _ = f.readline()
-        headers = f.readline()
-    headers = headers.replace('"', "").split()
-    headers = headers[1:]
-    headers = [i.upper() for i in headers]
-    ts = pd.read_csv(
+    ts = self._read_cached(
+        _read_gsflow_gage,
         file,
-        skiprows=2,
-        sep=r"\s+",
-        quoting=3,
-        header=None,
-        names=headers,
-        index_col=0,
-        engine="c",
+        model_reference_date=model_reference_date,
+        model_reference_time=model_reference_time,
+        time_units_per_day=time_units_per_day,
     )
 
-    unit = pd.Timedelta(1, "D") / time_units_per_day
-
-    ts.index = (
-        unit * ts.index
-        + pd.to_datetime(f"{model_reference_date} {model_reference_time}")
-    ) - unit
-
     ts = tsutils.common_kwds(
         ts,
         start_date=self._normalize_datetimes(date_1, time_1),
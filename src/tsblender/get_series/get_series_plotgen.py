@@ -27,7 +27,7 @@ def get_series_plotgen(
         label = [label]
     if isinstance(new_series_name, str):
         new_series_name = [new_series_name]
-    ts = _get_series_pgen(file)
+    ts = self._read_cached(_get_series_pgen, file)
     ts = tsutils.common_kwds(
         ts,
         start_date=self._normalize_datetimes(date_1, time_1),
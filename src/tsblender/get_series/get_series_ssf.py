@@ -5,11 +5,64 @@ except ImportError:
 
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 
 from tsblender.toolbox_utils.src.toolbox_utils import tsutils
 
 
+def _read_ssf(file):
+    """Read a SSF file into columns of site, date, time, and value.
+
+    The site, date, and time columns are categorical so that each distinct
+    string is stored and parsed once no matter how many sites share it.
+    """
+    return pd.read_csv(
+        file,
+        header=None,
+        names=["site", "date", "time", "value"],
+        sep=r"\s+",
+        dtype={
+            "site": "category",
+            "date": "category",
+            "time": "category",
+            "value": "float64",
+        },
+        engine="c",
+    )
+
+
+def _ssf_dates(ssf, rows=slice(None)):
+    """Return the datetimes of the rows of the columns of a SSF file."""
+    dates = ssf["date"][rows].cat
+    times = ssf["time"][rows].cat
+    try:
+        days = pd.to_datetime(dates.categories, format="%m/%d/%Y")
+    except ValueError:
+        days = pd.to_datetime(dates.categories)
+    hours = pd.to_timedelta(times.categories)
+    return days.take(dates.codes.to_numpy()) + hours.take(times.codes.to_numpy())
+
+
+def _ssf_site(ssf, site):
+    """Return the time series of one site from the columns of a SSF file."""
+    rows = (ssf["site"] == site).to_numpy()
+    nts = pd.Series(
+        ssf["value"].to_numpy()[rows], index=_ssf_dates(ssf, rows), name=site
+    )
+    nts = nts.dropna().sort_index(kind="stable")
+    nts = nts[~nts.index.duplicated()]
+    nts.index.name = "Datetime"
+    return nts
+
+
+def _period(index):
+    """Return the smallest spacing of sorted dates, None if less than two."""
+    if len(index) < 2:
+        return None
+    return pd.Timedelta(np.diff(index.asi8).min())
+
+
 @validate_call
 def get_series_ssf(
     self,
@@ -26,52 +79,37 @@ def get_series_ssf(
         site = [site]
     if isinstance(new_series_name, str):
         new_series_name = [new_series_name]
-    ts = pd.read_csv(
-        file,
-        header=None,
-        parse_dates=[[1, 2]],
-        index_col=[0],
-        sep=r"\s+",
-        dtype={0: str},
-        engine="c",
-    )
-    try:
-        ts = ts.pivot_table(
-            index=ts.index,
-            values=ts.columns.drop(ts.columns[0]),
-            columns=ts.columns[0],
-            aggfunc="first",
-        )
-    except ValueError as exc:
-        raise ValueError(
-            tsutils.error_wrapper(
-                f"""
-                Duplicate index (time stamp and '{ts.columns[0]}') were
-                found. Found these duplicate indices:
-                {ts.index.get_duplicates()}
-                """
-            )
-        ) from exc
-    ts.index.name = "Datetime"
-    ts.columns = [i[1] for i in ts.columns]
-
-    ts = tsutils.common_kwds(
-        ts,
-        start_date=self._normalize_datetimes(date_1, time_1),
-        end_date=self._normalize_datetimes(date_2, time_2),
-    )
-    ts.index = ts.index.to_period(ts.index[1] - ts.index[0]).to_timestamp()
+    ssf = self._read_cached(_read_ssf, file)
     for st, nsn in zip(site, new_series_name):
-        try:
-            nts = ts[st]
-        except KeyError as exc:
+        if st not in ssf["site"].cat.categories:
             raise KeyError(
                 tsutils.error_wrapper(
                     f"""
                     The time-series "{st}" is not available in file
-                    "{file}". The available time-series are {ts.columns}.
+                    "{file}". The available time-series are
+                    {ssf["site"].cat.categories}.
                     """
                 )
-            ) from exc
+            )
+        ts = tsutils.common_kwds(
+            _ssf_site(ssf, st).to_frame(),
+            start_date=self._normalize_datetimes(date_1, time_1),
+            end_date=self._normalize_datetimes(date_2, time_2),
+        )
+        nts = ts[st]
+
+        # The period of a site with less than two dates in the window is the
+        # spacing of the dates of all sites in the window.
+        period = _period(nts.index)
+        if period is None:
+            period = _period(
+                tsutils.common_kwds(
+                    pd.Series(0, index=_ssf_dates(ssf).unique().sort_values()),
+                    start_date=self._normalize_datetimes(date_1, time_1),
+                    end_date=self._normalize_datetimes(date_2, time_2),
+                ).index
+            )
+        if period is not None:
+            nts.index = nts.index.to_period(period).to_timestamp()
         self.series_dates[nsn.upper()] = [nts.index[0], nts.index[-1]]
         self._join(nsn.upper(), series=nts)
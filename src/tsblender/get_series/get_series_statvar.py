@@ -3,12 +3,71 @@ try:
 except ImportError:
     from pydantic import validate_arguments as validate_call
 
+import os
 from typing import Optional
 
 import pandas as pd
 
 from tsblender.toolbox_utils.src.toolbox_utils import tsutils
 
+# The first column is the time step number followed by six date columns.
+_DATE_COLUMNS = ["year", "month", "day", "hour", "minute", "second"]
+
+
+def _read_statvar_dates(file):
+    """Read the column names and the dates of the rows of a STATVAR file."""
+    # Need this to calculate "skiprows" in pd.read_csv and the column names of
+    # the variables.
+    with open(file, encoding="ascii") as f:
+        num_series = int(f.readline().strip())
+        collect = []
+        for _ in range(num_series):
+            unique_id = f.readline().strip().split()
+            collect.append(unique_id)
+    headers = pd.Index(["_".join(i) for i in collect])
+
+    # Only the date columns are parsed, as integers, and assembled into
+    # datetimes all at once.
+    dates = pd.read_csv(
+        file,
+        skiprows=num_series + 1,
+        header=None,
+        sep=r"\s+",
+        usecols=range(1, 7),
+        names=_DATE_COLUMNS,
+        dtype="int64",
+        engine="c",
+    )
+    dates = pd.DatetimeIndex(pd.to_datetime(dates), name="Datetime")
+    return headers, dates
+
+
+def _read_statvar(file, usecols, skiprows, nrows):
+    """Read the rows and columns of the variables in a STATVAR file."""
+    return pd.read_csv(
+        file,
+        skiprows=skiprows,
+        nrows=nrows,
+        header=None,
+        sep=r"\s+",
+        usecols=list(usecols),
+        dtype="float64",
+        engine="c",
+    )
+
+
+def _rows(dates, start_date, end_date):
+    """Return the first and one past the last row between the dates."""
+    first = 0
+    last = len(dates)
+    if dates.is_monotonic_increasing:
+        if start_date is not None:
+            first = dates.searchsorted(pd.Timestamp(start_date), side="left")
+        if end_date is not None:
+            last = dates.searchsorted(pd.Timestamp(end_date), side="right")
+        last = max(first, last)
+    return first, last
+
 
 @validate_call
 def get_series_statvar(
@@ -32,56 +91,74 @@ def get_series_statvar(
     if isinstance(new_series_name, str):
         new_series_name = [new_series_name]
 
-    # Need this to calculate "skiprows" in pd.read_csv and "headers" to
-    # later rename the columns to.
-    with open(file, encoding="ascii") as f:
-        num_series = int(f.readline().strip())
-        collect = []
-        for _ in range(num_series):
-            unique_id = f.readline().strip().split()
-            collect.append(unique_id)
-    headers = ["_".join(i) for i in collect]
+    headers, dates = self._read_cached(_read_statvar_dates, file)
+
+    # Only the columns of the requested variables are parsed.
+    names = []
+    for vn, lid in zip(variable_name, location_id):
+        name = f"{vn}_{lid}"
+        if name not in headers:
+            raise KeyError(
+                tsutils.error_wrapper(
+                    f"""
+                    The time-series with variable name "{vn}" and location
+                    ID "{lid}" forms the column name "{name}" and is
+                    not available in file "{file}". The available
+                    time-series are {headers}.
+                    """
+                )
+            )
+        names.append(name)
+    columns = headers.tolist()
+    usecols = sorted({columns.index(name) + 7 for name in names})
 
-    # Leave setting the index columns and headers to later since want
-    # pd.read_csv to parse the dates from 6 columns which creates a new
-    # column and messes with the order of the columns.
-    ts = pd.read_csv(
+    # Only the rows between date_1 and date_2 are parsed.
+    start_date = self._normalize_datetimes(date_1, time_1)
+    end_date = self._normalize_datetimes(date_2, time_2)
+    first, last = _rows(dates, start_date, end_date)
+
+    # The columns and rows of every block of the run that reads the file are
+    # parsed together, once, and each block takes its own from them.
+    read_cols = set(usecols)
+    read_first, read_last = first, last
+    reads = self._statvar_reads.get(os.path.abspath(file))
+    if reads is not None and set(names) <= reads["names"]:
+        read_cols.update(
+            columns.index(name) + 7 for name in reads["names"] if name in headers
+        )
+        for window in reads["windows"]:
+            window_first, window_last = _rows(
+                dates,
+                self._normalize_datetimes(window[0], window[1]),
+                self._normalize_datetimes(window[2], window[3]),
+            )
+            read_first = min(read_first, window_first)
+            read_last = max(read_last, window_last)
+    ts = self._read_cached(
+        _read_statvar,
         file,
-        skiprows=num_series + 1,
-        header=None,
-        sep=r"\s+",
-        parse_dates=[[1, 2, 3, 4, 5, 6]],
-        date_parser=lambda x: pd.to_datetime(x, format="%Y %m %d %H %M %S"),
-        engine="c",
+        usecols=tuple(sorted(read_cols)),
+        skiprows=len(headers) + 1 + read_first,
+        nrows=read_last - read_first,
+    )
+    ts = (
+        ts.iloc[first - read_first : last - read_first]
+        .loc[:, usecols]
+        .set_axis(dates[first:last])
+        .set_axis([headers[i - 7] for i in usecols], axis="columns")
     )
-    ts = ts.set_index("1_2_3_4_5_6")
-    ts = ts.drop(columns=[0])
-    ts.index.name = "Datetime"
-    ts.columns = headers
 
     # Use tsutils.common_kwds to subset the time period.
     ts = tsutils.common_kwds(
         ts,
-        start_date=self._normalize_datetimes(date_1, time_1),
-        end_date=self._normalize_datetimes(date_2, time_2),
+        start_date=start_date,
+        end_date=end_date,
     )
 
     # Create a new DataFrame for each variable_name, location_id, and
     # new_series_name and join to the correct global DataFrame.
     # Update series metadata in self.series_dates.
-    for vn, lid, nsn in zip(variable_name, location_id, new_series_name):
-        try:
-            nts = ts[f"{vn}_{lid}"]
-        except KeyError as exc:
-            raise KeyError(
-                tsutils.error_wrapper(
-                    f"""
-                    The time-series with variable name "{vn}" and location
-                    ID "{lid}" forms the column name "{vn}_{lid}" and is
-                    not available in file "{file}". The available
-                    time-series are {ts.columns}.
-                    """
-                )
-            ) from exc
+    for name, nsn in zip(names, new_series_name):
+        nts = ts[name]
         self._join(nsn.upper(), series=nts)
         self.series_dates[nsn.upper()] = [nts.index[0], nts.index[-1]]
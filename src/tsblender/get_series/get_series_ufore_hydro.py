@@ -10,6 +10,13 @@ import pandas as pd
 from tsblender.toolbox_utils.src.toolbox_utils import tsutils
 
 
+def _read_ufore_hydro(file):
+    """Read the values in a UFORE hydrology file."""
+    with open(file, encoding="ascii") as f:
+        nterm = int(f.readline())
+        return pd.Series([float(f.readline()) for _ in range(nterm)])
+
+
 @validate_call
 def get_series_ufore_hydro(
     self,
@@ -29,9 +36,8 @@ def get_series_ufore_hydro(
     )
     time_increment = pd.Timedelta(time_increment)
 
-    with open(file, encoding="ascii") as f:
-        nterm = int(f.readline())
-        ts = [float(f.readline()) for _ in range(nterm)]
+    ts = self._read_cached(_read_ufore_hydro, file).to_numpy()
+    nterm = len(ts)
     ts_range = pd.date_range(
         start=model_reference_date,
         periods=nterm,
@@ -0,0 +1,281 @@
+"""Dependency graph between the blocks of a tsproc/tsblender plan.
+
+Every block reads and writes named entities (series, c_tables, s_tables,
+v_tables, e_tables, g_tables) and files.  Block "j" depends on an earlier
+block "i" if "j" reads something that "i" writes (read after write), writes
+something that "i" writes (write after write), or writes something that "i"
+reads (write after read).  Blocks with side effects outside of the tables
+(LIST_OUTPUT, PLOT, WRITE_PEST_FILES) are also kept in file order relative to
+each other.  Any order of the blocks that respects the dependencies gives the
+same result as running the blocks in file order.
+"""
+
+import os
+import re
+
+# Blocks that write files.  They are run in file order relative to each other.
+SIDE_EFFECTS = {"LIST_OUTPUT", "PLOT", "WRITE_PEST_FILES"}
+
+# Blocks that change the state of all of the tables.
+BARRIERS = {"SETTINGS"}
+
+# Blocks that have side effects or change or remove existing entities.  When
+# running in parallel these are run in the main process, all other blocks only
+# create new entities and can run in a separate process.
+LOCAL = SIDE_EFFECTS | BARRIERS | {"COPY", "ERASE_ENTITY", "MOVE"}
+
+_ENTITY_KEYWORD = re.compile(
+    r"^(?:(new|observation|model|tb|base_level)_)?"
+    r"(series|[cvseg]_table)_name(?:_(?:sim|obs|base))?$"
+)
+
+
+def _words(value):
+    """Return the list of words in a parameter value."""
+    if isinstance(value, str):
+        return value.split()
+    words = []
+    for item in value:
+        words.extend(_words(item))
+    return words
+
+
+def _is_equation(key):
+    return key == "equation" or key.endswith("_weights_equation")
+
+
+def equation_text(value):
+    """Return the lower case text of an equation parameter.
+
+    SERIES_EQUATION replaces every entity name found as a sub-string of the
+    equation, so the names used by an equation are found the same way.
+    """
+    return " ".join(_words(value)).lower()
+
+
+def block_io(block_name, parameters, written=()):
+    """Return the sets of resources read and written by a block.
+
+    Resources are tuples of (kind, name) where kind is one of "series",
+    "c_table", "s_table", "v_table", "e_table", "g_table", or "file".
+
+    Parameters
+    ----------
+    block_name : str
+        The upper case block name.
+    parameters : dict
+        The lower case keyword parameters of the block.
+    written : set
+        The resources written by earlier blocks.  Used to find the entities
+        referenced by name in equations.
+    """
+    reads = set()
+    writes = set()
+    sources = set()
+    for key, value in parameters.items():
+        match = _ENTITY_KEYWORD.match(key)
+        if match:
+            prefix, kind = match.groups()
+            names = {(kind, name.upper()) for name in _words(value)}
+            if prefix == "new":
+                writes.update(names)
+            else:
+                reads.update(names)
+                sources.update(names)
+        elif _is_equation(key):
+            text = equation_text(value)
+            reads.update(
+                resource
+                for resource in written
+                if resource[0] != "file" and resource[1].lower() in text
+            )
+        elif "file" in key:
+            names = {("file", os.path.normpath(name)) for name in _words(value)}
+            if key.startswith("new_") or block_name in ("LIST_OUTPUT", "PLOT"):
+                writes.update(names)
+            else:
+                reads.update(names)
+
+    if block_name in ("COPY", "MOVE"):
+        writes.update(
+            (kind, name.upper())
+            for kind, _ in sources
+            for name in _words(parameters["new_entity_name"])
+        )
+    if block_name in ("ERASE_ENTITY", "MOVE"):
+        writes.update(sources)
+    return reads, writes
+
+
+def dependencies(blocks):
+    """Return the set of earlier blocks that each block depends on.
+
+    Parameters
+    ----------
+    blocks : list
+        The list of [block_name, line_number, parameters] from the plan.
+
+    Returns
+    -------
+    list
+        For each block the set of indices of the blocks that must finish
+        before it can start.
+    """
+    last_writer = {}
+    readers = {}
+    written = set()
+    equations = []
+    last_side_effect = None
+    last_barrier = None
+    everything = set()
+    deps = []
+    for index, (block_name, _, parameters) in enumerate(blocks):
+        reads, writes = block_io(block_name, parameters, written)
+        needs = set()
+        for resource in reads | writes:
+            if resource in last_writer:
+                needs.add(last_writer[resource])
+        for resource in writes:
+            needs.update(readers.pop(resource, ()))
+            # An entity created after an equation that contains its name
+            # would change the meaning of the equation.
+            needs.update(
+                eq_index
+                for eq_index, text in equations
+                if resource[0] != "file" and resource[1].lower() in text
+            )
+        for resource in reads:
+            readers.setdefault(resource, set()).add(index)
+        for resource in writes:
+            last_writer[resource] = index
+        written.update(writes)
+        equations.extend(
+            (index, equation_text(value))
+            for key, value in parameters.items()
+            if _is_equation(key)
+        )
+
+        if block_name in SIDE_EFFECTS:
+            if last_side_effect is not None:
+                needs.add(last_side_effect)
+            last_side_effect = index
+        if block_name in BARRIERS:
+            needs.update(everything)
+            last_barrier = index
+        elif last_barrier is not None:
+            needs.add(last_barrier)
+        everything.add(index)
+
+        needs.discard(index)
+        deps.append(needs)
+    return deps
+
+
+def data_flow(blocks):
+    """Return where the inputs of each block come from.
+
+    Parameters
+    ----------
+    blocks : list
+        The list of [block_name, line_number, parameters] from the plan.
+
+    Returns
+    -------
+    tuple
+        Three lists with an entry for each block: the set of indices of the
+        earlier blocks that wrote something that the block reads, the set of
+        resources that the block reads, and the set of resources that the
+        block writes.
+    """
+    last_writer = {}
+    written = set()
+    producers = []
+    inputs = []
+    outputs = []
+    for index, (block_name, _, parameters) in enumerate(blocks):
+        reads, writes = block_io(block_name, parameters, written)
+        producers.append({last_writer[i] for i in reads if i in last_writer})
+        inputs.append(reads)
+        outputs.append(writes)
+        for resource in writes:
+            last_writer[resource] = index
+        written.update(writes)
+    return producers, inputs, outputs
+
+
+def live_blocks(blocks):
+    """Return the blocks needed by the blocks with side effects.
+
+    A block is live if it has side effects (LIST_OUTPUT, PLOT,
+    WRITE_PEST_FILES) or if a live block reads something that it writes.
+    ERASE_ENTITY and MOVE blocks are also live if the block that created the
+    entity that they remove is live, otherwise a later block that creates an
+    entity with the same name would fail.
+
+    Parameters
+    ----------
+    blocks : list
+        The list of [block_name, line_number, parameters] from the plan.
+
+    Returns
+    -------
+    tuple
+        The set of indices of the live blocks and for each block the set of
+        resources that it writes.
+    """
+    producers, _, outputs = data_flow(blocks)
+    live = {
+        index
+        for index, block in enumerate(blocks)
+        if block[0] in SIDE_EFFECTS | BARRIERS
+    }
+    changed = True
+    while changed:
+        changed = False
+        for index in sorted(live, reverse=True):
+            if not producers[index] <= live:
+                live.update(producers[index])
+                changed = True
+        for index, block in enumerate(blocks):
+            if (
+                index not in live
+                and block[0] in ("ERASE_ENTITY", "MOVE")
+                and producers[index] & live
+            ):
+                live.add(index)
+                changed = True
+    return live, outputs
+
+
+def shared_blocks(blocks, is_shared_file):
+    """Return the blocks that give the same result in every realization.
+
+    A block is shared if it has no side effects, writes no files, every file
+    that it reads is shared, and every block that it depends on is shared.
+    Running the shared blocks first and then the other blocks in file order
+    gives the same result as running all of the blocks in file order.
+
+    Parameters
+    ----------
+    blocks : list
+        The list of [block_name, line_number, parameters] from the plan.
+    is_shared_file : callable
+        Returns True if the file name given as the argument is the same file
+        in every realization.
+
+    Returns
+    -------
+    set
+        The indices of the shared blocks.
+    """
+    deps = dependencies(blocks)
+    _, inputs, outputs = data_flow(blocks)
+    shared = set()
+    for index, (block_name, _, _) in enumerate(blocks):
+        if block_name in SIDE_EFFECTS or not deps[index] <= shared:
+            continue
+        if any(kind == "file" for kind, _ in outputs[index]):
+            continue
+        if all(is_shared_file(name) for kind, name in inputs[index] if kind == "file"):
+            shared.add(index)
+    return shared
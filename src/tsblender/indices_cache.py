@@ -0,0 +1,177 @@
+"""Run-scoped cache of the building blocks of the hydrologic indices.
+
+"hydrotoolbox.indices" creates a new "Indices" object for every call, which
+groups the flows by month and water year, and every index recomputes the
+pulse counts, rolling means, and flow distributions that it needs even if
+another index of the same call or of an earlier HYDROLOGIC_INDICES block
+already computed them.
+
+The cache keeps one "CachedIndices" object for each series name, window of
+time, and "use_median".  The object is created from the prepared series the
+first time and keeps the monthly and water year groupings and aggregates,
+the median and mean, and the pulse counts for each threshold for every later
+block that asks for indices of the same series and window.  The object is
+given to a copy of "hydrotoolbox.indices", see "_indices_with".  The same
+entry keeps the flows arranged by year for the indices of each year, see
+"indices_years".
+"""
+
+import copy
+import inspect
+import types
+from importlib.metadata import version
+
+from hydrotoolbox import hydrotoolbox
+from hydrotoolbox.indices import indices
+
+from .indices_years import YearMatrix
+
+# The versions of hydrotoolbox, at least the first and less than the second,
+# that the cache works with.  With any other version the indices are
+# calculated by "hydrotoolbox.indices" without the cache.
+HYDROTOOLBOX_VERSIONS = ((2, 0, 12), (2, 1))
+
+
+def _memoized(name):
+    """Return a method that keeps the result of the "Indices" method "name".
+
+    Every caller gets a copy of the kept result so an index that changes the
+    result in place doesn't change it for the others.
+    """
+    method = getattr(indices.Indices, name)
+
+    def wrapper(self, *args):
+        key = (name, *args)
+        if key not in self._memo:
+            self._memo[key] = method(self, *args)
+        return copy.deepcopy(self._memo[key])
+
+    wrapper.__name__ = name
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
+class CachedIndices(indices.Indices):
+    """Indices that keep the intermediate results shared between indices.
+
+    Only the results of public methods are kept.  None of them depend on the
+    drainage area, so the same object is used for any drainage area.
+    """
+
+    def __init__(self, *args, **kwds):
+        super().__init__(*args, **kwds)
+        self._memo = {}
+
+    MA1 = _memoized("MA1")
+    MA2 = _memoized("MA2")
+    event_statistics = _memoized("event_statistics")
+
+
+def _supported():
+    """Return True if the cache works with the installed hydrotoolbox."""
+    try:
+        installed = tuple(int(i) for i in version("hydrotoolbox").split(".")[:3])
+    except ValueError:
+        return False
+    function = inspect.unwrap(hydrotoolbox.indices)
+    return (
+        HYDROTOOLBOX_VERSIONS[0] <= installed < HYDROTOOLBOX_VERSIONS[1]
+        and "ind" in function.__globals__
+    )
+
+
+def _indices_with(factory):
+    """Return a copy of "hydrotoolbox.indices" that uses "factory".
+
+    The copy creates its "Indices" object with "factory" instead of the
+    "Indices" class.  The "hydrotoolbox" module itself is not changed, so
+    other callers at the same time are not affected.
+    """
+    function = inspect.unwrap(hydrotoolbox.indices)
+    namespace = dict(function.__globals__)
+    namespace["ind"] = types.SimpleNamespace(Indices=factory)
+    bound = types.FunctionType(
+        function.__code__,
+        namespace,
+        function.__name__,
+        function.__defaults__,
+        function.__closure__,
+    )
+    bound.__kwdefaults__ = function.__kwdefaults__
+    return bound
+
+
+def _entry(cache, key, source, prepare):
+    """Return the cache entry of "key", made again if "source" changed."""
+    entry = cache.get(key)
+    if entry is None or entry["source"] is not source:
+        entry = cache[key] = {
+            "source": source,
+            "series": prepare(),
+            "indices": None,
+            "years": {},
+        }
+    return entry
+
+
+def year_matrix(cache, key, source, prepare, period):
+    """Return the YearMatrix of a series using the run cache.
+
+    The arguments are as for "calculate" and "period" is "water_year" or
+    "year".  Also returns the prepared series.
+    """
+    entry = _entry(cache, key, source, prepare)
+    if period not in entry["years"]:
+        entry["years"][period] = YearMatrix(entry["series"], period=period)
+    return entry["years"][period], entry["series"]
+
+
+def calculate(cache, key, source, prepare, codes, use_median, drainage_area):
+    """Return the hydrologic indices of a series using the run cache.
+
+    Parameters
+    ----------
+    cache : dict
+        The run cache, "key" to the cache entry.
+    key : tuple
+        The series name, the start and end of the window, and "use_median".
+    source : pandas.Series
+        The stored series.  An entry made from another series of the same
+        name, one that was erased and created again, is not used.
+    prepare : callable
+        Returns the series prepared for the window.
+    codes : list
+        The index codes, stream classifications, and flow components.
+    use_median, drainage_area
+        Passed to "hydrotoolbox.indices".
+
+    Returns
+    -------
+    values : dict
+        The "hydrotoolbox.indices" label to the value of each index.
+    series : pandas.Series
+        The prepared series.
+    """
+    entry = _entry(cache, key, source, prepare)
+    if not _supported():
+        values = hydrotoolbox.indices(
+            codes,
+            input_ts=entry["series"],
+            use_median=use_median,
+            drainage_area=drainage_area,
+        )
+        return values, entry["series"]
+
+    def factory(data, **kwds):
+        if entry["indices"] is None:
+            entry["indices"] = CachedIndices(data, **kwds)
+        entry["indices"].drainage_area = float(kwds["drainage_area"])
+        return entry["indices"]
+
+    values = _indices_with(factory)(
+        *codes,
+        input_ts=entry["series"],
+        use_median=use_median,
+        drainage_area=drainage_area,
+    )
+    return values, entry["series"]
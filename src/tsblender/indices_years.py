@@ -0,0 +1,243 @@
+"""Hydrologic indices of each year of a series.
+
+The flows are arranged in a matrix with a row for each year and the flows of
+the year in date order along the row, padded with NaN at the end of the
+shorter years.  Missing and negative flows are left out as by
+"hydrotoolbox.indices", so the rolling means and the pulses run over the
+flows that are present.  Every index is calculated for all years at once by
+reductions along the rows.
+
+Only the indices that are an annual statistic averaged over the years in
+the definitions of Olden and Poff (2003) have a value for each year.  The
+thresholds of the pulses are from the whole record.
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+_MONTHS = (
+    "January",
+    "February",
+    "March",
+    "April",
+    "May",
+    "June",
+    "July",
+    "August",
+    "September",
+    "October",
+    "November",
+    "December",
+)
+
+
+class YearMatrix:
+    """The flows of a series arranged by year."""
+
+    def __init__(self, series, period="water_year"):
+        values = series.to_numpy(dtype="float64", na_value=np.nan)
+        keep = values >= 0
+        values = values[keep]
+        dates = series.index[keep]
+        year = dates.year.to_numpy()
+        if period == "water_year":
+            year = year + (dates.month.to_numpy() >= 10)
+
+        self.years, start, count = np.unique(
+            year, return_index=True, return_counts=True
+        )
+        row = np.repeat(np.arange(len(self.years)), count)
+        position = np.arange(len(values)) - np.repeat(start, count)
+        shape = (len(self.years), count.max(initial=0))
+        self.flows = np.full(shape, np.nan)
+        self.flows[row, position] = values
+        self.months = np.zeros(shape, dtype="int64")
+        self.months[row, position] = dates.month
+        self.days = np.zeros(shape, dtype="int64")
+        self.days[row, position] = dates.dayofyear
+
+        self.thresholds = {}
+        if len(values):
+            self.thresholds = {
+                "mean": values.mean(),
+                "median": np.median(values),
+                "q25": np.quantile(values, 0.25),
+                "q75": np.quantile(values, 0.75),
+            }
+        self._pulses = {}
+
+    def rolling_mean(self, days):
+        """Return the mean of each "days" long window of flows of each year.
+
+        A year shorter than "days" has only NaN, and if every year is shorter
+        there is a single column of NaN.
+        """
+        if days > self.flows.shape[1]:
+            return np.full((self.flows.shape[0], 1), np.nan)
+        total = np.zeros((self.flows.shape[0], self.flows.shape[1] + 1))
+        np.cumsum(self.flows, axis=1, out=total[:, 1:])
+        return (total[:, days:] - total[:, :-days]) / days
+
+    def pulses(self, threshold, than):
+        """Return the number of pulses and of days above or below "threshold"."""
+        key = (threshold, than)
+        if key not in self._pulses:
+            with np.errstate(invalid="ignore"):
+                if than == ">":
+                    inside = self.flows > threshold
+                else:
+                    inside = self.flows < threshold
+            starts = inside.copy()
+            starts[:, 1:] &= ~inside[:, :-1]
+            self._pulses[key] = (
+                starts.sum(axis=1).astype("float64"),
+                inside.sum(axis=1).astype("float64"),
+            )
+        return self._pulses[key]
+
+    def day_of(self, extreme):
+        """Return the day of year of the first minimum or maximum flow."""
+        if extreme == "min":
+            column = np.where(np.isnan(self.flows), np.inf, self.flows).argmin(axis=1)
+        else:
+            column = np.where(np.isnan(self.flows), -np.inf, self.flows).argmax(axis=1)
+        return self.days[np.arange(len(column)), column].astype("float64")
+
+
+def _mean_flow(matrix, use_median):
+    return np.nanmean(matrix.flows, axis=1)
+
+
+def _median_flow(matrix, use_median):
+    return np.nanmedian(matrix.flows, axis=1)
+
+
+def _cv_flow(matrix, use_median):
+    return (
+        np.nanstd(matrix.flows, axis=1, ddof=1) / np.nanmean(matrix.flows, axis=1) * 100
+    )
+
+
+def _make_monthly(month, statistic):
+    def index(matrix, use_median):
+        flows = np.where(matrix.months == month, matrix.flows, np.nan)
+        if statistic == "mean" and use_median is True:
+            return np.nanmedian(flows, axis=1)
+        return getattr(np, f"nan{statistic}")(flows, axis=1)
+
+    return index
+
+
+def _make_rolling(days, statistic):
+    def index(matrix, use_median):
+        flows = matrix.flows if days == 1 else matrix.rolling_mean(days)
+        return getattr(np, f"nan{statistic}")(flows, axis=1)
+
+    return index
+
+
+def _make_pulses(than, threshold, times, result):
+    def index(matrix, use_median):
+        number, days = matrix.pulses(matrix.thresholds[threshold] * times, than)
+        if result == "number":
+            return number
+        if result == "days":
+            return days
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(number > 0, days / number, np.nan)
+
+    return index
+
+
+def _make_day_of(extreme):
+    def index(matrix, use_median):
+        return matrix.day_of(extreme)
+
+    return index
+
+
+def _indices():
+    """Return the index code to the description and function of each index."""
+    indices = {
+        "MA1": ("Mean of daily flows", _mean_flow),
+        "MA2": ("Median of daily flows", _median_flow),
+        "MA3": ("CV of daily flows", _cv_flow),
+    }
+    for number, month in enumerate(_MONTHS, start=1):
+        indices[f"MA{number + 11}"] = (
+            f"Mean daily flow: {month}",
+            _make_monthly(number, "mean"),
+        )
+        indices[f"ML{number}"] = (
+            f"Minimum daily flow: {month}",
+            _make_monthly(number, "min"),
+        )
+        indices[f"MH{number}"] = (
+            f"Maximum daily flow: {month}",
+            _make_monthly(number, "max"),
+        )
+    for number, days in enumerate((1, 3, 7, 30, 90), start=1):
+        indices[f"DL{number}"] = (
+            f"Minimum {days}-day mean flow",
+            _make_rolling(days, "min"),
+        )
+        indices[f"DH{number}"] = (
+            f"Maximum {days}-day mean flow",
+            _make_rolling(days, "max"),
+        )
+    for code, description, than, threshold, times, result in (
+        ("FL1", "Low pulses <25th percentile flow", "<", "q25", 1, "number"),
+        ("FL3", "Low pulses <5% of mean flow", "<", "mean", 0.05, "number"),
+        ("FH1", "High pulses >75th percentile flow", ">", "q75", 1, "number"),
+        ("FH3", "Days with flow >3 times median flow", ">", "median", 3, "days"),
+        ("FH4", "Days with flow >7 times median flow", ">", "median", 7, "days"),
+        ("FH5", "High pulses >median flow", ">", "median", 1, "number"),
+        ("FH6", "High pulses >3 times median flow", ">", "median", 3, "number"),
+        ("FH7", "High pulses >7 times median flow", ">", "median", 7, "number"),
+        ("FH8", "High pulses >75th percentile flow", ">", "q75", 1, "number"),
+        ("FH9", "High pulses >25th percentile flow", ">", "q25", 1, "number"),
+        ("DL16", "Duration of low pulses <25th percentile", "<", "q25", 1, "mean"),
+        ("DH15", "Duration of high pulses >75th percentile", ">", "q75", 1, "mean"),
+        ("DH17", "Duration of high pulses >median", ">", "median", 1, "mean"),
+        ("DH18", "Duration of high pulses >3 times median", ">", "median", 3, "mean"),
+        ("DH19", "Duration of high pulses >7 times median", ">", "median", 7, "mean"),
+        ("DH20", "Duration of high pulses >75th percentile", ">", "q75", 1, "mean"),
+        ("DH21", "Duration of high pulses >25th percentile", ">", "q25", 1, "mean"),
+    ):
+        indices[code] = (description, _make_pulses(than, threshold, times, result))
+    indices["TL1"] = ("Julian date of annual minimum", _make_day_of("min"))
+    indices["TH1"] = ("Julian date of annual maximum", _make_day_of("max"))
+    return indices
+
+
+# Index code to the description and the function that returns the value of
+# each year.
+INDICES = _indices()
+
+
+def _code_key(code):
+    return code[:2], int(code[2:])
+
+
+def calculate(matrix, codes, use_median=False):
+    """Return the indices of each year of "matrix".
+
+    Returns a Series indexed by the index label, "CODE: description", and
+    the year, in the natural order of the codes and then by year.
+    """
+    values = []
+    labels = []
+    with warnings.catch_warnings():
+        # Years without any value for an index, for example a month that is
+        # missing, give NaN.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        for code in sorted(set(codes), key=_code_key):
+            description, function = INDICES[code]
+            values.append(function(matrix, use_median))
+            labels.append(f"{code}: {description}")
+    return pd.Series(
+        np.concatenate(values) if values else np.array([], dtype="float64"),
+        index=pd.MultiIndex.from_product([labels, matrix.years]),
+    )
@@ -0,0 +1,121 @@
+"""Time and resources used by each block of a tsblender run.
+
+Every executed block is measured for wall time, CPU time, the change of the
+peak resident set size of the process, the number of rows in the series and
+tables that it reads and writes, and the size of the files that it reads and
+writes.  Entities and files are found with the same "block_io" used to find
+the dependencies between blocks.
+"""
+
+import json
+import os
+import sys
+import time
+from contextlib import suppress
+
+from .graph import block_io
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# The kinds of entities, each is stored in the Tables attribute of the same
+# name.
+_KINDS = ("series", "c_table", "s_table", "v_table", "e_table", "g_table")
+
+# Columns of the table: key of the measurement, heading, alignment and width,
+# and format of the value.
+_COLUMNS = [
+    ("block", "Block", "<28", "<28"),
+    ("line", "Line", ">6", ">6"),
+    ("wall_seconds", "Wall s", ">10", ">10.4f"),
+    ("cpu_seconds", "CPU s", ">10", ">10.4f"),
+    ("peak_rss_delta_bytes", "Peak RSS +B", ">13", ">13"),
+    ("rows_read", "Rows read", ">11", ">11"),
+    ("rows_written", "Rows written", ">13", ">13"),
+    ("bytes_read", "Bytes read", ">12", ">12"),
+    ("bytes_written", "Bytes written", ">14", ">14"),
+]
+
+
+def _peak_rss():
+    """Return the peak resident set size of the process in bytes or None."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _rows(tables, resources):
+    """Return the total number of rows of the entities in "resources"."""
+    rows = 0
+    for kind, name in resources:
+        if kind in _KINDS:
+            with suppress(KeyError):
+                rows += len(getattr(tables, kind)[name])
+    return rows
+
+
+def _bytes(resources):
+    """Return the total size of the files in "resources"."""
+    size = 0
+    for kind, name in resources:
+        if kind == "file":
+            with suppress(OSError):
+                size += os.path.getsize(name)
+    return size
+
+
+def measure(tables, block_name, lnum, parameters, function):
+    """Call "function" to run a block and return its measurements."""
+    existing = {(kind, name) for kind in _KINDS for name in getattr(tables, kind)}
+    reads, writes = block_io(block_name, parameters, existing)
+    rows_read = _rows(tables, reads)
+    bytes_read = _bytes(reads)
+    peak = _peak_rss()
+
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    function()
+    cpu = time.process_time() - cpu
+    wall = time.perf_counter() - wall
+
+    return {
+        "block": block_name,
+        "line": lnum,
+        "wall_seconds": wall,
+        "cpu_seconds": cpu,
+        "peak_rss_delta_bytes": None if peak is None else _peak_rss() - peak,
+        "rows_read": rows_read,
+        "rows_written": _rows(tables, writes),
+        "bytes_read": bytes_read,
+        "bytes_written": _bytes(writes),
+    }
+
+
+def report_table(entries):
+    """Return the measurements as a text table, slowest blocks first."""
+    lines = [" ".join(f"{heading:{width}}" for _, heading, width, _ in _COLUMNS)]
+    for entry in sorted(entries, key=lambda entry: -entry["wall_seconds"]):
+        lines.append(
+            " ".join(
+                f"{'-':{width}}" if entry[key] is None else f"{entry[key]:{fmt}}"
+                for key, _, width, fmt in _COLUMNS
+            )
+        )
+    total_wall = sum(entry["wall_seconds"] for entry in entries)
+    total_cpu = sum(entry["cpu_seconds"] for entry in entries)
+    lines.append(
+        f"{len(entries)} blocks, {total_wall:.4f} wall seconds, {total_cpu:.4f} CPU seconds."
+    )
+    return "\n".join(lines) + "\n"
+
+
+def write_report(entries, profile, version):
+    """Write the measurements to "{profile}.txt" and "{profile}.json"."""
+    with open(f"{profile}.txt", "w", encoding="utf-8") as fpo:
+        fpo.write(report_table(entries))
+    with open(f"{profile}.json", "w", encoding="utf-8") as fpo:
+        json.dump({"tsblender": version, "blocks": entries}, fpo, indent=1)
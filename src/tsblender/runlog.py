@@ -0,0 +1,72 @@
+"""Buffered output and the JSON-lines run log of a tsblender run.
+
+Messages have a level and are only kept if the level is at or below the
+level of the run: "quiet" keeps nothing, "summary" keeps a few lines for the
+whole run, and "verbose" also keeps the listing of every block.  Kept
+messages are collected and written to standard output all at once by
+"flush".
+
+The run log has a JSON object on each line for the start and end of the run
+and of every block with the time in seconds since the epoch.
+"""
+
+import json
+import sys
+import time
+
+from tsblender.toolbox_utils.src.toolbox_utils import tsutils
+
+LEVELS = ("quiet", "summary", "verbose")
+
+
+class RunLog:
+    """Collect the output of a run and write the optional run log."""
+
+    def __init__(self, level="verbose", run_log=None):
+        if level not in LEVELS:
+            raise ValueError(
+                tsutils.error_wrapper(
+                    f"""
+                    The log level must be one of {LEVELS}.  You gave
+                    "{level}".
+                    """
+                )
+            )
+        self.level = LEVELS.index(level)
+        self._lines = []
+        self._events = open(run_log, "w", encoding="utf-8") if run_log else None  # noqa: SIM115
+
+    def keeps(self, level):
+        """Return True if messages of "level" are kept."""
+        return LEVELS.index(level) <= self.level
+
+    def write(self, text, level="verbose"):
+        """Keep a line of output if "level" is at or below the run level."""
+        if self.keeps(level):
+            self._lines.append(f"{text}\n")
+
+    def flush(self, events=False):
+        """Write the kept output to standard output.
+
+        If "events" is True also write the buffered events to the run log,
+        needed before forking a process.
+        """
+        if self._lines:
+            sys.stdout.write("".join(self._lines))
+            self._lines.clear()
+        if events and self._events is not None:
+            self._events.flush()
+
+    def event(self, event, **fields):
+        """Write an event to the run log."""
+        if self._events is not None:
+            self._events.write(
+                json.dumps({"time": time.time(), "event": event, **fields}) + "\n"
+            )
+
+    def close(self):
+        """Write everything and close the run log."""
+        self.flush()
+        if self._events is not None:
+            self._events.close()
+            self._events = None
@@ -20,7 +20,7 @@ def series_clean(
     """Clean a time series by replacing/removing values outside of a range."""
     if substitute_value == "delete":
         substitute_value = pd.NA
-    series = self._get_series(series_name)
+    series = self._get_series(series_name).copy()
     if isinstance(lower_erase_boundary, (int, float)):
         series[series >= lower_erase_boundary] = substitute_value
     if isinstance(upper_erase_boundary, (int, float)):
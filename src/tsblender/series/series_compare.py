@@ -3,11 +3,224 @@ try:
 except ImportError:
     from pydantic import validate_arguments as validate_call
 
-from typing import Optional
+from typing import Literal, Optional
 
 import numpy as np
 import pandas as pd
-from tstoolbox.functions.gof import gof
+from pandas.tseries.frequencies import to_offset
+
+from tsblender.toolbox_utils.src.toolbox_utils import tsutils
+
+# The c_table label of each statistic in the order of the c_table.
+GOF_LABELS = {
+    "bias": "Bias:",
+    "standard_error": "Standard error:",
+    "relative_bias": "Relative bias:",
+    "relative_standard_error": "Relative standard error:",
+    "nash_sutcliffe": "Nash-Sutcliffe coefficient:",
+    "coefficient_of_efficiency": "Coefficient of efficiency:",
+    "index_of_agreement": "Index of agreement:",
+    "volumetric_efficiency": "Volumetric efficiency:",
+}
+
+
+# The pandas offset of the end of each PERIOD of SERIES_COMPARE.
+PERIODS = {
+    "year": tsutils.pandas_offset_by_version("YE-DEC"),
+    "water_year": tsutils.pandas_offset_by_version("YE-SEP"),
+    "month": tsutils.pandas_offset_by_version("ME"),
+    "season": tsutils.pandas_offset_by_version("QE-NOV"),
+}
+
+# The season that ends in each month of the "season" offset.
+_SEASONS = {2: "DJF", 5: "MAM", 8: "JJA", 11: "SON"}
+
+
+def _aligned(sim, obs, base=None):
+    """Return the dates and values of the series where all are finite."""
+    series = [sim, obs] if base is None else [sim, obs, base]
+    if all(i.index.equals(sim.index) for i in series[1:]):
+        index = sim.index
+        values = [i.to_numpy(dtype="float64", na_value=np.nan) for i in series]
+    else:
+        frame = pd.concat(series, axis="columns", join="inner")
+        index = frame.index
+        values = [
+            frame.iloc[:, i].to_numpy(dtype="float64", na_value=np.nan)
+            for i in range(len(series))
+        ]
+    mask = np.isfinite(values[0])
+    for i in values[1:]:
+        mask &= np.isfinite(i)
+    return index[mask], [i[mask] for i in values]
+
+
+def _statistics(sim, obs, base, statistics, exponent, starts=None):
+    """Calculate the statistics of the aligned values.
+
+    If "starts" is None the statistics are of all of the values, otherwise
+    "starts" are the positions where consecutive, non-empty segments begin
+    and each statistic is an array with the value for each segment.
+    """
+    if starts is None:
+        count = len(obs)
+        total = np.sum
+
+        def spread(value):
+            return value
+
+    else:
+        count = np.diff(np.append(starts, len(obs)))
+
+        def total(value):
+            return np.add.reduceat(value, starts)
+
+        def spread(value):
+            return np.repeat(value, count)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        residual = sim - obs
+        abs_residual = np.abs(residual)
+        obs_mean = total(obs) / count
+        values = {}
+        if {"bias", "relative_bias"} & set(statistics):
+            values["bias"] = total(residual) / count
+            values["relative_bias"] = values["bias"] / obs_mean
+        if {"standard_error", "relative_standard_error"} & set(statistics):
+            values["standard_error"] = np.sqrt(total(residual**2) / count)
+            values["relative_standard_error"] = values["standard_error"] / obs_mean
+        if "nash_sutcliffe" in statistics:
+            values["nash_sutcliffe"] = 1 - (
+                total(abs_residual**2) / total(np.abs(obs - spread(obs_mean)) ** 2)
+            )
+        if {"coefficient_of_efficiency", "index_of_agreement"} & set(statistics):
+            base = base if base is not None else spread(obs_mean)
+            sum_abs_residual = total(abs_residual) ** exponent
+            obs_base = np.abs(obs - base)
+            values["coefficient_of_efficiency"] = 1 - (
+                sum_abs_residual / total(obs_base) ** exponent
+            )
+            values["index_of_agreement"] = 1 - (
+                sum_abs_residual / total(np.abs(sim - base) + obs_base) ** exponent
+            )
+        if "volumetric_efficiency" in statistics:
+            values["volumetric_efficiency"] = 1 - (total(abs_residual) / total(obs))
+    return {
+        label: values[key] for key, label in GOF_LABELS.items() if key in statistics
+    }
+
+
+def gof_statistics(sim, obs, statistics, base=None, exponent=2):
+    """Calculate goodness of fit statistics in one pass over the residuals.
+
+    The series are aligned once and only the dates where the simulated,
+    observed, and base, if given, values are all finite are used by every
+    statistic.  The residuals and the deviations of the observed values are
+    calculated once and shared by the statistics.
+
+    Parameters
+    ----------
+    sim, obs : pandas.Series
+        The simulated and observed series.
+    statistics : list
+        Keys of GOF_LABELS.
+    base : pandas.Series, optional
+        The base series of the coefficient of efficiency and the index of
+        agreement.  The default is the mean of the observed values.
+    exponent : int
+        The exponent of the coefficient of efficiency and the index of
+        agreement.
+
+    Returns
+    -------
+    dict
+        The c_table label to the value of each statistic.
+    """
+    _, (sim, obs, *base) = _aligned(sim, obs, base)
+    return _statistics(sim, obs, base[0] if base else None, statistics, exponent)
+
+
+def _period_label(end, kind):
+    """Return the window label of the period that ends at "end"."""
+    if kind == "season":
+        return f"{end.year}_{_SEASONS[end.month]}"
+    if kind == "month":
+        return end.strftime("%Y-%m")
+    return str(end.year)
+
+
+def window_statistics(
+    sim, obs, statistics, period=None, window_dates=None, base=None, exponent=2
+):
+    """Calculate goodness of fit statistics for each window of time.
+
+    The series are aligned once as in "gof_statistics" and the statistics of
+    all windows are calculated together with segmented sums over the
+    residuals.  Windows without any common values are left out.
+
+    Parameters
+    ----------
+    sim, obs : pandas.Series
+        The simulated and observed series.
+    statistics : list
+        Keys of GOF_LABELS.
+    period : str, optional
+        One of the keys of PERIODS, a window for each period.
+    window_dates : list, optional
+        The sorted dates that separate the windows.  A window starts at each
+        date and ends just before the next, values before the first date and
+        at or after the last date are not used.
+    base : pandas.Series, optional
+        The base series of the coefficient of efficiency and the index of
+        agreement.  The default is the mean of the observed values of each
+        window.
+    exponent : int
+        The exponent of the coefficient of efficiency and the index of
+        agreement.
+
+    Returns
+    -------
+    windows : pandas.DataFrame
+        The "start_date", "end_date", and "num_terms" of each window indexed
+        by the window label.
+    stats : pandas.DataFrame
+        The statistics with a column for each c_table label indexed by the
+        window label.
+    """
+    index, (sim, obs, *base) = _aligned(sim, obs, base)
+    if period is not None:
+        # Roll each date forward to the end of its period.
+        ends = index.normalize() + to_offset(PERIODS[period]) * 0
+        starts = np.flatnonzero(np.diff(ends.asi8)) + 1
+        if len(index):
+            starts = np.insert(starts, 0, 0)
+        labels = [_period_label(i, period) for i in ends[starts]]
+    else:
+        bounds = index.searchsorted(pd.DatetimeIndex(window_dates))
+        labels = [str(i) for i in range(1, len(bounds))]
+        keep = bounds[1:] > bounds[:-1]
+        labels = [label for label, kept in zip(labels, keep) if kept]
+        starts = bounds[:-1][keep]
+        index = index[bounds[0] : bounds[-1]]
+        sim, obs, *base = (i[bounds[0] : bounds[-1]] for i in [sim, obs, *base])
+        starts = starts - bounds[0]
+
+    ends = np.append(starts[1:], len(index)) - 1
+    windows = pd.DataFrame(
+        {
+            "start_date": index[starts],
+            "end_date": index[ends],
+            "num_terms": np.diff(np.append(starts, len(index))),
+        },
+        index=labels,
+    )
+    if not labels:
+        columns = [label for key, label in GOF_LABELS.items() if key in statistics]
+        return windows, pd.DataFrame(index=labels, columns=columns, dtype="float64")
+    stats = _statistics(
+        sim, obs, base[0] if base else None, statistics, exponent, starts=starts
+    )
+    return windows, pd.DataFrame(stats, index=labels)
 
 
 @validate_call
@@ -51,10 +264,26 @@ def series_compare(
     time_1: Optional[str] = None,
     date_2: Optional[str] = None,
     time_2: Optional[str] = None,
+    period: Optional[Literal["year", "water_year", "month", "season"]] = None,
+    window_dates: str = "",
 ):
-    """Calculate comparison statistics for two time series."""
+    """Calculate comparison statistics for two time series.
+
+    If "period" or "window_dates" is given the statistics are calculated for
+    each window of time and the c_table is indexed by the window label and
+    the statistic.  The "window_dates" are separated by commas, since
+    separating them with spaces would unroll the block.
+    """
     if exponent not in [1, 2]:
         raise ValueError(f"exponent must be 1 or 2, not {exponent}")
+    if period and window_dates:
+        raise ValueError(
+            tsutils.error_wrapper(
+                """
+                Only one of 'PERIOD' or 'WINDOW_DATES' can be given.
+                """
+            )
+        )
 
     series_sim = self._prepare_series(
         series_name_sim,
@@ -81,46 +310,72 @@ def series_compare(
     else:
         series_base = None
 
-    stats = {}
-    if self._normalize_bools(bias):
-        stats["Bias:"] = gof(stats="me", sim_col=series_sim, obs_col=series_obs)[0][1]
-    if self._normalize_bools(standard_error):
-        stats["Standard error:"] = gof(
-            stats="rmse", sim_col=series_sim, obs_col=series_obs
-        )[0][1]
-    if self._normalize_bools(relative_bias):
-        stats["Relative bias:"] = (
-            gof(stats="me", sim_col=series_sim, obs_col=series_obs)[0][1]
-            / series_obs.mean()
+    requested = {
+        "bias": bias,
+        "standard_error": standard_error,
+        "relative_bias": relative_bias,
+        "relative_standard_error": relative_standard_error,
+        "nash_sutcliffe": nash_sutcliffe,
+        "coefficient_of_efficiency": coefficient_of_efficiency,
+        "index_of_agreement": index_of_agreement,
+        "volumetric_efficiency": volumetric_efficiency,
+    }
+    statistics = [
+        key for key, value in requested.items() if self._normalize_bools(value)
+    ]
+
+    if not (period or window_dates):
+        stats = gof_statistics(
+            series_sim, series_obs, statistics, base=series_base, exponent=exponent
         )
-    if self._normalize_bools(relative_standard_error):
-        stats["Relative standard error:"] = gof(
-            stats="nrmse_mean", sim_col=series_sim, obs_col=series_obs
-        )[0][1]
-    if self._normalize_bools(nash_sutcliffe):
-        stats["Nash-Sutcliffe coefficient:"] = gof(
-            stats="nse", sim_col=series_sim, obs_col=series_obs
-        )[0][1]
-    if self._normalize_bools(coefficient_of_efficiency):
-        stats["Coefficient of efficiency:"] = self.coefficient_of_efficiency(
-            series_sim, series_obs, obs_par_b=series_base, exponent=exponent
+
+        nc_table = pd.DataFrame.from_dict(stats, orient="index")
+
+        self._join(new_c_table_name, c_table=nc_table)
+        self.c_table_metadata[new_c_table_name.upper()] = {
+            "sim_name": series_name_sim,
+            "obs_name": series_name_obs,
+            "start_date": series_sim.index[0],
+            "end_date": series_sim.index[-1],
+            "num_terms": min(len(series_sim), len(series_obs)),
+        }
+        return
+
+    if window_dates:
+        window_dates = sorted(
+            pd.Timestamp(self._normalize_datetimes(date.strip()))
+            for date in window_dates.split(",")
         )
-    if self._normalize_bools(index_of_agreement):
-        stats["Index of agreement:"] = self.index_of_agreement(
-            series_sim, series_obs, obs_par_b=series_base, exponent=exponent
+    windows, stats = window_statistics(
+        series_sim,
+        series_obs,
+        statistics,
+        period=period,
+        window_dates=window_dates or None,
+        base=series_base,
+        exponent=exponent,
+    )
+    if windows.empty:
+        raise ValueError(
+            tsutils.error_wrapper(
+                f"""
+                There are no common values of "{series_name_sim}" and
+                "{series_name_obs}" in any window of time.
+                """
+            )
         )
-    if self._normalize_bools(volumetric_efficiency):
-        stats["Volumetric efficiency:"] = gof(
-            stats="ve", sim_col=series_sim, obs_col=series_obs
-        )[0][1]
 
-    nc_table = pd.DataFrame.from_dict(stats, orient="index")
-
-    self._join(new_c_table_name, c_table=nc_table)
+    # Every window has every statistic, even if it is NaN.
+    c_table = pd.Series(
+        stats.to_numpy().ravel(),
+        index=pd.MultiIndex.from_product([stats.index, stats.columns]),
+    )
+    self._join(new_c_table_name, c_table=c_table)
     self.c_table_metadata[new_c_table_name.upper()] = {
         "sim_name": series_name_sim,
         "obs_name": series_name_obs,
-        "start_date": series_sim.index[0],
-        "end_date": series_sim.index[-1],
-        "num_terms": min(len(series_sim), len(series_obs)),
+        "start_date": windows["start_date"].iloc[0],
+        "end_date": windows["end_date"].iloc[-1],
+        "num_terms": int(windows["num_terms"].sum()),
+        "windows": windows,
     }
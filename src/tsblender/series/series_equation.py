@@ -26,23 +26,23 @@ def _series_equation(
             series_in_equation = i.upper()
 
     # v_table
-    for i in self.v_table.columns:
+    for i in self.v_table:
         equation = equation.replace(i.lower(), f"self._get_v_table('{i.upper()}')")
 
     # c_table
-    for i in self.c_table.columns:
+    for i in self.c_table:
         equation = equation.replace(i.lower(), f"self._get_c_table('{i.upper()}')")
 
     # s_table
-    for i in self.s_table.columns:
+    for i in self.s_table:
         equation = equation.replace(i.lower(), f"self._get_s_table('{i.upper()}')")
 
     # e_table
-    for i in self.e_table.columns:
+    for i in self.e_table:
         equation = equation.replace(i.lower(), f"self._get_e_table('{i.upper()}')")
 
     # g_table
-    for i in self.g_table.columns:
+    for i in self.g_table:
         equation = equation.replace(i.lower(), f"self._get_g_table('{i.upper()}')")
 
     equation = equation.replace("^", "**")
@@ -0,0 +1,135 @@
+"""Warm server and thin client to run tsblender scripts repeatedly.
+
+PEST runs the model command line once for every model run.  Starting a new
+python interpreter and importing tsblender and all of its dependencies for
+every run can take longer than processing the script.  The server imports
+everything once and then forks a child process for every request, so each run
+starts from a clean ``Tables`` instance in the working directory of the
+client.
+"""
+
+import contextlib
+import getpass
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+
+
+def default_socket():
+    """Return the default path of the UNIX socket.
+
+    The ``TSBLENDER_SOCKET`` environment variable overrides the default.
+    """
+    return os.environ.get(
+        "TSBLENDER_SOCKET",
+        os.path.join(tempfile.gettempdir(), f"tsblender-{getpass.getuser()}.sock"),
+    )
+
+
+def _run_request(request):
+    """Run one request in the current process and collect the output."""
+    from . import tsblender
+
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    status = 0
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            os.chdir(request["cwd"])
+            tsblender.run(request["infile"], request.get("running_context"))
+        except Exception as exc:  # noqa: BLE001
+            status = 1
+            if os.path.exists("debug_tsblender"):
+                import traceback
+
+                traceback.print_exc()
+            else:
+                print(f"{type(exc).__name__}: {exc}", file=sys.stderr)
+    return {
+        "status": status,
+        "stdout": stdout.getvalue(),
+        "stderr": stderr.getvalue(),
+    }
+
+
+class _RunHandler(socketserver.StreamRequestHandler):
+    """Handle a single JSON encoded run request."""
+
+    def handle(self):
+        request = json.loads(self.rfile.readline())
+        reply = _run_request(request)
+        self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+
+
+class _ForkingUnixServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    """Fork a new process for each request."""
+
+
+def serve(socket_path=None):
+    """Start a warm tsblender server listening on a local UNIX socket.
+
+    Parameters
+    ----------
+    socket_path : str, optional
+        The path of the UNIX socket.  The default is the value of the
+        TSBLENDER_SOCKET environment variable or "tsblender-{user}.sock" in
+        the temporary directory.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise OSError("The tsblender server requires UNIX domain sockets.")
+    if socket_path is None:
+        socket_path = default_socket()
+    from .tsblender import _preload
+
+    _preload()
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(socket_path)
+    with _ForkingUnixServer(socket_path, _RunHandler) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(socket_path)
+
+
+def client(infile, running_context=None, socket_path=None):
+    """Run a tsblender script on a warm server and return the exit status.
+
+    The standard output and standard error of the run on the server are
+    written to the standard output and standard error of the client.
+
+    Parameters
+    ----------
+    infile : str
+        The tsproc file to parse.
+    running_context : str, optional
+        The context to run in the tsproc file.  The default is None which uses
+        the context specified in the SETTINGS block in the tsproc/tsblender
+        file.
+    socket_path : str, optional
+        The path of the UNIX socket.  The default is the value of the
+        TSBLENDER_SOCKET environment variable or "tsblender-{user}.sock" in
+        the temporary directory.
+    """
+    if socket_path is None:
+        socket_path = default_socket()
+    request = {
+        "infile": infile,
+        "running_context": running_context,
+        "cwd": os.getcwd(),
+    }
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        with sock.makefile("rwb") as stream:
+            stream.write(json.dumps(request).encode("utf-8") + b"\n")
+            stream.flush()
+            reply = json.loads(stream.readline())
+    sys.stdout.write(reply["stdout"])
+    sys.stderr.write(reply["stderr"])
+    return reply["status"]
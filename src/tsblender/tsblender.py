@@ -1,21 +1,19 @@
 """Collection of functions for the manipulation of time series."""
 
 import datetime
+import importlib
+import io
 import os.path
 import re
 import sys
+import time
 from collections import OrderedDict
-from contextlib import nullcontext, suppress
+from contextlib import suppress
 from typing import Literal, Optional, Union
 
 import cltoolbox
 import numpy as np
 import pandas as pd
-from dateutil.parser import parse
-from fortranformat import FortranRecordWriter
-from hydrotoolbox import hydrotoolbox
-from hydrotoolbox.hydrotoolbox import baseflow_sep
-from matplotlib import pyplot as plt
 from pydantic import Field
 from typing_extensions import Annotated
 
@@ -24,11 +22,74 @@ try:
 except ImportError:
     from pydantic import validate_arguments as validate_call
 
-from scipy import signal
-
 from tsblender.toolbox_utils.src.toolbox_utils import tsutils
 
-__all__ = ["about", "run"]
+__all__ = ["about", "evaluate", "parse", "run", "run_batch"]
+
+# Number of rows of a series formatted and written at a time by LIST_OUTPUT.
+_LIST_OUTPUT_CHUNK = 100000
+
+# Number of observations formatted and written at a time by WRITE_PEST_FILES.
+_WRITE_PEST_FILES_CHUNK = 100000
+
+
+def _instruction_lines(name, nrows, line_skip, columns):
+    """Return the PEST instructions to read "nrows" lines of LIST_OUTPUT.
+
+    The first observation is "line_skip" lines after the previous one and the
+    others are on consecutive lines, with the observation names "{name}1",
+    "{name}2", ... read from "columns" of each line.
+    """
+    if nrows == 0:
+        return ""
+    lines = [f"l{line_skip:<4}[{name}1]{columns}\n"]
+
+    # The other lines are built as a matrix of bytes for each number of
+    # digits in the row number.
+    prefix = np.frombuffer(f"l1   [{name}".encode(), dtype=np.uint8)
+    suffix = np.frombuffer(f"]{columns}\n".encode(), dtype=np.uint8)
+    start = 2
+    width = 1
+    while start <= nrows:
+        stop = min(10**width, nrows + 1)
+        if stop > start:
+            line = np.empty(
+                (stop - start, len(prefix) + width + len(suffix)), dtype=np.uint8
+            )
+            line[:, : len(prefix)] = prefix
+            line[:, len(prefix) + width :] = suffix
+            number = np.arange(start, stop, dtype=np.int64)
+            for column in range(len(prefix) + width - 1, len(prefix) - 1, -1):
+                line[:, column] = number % 10 + ord("0")
+                number //= 10
+            lines.append(line.tobytes().decode())
+            start = stop
+        width = width + 1
+    return "".join(lines)
+
+
+def _observation_lines(model, values, weights):
+    """Yield the "* observation data" lines of the observations of "model".
+
+    The observations are named "{model}1", "{model}2", ... and every line
+    starts with a newline.  The lines are formatted in chunks so that a large
+    number of observations are never held as Python objects all at once.
+    """
+    width = max(20 - len(model), 1)
+    model = model.replace("%", "%%")
+    line = f"\n{model}%-{width}d %15f %15f {model}"
+    for first in range(0, len(values), _WRITE_PEST_FILES_CHUNK):
+        last = min(first + _WRITE_PEST_FILES_CHUNK, len(values))
+        yield "".join(
+            map(
+                line.__mod__,
+                zip(
+                    range(first + 1, last + 1),
+                    values[first:last].tolist(),
+                    weights[first:last].tolist(),
+                ),
+            )
+        )
 
 
 def about():
@@ -51,6 +112,9 @@ deprecated = {
 
 def natural_keys(text):
     """Sort strings with embedded numbers naturally."""
+    if isinstance(text, tuple):
+        # The (index, year) of the hydrologic indices of each year.
+        return (natural_keys(text[0]), *text[1:])
     if not isinstance(text, str):
         return text
     if ":" not in text:
@@ -63,28 +127,81 @@ def natural_keys(text):
     return lets + nums
 
 
+class _LazyMethod:
+    """Descriptor that imports a block implementation on first use.
+
+    Accessing the attribute returns a callable without importing anything, so
+    building the ``Tables.funcs`` dispatch table stays cheap.  The module is
+    imported when the callable is first called and the real function then
+    replaces the descriptor on the class.
+    """
+
+    def __init__(self, module):
+        self.module = module
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def load(self, owner):
+        """Import the module and replace the descriptor with the function."""
+        func = getattr(importlib.import_module(self.module, __package__), self.name)
+        setattr(owner, self.name, func)
+        return func
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self.load(owner)
+
+        def call(*args, **kwds):
+            return self.load(type(instance))(instance, *args, **kwds)
+
+        return call
+
+
+def _as_float_series(data, name):
+    """Return a float64 copy of a series or of the first column of a frame."""
+    if isinstance(data, pd.DataFrame):
+        data = data.iloc[:, 0]
+    data = pd.to_numeric(pd.Series(data), errors="coerce").astype("float64")
+    data.name = name
+    return data
+
+
+# The stores of the entities of each kind, keyed by the entity name.
+_ENTITY_STORES = {
+    "series": ("series", "current_series", "series_dates"),
+    "v_table": ("v_table", "v_table_metadata"),
+    "c_table": ("c_table", "c_table_metadata"),
+    "s_table": ("s_table", "s_table_metadata"),
+    "e_table": ("e_table", "e_table_tot", "e_table_metadata"),
+    "g_table": ("g_table", "g_table_metadata"),
+}
+
+
 class Tables:
     """Class to hold the tables."""
 
     def __init__(self):
+        # Series name to a float64 pandas Series with its own index.
         self.series = {}
         self.current_series = {}
         self.series_dates = {}
 
-        self.v_table = pd.DataFrame()
+        # Table name to a float64 pandas Series with its own index.
+        self.v_table = {}
         self.v_table_metadata = {}
 
-        self.c_table = pd.DataFrame()
-        self.c_table_metadata = pd.DataFrame()
+        self.c_table = {}
+        self.c_table_metadata = {}
 
-        self.s_table = pd.DataFrame()
+        self.s_table = {}
         self.s_table_metadata = {}
 
-        self.e_table = pd.DataFrame()
-        self.e_table_tot = pd.DataFrame()
+        self.e_table = {}
+        self.e_table_tot = {}
         self.e_table_metadata = {}
 
-        self.g_table = pd.DataFrame()
+        self.g_table = {}
         self.g_table_metadata = {}
 
         self.date_format = "%Y-%m-%d"
@@ -96,6 +213,30 @@ class Tables:
         self.list_output_arguments = {}
         self.last_list_output = ""
 
+        # If False LIST_OUTPUT only records its arguments and PLOT and
+        # WRITE_PEST_FILES are not run, see "execute".
+        self.write_files = True
+
+        # The measurements of every executed block if profiling, see "run".
+        self.block_profile = None
+
+        # The output of the run, see "run".
+        from .runlog import RunLog
+
+        self.log = RunLog()
+
+        # Parsed input files, see _read_cached.
+        self._file_cache = {}
+        self._file_cache_dir = None
+
+        # The variables and date windows that the blocks being run read from
+        # each STATVAR file, see _plan_reads.
+        self._statvar_reads = {}
+
+        # Prepared series and shared intermediate results of the hydrologic
+        # indices, see hydrologic_indices.
+        self._indices_cache = {}
+
         self.funcs = {
             "SETTINGS": {
                 "args": ["context", "date_format"],
@@ -442,6 +583,7 @@ class Tables:
                     "DATE_2": None,
                     "TIME_2": None,
                     "CURRENT_DEFINITIONS": False,
+                    "PERIOD": None,
                 },
                 "f": self.hydrologic_indices,
             },
@@ -600,6 +742,8 @@ class Tables:
                     "TIME_1": None,
                     "DATE_2": None,
                     "TIME_2": None,
+                    "PERIOD": None,
+                    "WINDOW_DATES": None,
                 },
                 "f": self.series_compare,
             },
@@ -722,30 +866,31 @@ class Tables:
             },
         }
 
-    from .get_series.get_series_csv import get_series_csv
-    from .get_series.get_series_gsflow_gage import get_series_gsflow_gage
-    from .get_series.get_series_hspfbin import get_series_hspfbin
-    from .get_series.get_series_plotgen import get_series_plotgen
-    from .get_series.get_series_ssf import get_series_ssf
-    from .get_series.get_series_statvar import get_series_statvar
-    from .get_series.get_series_tetrad import get_series_tetrad
-    from .get_series.get_series_ufore_hydro import get_series_ufore_hydro
-    from .get_series.get_series_wdm import get_series_wdm
-    from .get_series.get_series_xlsx import get_series_xlsx
-    from .series.series_base_level import series_base_level
-    from .series.series_clean import series_clean
-    from .series.series_compare import (
-        coefficient_of_efficiency,
-        index_of_agreement,
-        series_compare,
-    )
-    from .series.series_difference import series_difference
-    from .series.series_displace import series_displace
-    from .series.series_equation import _series_equation, series_equation
-    from .series.series_statistics import series_statistics
+    # The block implementations in the "get_series" and "series" modules are
+    # only imported the first time that they are called.
+    get_series_csv = _LazyMethod(".get_series.get_series_csv")
+    get_series_gsflow_gage = _LazyMethod(".get_series.get_series_gsflow_gage")
+    get_series_hspfbin = _LazyMethod(".get_series.get_series_hspfbin")
+    get_series_plotgen = _LazyMethod(".get_series.get_series_plotgen")
+    get_series_ssf = _LazyMethod(".get_series.get_series_ssf")
+    get_series_statvar = _LazyMethod(".get_series.get_series_statvar")
+    get_series_tetrad = _LazyMethod(".get_series.get_series_tetrad")
+    get_series_ufore_hydro = _LazyMethod(".get_series.get_series_ufore_hydro")
+    get_series_wdm = _LazyMethod(".get_series.get_series_wdm")
+    get_series_xlsx = _LazyMethod(".get_series.get_series_xlsx")
+    series_base_level = _LazyMethod(".series.series_base_level")
+    series_clean = _LazyMethod(".series.series_clean")
+    coefficient_of_efficiency = _LazyMethod(".series.series_compare")
+    index_of_agreement = _LazyMethod(".series.series_compare")
+    series_compare = _LazyMethod(".series.series_compare")
+    series_difference = _LazyMethod(".series.series_difference")
+    series_displace = _LazyMethod(".series.series_displace")
+    _series_equation = _LazyMethod(".series.series_equation")
+    series_equation = _LazyMethod(".series.series_equation")
+    series_statistics = _LazyMethod(".series.series_statistics")
 
     def _get_c_table(self, c_table_name: str):
-        """Get a c_table from the c_table dataframe."""
+        """Get a c_table from the c_table store."""
 
         c_table = [
             "Bias:",
@@ -757,28 +902,52 @@ class Tables:
             "Index of agreement:",
             "Volumetric efficiency:",
         ]
-        return self.c_table[c_table_name.upper()].reindex(c_table).dropna()
+        table = self.c_table[c_table_name.upper()]
+        if table.index.nlevels == 2:
+            # A c_table of SERIES_COMPARE with windows is indexed by the
+            # window label and the statistic.
+            return table.reindex(c_table, level=1).dropna()
+        return table.reindex(c_table).dropna()
+
+    def _c_table_windows(self, c_table_names):
+        """Yield the c_tables to list, each window of a c_table on its own.
+
+        Yields the name, the window title, the metadata, and the statistics.
+        """
+        for c_tab in c_table_names:
+            stats = self._get_c_table(c_tab)
+            ctab = self.c_table_metadata[c_tab.upper()]
+            if "windows" not in ctab:
+                yield c_tab, "", ctab, stats
+                continue
+            for label, window in ctab["windows"].iterrows():
+                if label not in stats.index.get_level_values(0):
+                    continue
+                yield (
+                    c_tab,
+                    f' window "{label}"',
+                    {**ctab, **window.to_dict()},
+                    stats.loc[label],
+                )
 
     def _get_e_table(self, e_table_name: str):
-        """Get a e_table from the e_table dataframe."""
+        """Get a e_table from the e_table store."""
         return self.e_table[e_table_name.upper()].dropna()
 
     def _get_g_table(self, g_table_name: str):
-        """Get a g_table from the g_table dataframe."""
+        """Get a g_table from the g_table store."""
         return self.g_table[g_table_name.upper()].dropna()
 
     def _get_s_table(self, s_table_name: str):
-        """Get a s_table from the s_table dataframe."""
+        """Get a s_table from the s_table store."""
         return self.s_table[s_table_name.upper()].dropna()
 
     def _get_series(self, series_name: str):
-        """Get a series from the series dataframe."""
-        series_name = series_name.upper()
-        whichdf = self.current_series[series_name]
-        return self.series[whichdf][series_name]
+        """Get a series from the series store."""
+        return self.series[series_name.upper()]
 
     def _get_v_table(self, v_table_name: str):
-        """Get a v_table from the v_table dataframe."""
+        """Get a v_table from the v_table store."""
         return self.v_table[v_table_name.upper()].dropna()
 
     def _join(
@@ -792,57 +961,32 @@ class Tables:
         e_table_tot=None,
         g_table=None,
     ):
+        # Each series and table is stored on its own as a float64 copy so that
+        # adding or erasing one never touches the others.
         new_name = new_name.strip().upper()
         if series is not None:
             if new_name in self.current_series:
                 raise ValueError(f"{new_name} is already a named series")
-            series = pd.DataFrame(series)
-            series.columns = [new_name]
+            series = _as_float_series(series, new_name)
             self.series_dates[new_name] = [series.index[0], series.index[-1]]
             self.current_series[new_name] = series.index.freqstr
-            self.series[series.index.freqstr] = self.series.get(
-                series.index.freqstr, pd.DataFrame()
-            ).join(series, how="outer")
-        if v_table is not None:
-            if new_name in self.v_table:
-                raise ValueError(f"{new_name} is already a named v_table")
-            v_table = pd.DataFrame(v_table)
-            v_table.columns = [new_name]
-            try:
-                self.v_table = self.v_table.join(v_table, how="outer")
-            except ValueError:
-                self.v_table = v_table
-        if c_table is not None:
-            c_table.columns = [new_name]
-            inname = c_table.columns[0]
-            if inname in self.c_table.columns:
-                raise ValueError(f"{inname} is already a named c_table")
-            self.c_table = self.c_table.join(c_table, how="outer")
-        if s_table is not None:
-            s_table.columns = [new_name]
-            inname = s_table.columns[0]
-            if inname in self.s_table.columns:
-                raise ValueError(f"{inname} is already a named s_table")
-            self.s_table = self.s_table.join(s_table, how="outer")
-        if e_table is not None:
-            inname = e_table.columns[0]
-            if inname in self.e_table.columns:
-                raise ValueError(f"{inname} is already a named e_table")
-            self.e_table = self.e_table.join(e_table, how="outer")
-        if e_table_tot is not None:
-            inname = e_table_tot.columns[0]
-            if inname in self.e_table_tot.columns:
-                raise ValueError(f"{inname} is already a named e_table")
-            self.e_table_tot = self.e_table_tot.join(e_table_tot, how="outer")
-        if g_table is not None:
-            if new_name in self.g_table:
-                raise ValueError(f"{new_name} is already a named g_table")
-            g_table = pd.DataFrame(g_table)
-            g_table.columns = [new_name]
-            try:
-                self.g_table = self.g_table.join(g_table, how="outer")
-            except ValueError:
-                self.g_table = g_table
+            self.series[new_name] = series
+        for kind, table in (
+            ("v_table", v_table),
+            ("c_table", c_table),
+            ("s_table", s_table),
+            ("e_table", e_table),
+            ("e_table_tot", e_table_tot),
+            ("g_table", g_table),
+        ):
+            if table is None:
+                continue
+            store = getattr(self, kind)
+            if new_name in store:
+                raise ValueError(
+                    f"{new_name} is already a named {kind.replace('_tot', '')}"
+                )
+            store[new_name] = _as_float_series(table, new_name)
 
     def _normalize_times(self, time="00:00:00"):
         if time is None:
@@ -862,6 +1006,8 @@ class Tables:
     def _normalize_datetimes(self, date, time="00:00:00"):
         if date is None:
             return None
+        from dateutil.parser import parse
+
         hours, minutes, seconds = self._normalize_times(time)
         delta = pd.Timedelta(days=0)
         if int(hours) == 24:
@@ -940,8 +1086,112 @@ class Tables:
         ]
         return series
 
+    def _read_cached(self, reader, file, **options):
+        """Return the DataFrame from reader(file, **options) parsed once per run.
+
+        The key includes the modification time and size of the file so that a
+        file rewritten during the run is parsed again.  The returned DataFrame
+        is shared between blocks and must not be changed in place.  If the file
+        cache is on, a binary copy of the parsed file is loaded from or stored
+        in the cache directory.
+        """
+        stat = os.stat(file)
+        key = (
+            f"{reader.__module__}.{reader.__qualname__}",
+            os.path.abspath(file),
+            stat.st_mtime_ns,
+            stat.st_size,
+            tuple(sorted(options.items())),
+        )
+        if key not in self._file_cache:
+            if self._file_cache_dir is None:
+                parsed = reader(file, **options)
+            else:
+                from .cache import load_parsed, parsed_key, save_parsed
+
+                sidecar = parsed_key(key[0], key[4], file, self._file_cache_dir)
+                parsed = load_parsed(self._file_cache_dir, sidecar)
+                if parsed is None:
+                    parsed = reader(file, **options)
+                    save_parsed(self._file_cache_dir, sidecar, parsed, source=key[1])
+            self._file_cache[key] = parsed
+        return self._file_cache[key]
+
+    def _plan_reads(self, blocks):
+        """Collect what the GET_SERIES_STATVAR blocks will read from each file.
+
+        A rolled up block is unrolled into a block for each variable, so
+        "get_series_statvar" parses the columns and rows of all of the blocks
+        that read a file the first time and the other blocks use the parsed
+        file from "_read_cached".
+        """
+        self._statvar_reads = {}
+        for block_name, _, parameters in blocks:
+            if block_name != "GET_SERIES_STATVAR":
+                continue
+            reads = self._statvar_reads.setdefault(
+                os.path.abspath(parameters["file"]), {"names": set(), "windows": set()}
+            )
+            variable_name = parameters["variable_name"]
+            location_id = parameters["location_id"]
+            if isinstance(variable_name, str):
+                variable_name = [variable_name]
+            if isinstance(location_id, (int, str)):
+                location_id = [location_id]
+            reads["names"].update(
+                f"{vn}_{lid}" for vn, lid in zip(variable_name, location_id)
+            )
+            reads["windows"].add(
+                tuple(
+                    parameters.get(key)
+                    for key in ("date_1", "time_1", "date_2", "time_2")
+                )
+            )
+
+    def _read_date_file(self, date_file):
+        """Return the start and end datetimes of the lines of a date file.
+
+        Each line has a start date, start time, end date, and end time.  Dates
+        are month first and times are "hh", "hh:mm", or "hh:mm:ss" where
+        "24:00:00" is the start of the next day.
+        """
+        words = pd.read_csv(
+            date_file,
+            sep=r"\s+",
+            header=None,
+            usecols=range(4),
+            dtype=str,
+            engine="c",
+        )
+        datetimes = []
+        for date, clock in ((0, 1), (2, 3)):
+            try:
+                days = pd.to_datetime(words[date], format="%m/%d/%Y")
+            except ValueError:
+                days = pd.to_datetime(words[date])
+            hms = (
+                words[clock]
+                .str.split(":", expand=True)
+                .reindex(columns=range(3), fill_value="0")
+            )
+            hms = hms.fillna("0").astype(np.int64)
+            datetimes.append(
+                pd.DatetimeIndex(
+                    days
+                    + pd.to_timedelta(hms[0], unit="h")
+                    + pd.to_timedelta(hms[1], unit="min")
+                    + pd.to_timedelta(hms[2], unit="s")
+                )
+            )
+        return datetimes
+
     def _read_file(self, data_file):
-        with open(data_file, encoding="ascii") as fpi:
+        # The text of a script has more than one line, a file name has one.
+        if "\n" in data_file:
+            fpi = io.StringIO(data_file)
+        else:
+            fpi = open(data_file, encoding="ascii")  # noqa: SIM115
+        with fpi:
             for line_number, line in enumerate(fpi):
                 nline = line.strip()
 
@@ -976,6 +1226,9 @@ class Tables:
         clip_zero: Union[bool, Literal["yes", "no"]] = False,
     ):
         """Filter a time series."""
+        from hydrotoolbox.hydrotoolbox import baseflow_sep
+        from scipy import signal
+
         clip_zero = self._normalize_bools(clip_zero)
         clip_input = self._normalize_bools(clip_input)
         series = self._get_series(series_name)
@@ -1107,33 +1360,29 @@ class Tables:
         """Erase a column in a series, or *_table."""
         if series_name:
             series = series_name.upper()
-            self.series[self.current_series[series]] = self.series[
-                self.current_series[series]
-            ].drop(series, axis="columns")
+            del self.series[series]
             del self.current_series[series]
             del self.series_dates[series]
 
         if v_table_name:
-            self.v_table = self.v_table.drop(v_table_name.upper(), axis="columns")
+            del self.v_table[v_table_name.upper()]
             del self.v_table_metadata[v_table_name.upper()]
 
         if c_table_name:
-            self.c_table = self.c_table.drop(c_table_name.upper(), axis="columns")
+            del self.c_table[c_table_name.upper()]
             del self.c_table_metadata[c_table_name.upper()]
 
         if s_table_name:
-            self.s_table = self.s_table.drop(s_table_name.upper(), axis="columns")
+            del self.s_table[s_table_name.upper()]
             del self.s_table_metadata[s_table_name.upper()]
 
         if e_table_name:
-            self.e_table = self.e_table.drop(e_table_name.upper(), axis="columns")
-            self.e_table_tot = self.e_table_tot.drop(
-                e_table_name.upper(), axis="columns"
-            )
+            del self.e_table[e_table_name.upper()]
+            del self.e_table_tot[e_table_name.upper()]
             del self.e_table_metadata[e_table_name.upper()]
 
         if g_table_name:
-            self.g_table = self.g_table.drop(g_table_name.upper(), axis="columns")
+            del self.g_table[g_table_name.upper()]
             del self.g_table_metadata[g_table_name.upper()]
 
     @validate_call
@@ -1159,6 +1408,8 @@ class Tables:
         **flow_delay,
     ):
         """Calculate the exceedance time for a time series."""
+        from hydrotoolbox import hydrotoolbox
+
         series = self._get_series(series_name)
 
         year = datetime.timedelta(days=365, hours=6, minutes=9, seconds=9)
@@ -1247,6 +1498,8 @@ class Tables:
         time_2=None,
     ):
         """Calculate the flow duration curve for a time series."""
+        from hydrotoolbox import hydrotoolbox
+
         series = self._prepare_series(
             series_name,
             date_1=date_1,
@@ -1295,8 +1548,20 @@ class Tables:
         date_2=None,
         time_2=None,
         current_definitions=False,
+        period: Optional[Literal["water_year", "year"]] = None,
     ):
-        """Calculate hydrologic indices for a time series."""
+        """Calculate hydrologic indices for a time series.
+
+        The prepared series and the intermediate results shared between the
+        indices are kept in the run cache for later blocks with the same
+        series, window, and "use_median", see "indices_cache".
+
+        If "period" is given the indices are calculated for each water year
+        or calendar year and the g_table is indexed by the index and the
+        year, see "indices_years".
+        """
+        from .indices_cache import calculate, year_matrix
+
         mapper = {
             "MA": ma,
             "ML": ml,
@@ -1325,18 +1590,43 @@ class Tables:
         if flow_component is not None:
             ind.extend([f"{fc}" for fc in tsutils.make_list(flow_component, sep=" ")])
 
-        series = self._prepare_series(
-            series_name,
-            date_1=date_1,
-            time_1=time_1,
-            date_2=date_2,
-            time_2=time_2,
+        cache_arguments = (
+            self._indices_cache,
+            (
+                series_name.upper(),
+                self._normalize_datetimes(date_1, time_1),
+                self._normalize_datetimes(date_2, time_2),
+                use_median,
+            ),
+            self._get_series(series_name),
+            lambda: self._prepare_series(
+                series_name,
+                date_1=date_1,
+                time_1=time_1,
+                date_2=date_2,
+                time_2=time_2,
+            ),
         )
+        if period is None:
+            gtab, series = calculate(*cache_arguments, ind, use_median, drainage_area)
+            gtab = pd.DataFrame(gtab, index=[0]).T
+        else:
+            from .indices_years import INDICES
+            from .indices_years import calculate as calculate_years
 
-        gtab = hydrotoolbox.indices(
-            ind, input_ts=series, use_median=use_median, drainage_area=drainage_area
-        )
-        gtab = pd.DataFrame(gtab, index=[0]).T
+            ind = [i.upper() for i in ind]
+            if not ind or not set(ind).issubset(INDICES):
+                raise ValueError(
+                    tsutils.error_wrapper(
+                        f"""
+                        With "PERIOD" the hydrologic indices must be some of
+                        {list(INDICES)}.  Stream classifications and flow
+                        components are not available.  You gave {ind}.
+                        """
+                    )
+                )
+            matrix, series = year_matrix(*cache_arguments, period)
+            gtab = calculate_years(matrix, ind, use_median=use_median)
 
         # Undocumented feature of TSPROC: if current_definitions is True, then
         # the g_table gtab is printed to the screen.
@@ -1351,6 +1641,7 @@ class Tables:
             "kind": "hydrologic_indices",
             "start_date": series.index[0],
             "end_date": series.index[-1],
+            "period": period,
         }
 
     @validate_call
@@ -1368,6 +1659,8 @@ class Tables:
         time_2: Optional[str] = None,
     ):
         """Calculate hydrologic events for a time series."""
+        from hydrotoolbox import hydrotoolbox
+
         series = self._prepare_series(
             series_name,
             date_1=date_1,
@@ -1394,6 +1687,8 @@ class Tables:
         time_2: Optional[str] = None,
     ):
         """Calculate hydrologic peaks for a time series."""
+        from hydrotoolbox import hydrotoolbox
+
         series = self._prepare_series(
             series_name,
             date_1=date_1,
@@ -1407,6 +1702,84 @@ class Tables:
 
         self._join(new_series_name, series=series)
 
+    def _write_instruction_file(
+        self,
+        ins_file_name,
+        series_name=(),
+        series_format="long",
+        s_table_name=(),
+        c_table_name=(),
+        v_table_name=(),
+        e_table_name=(),
+        g_table_name=(),
+    ):
+        """Write the PEST instruction file for the output of LIST_OUTPUT.
+
+        The instructions only depend on the names of the entities and the
+        number of rows that LIST_OUTPUT writes for each of them, so the values
+        are not formatted.
+        """
+        if isinstance(series_name, str):
+            series_name = [series_name]
+        if isinstance(s_table_name, str):
+            s_table_name = [s_table_name]
+        if isinstance(c_table_name, str):
+            c_table_name = [c_table_name]
+        if isinstance(v_table_name, str):
+            v_table_name = [v_table_name]
+        if isinstance(e_table_name, str):
+            e_table_name = [e_table_name]
+        if isinstance(g_table_name, str):
+            g_table_name = [g_table_name]
+
+        if c_table_name:
+            raise ValueError(
+                tsutils.error_wrapper(
+                    f"""
+                    Instruction files are not available for the C_TABLEs
+                    "{c_table_name}" since WRITE_PEST_FILES does not have
+                    C_TABLE observations.
+                    """
+                )
+            )
+
+        lines = ["pif $\n"]
+        for sern in series_name:
+            start, end = self.series_dates[sern.upper()]
+            nrows = self._get_series(sern.upper()).loc[start:end].count()
+            if series_format == "long":
+                lines.append(_instruction_lines(sern.lower(), nrows, 3, "42:65"))
+            elif series_format == "short":
+                lines.append(_instruction_lines(sern, nrows, 3, "2:25"))
+            else:
+                lines.append(_instruction_lines(sern, nrows, 3, "42:65"))
+
+        for s_tab in s_table_name:
+            lines.append("l8\n")
+            lines.append("1l {s_tab}\n" * self._get_s_table(s_tab.upper()).count())
+
+        for v_tab in v_table_name:
+            nrows = self._get_v_table(v_tab).count()
+            lines.append(_instruction_lines(v_tab.lower(), nrows, 4, "63:78"))
+
+        for e_tab_name in e_table_name:
+            nrows = self._get_e_table(e_tab_name.upper()).count()
+            lines.append(_instruction_lines(e_tab_name.lower(), nrows, 4, "59:78"))
+
+        for g_tab in g_table_name:
+            kind = self.g_table_metadata[g_tab.upper()]["kind"]
+            g_table = self._get_g_table(g_tab)
+            if kind == "flow_duration":
+                nrows = g_table.count()
+            elif kind == "hydrologic_indices":
+                nrows = len(g_table)
+            else:
+                continue
+            lines.append(_instruction_lines(g_tab.lower(), nrows, 4, "82:96"))
+
+        with open(ins_file_name, mode="w", encoding="utf-8") as ins_file:
+            ins_file.write("".join(lines))
+
     @validate_call
     def list_output(
         self,
@@ -1429,6 +1802,8 @@ class Tables:
             - e_table: list all e_tables
             - g_table: list all g_tables
         """
+        from .fortran import record_writer
+
         instruction_file_arguments = {
             "file": file,
             "series_name": series_name,
@@ -1441,6 +1816,8 @@ class Tables:
         }
         self.list_output_arguments[file] = instruction_file_arguments
         self.last_list_output = file
+        if not self.write_files:
+            return
 
         if isinstance(series_name, str):
             series_name = [series_name]
@@ -1468,104 +1845,61 @@ class Tables:
         self.ofile = file
 
         fortran_format_data = {
-            "table": FortranRecordWriter(r"(t5, a, t55, 1PG14.7, /)"),
-            "series_long": FortranRecordWriter(
-                r"(1x, a, t20, a10, 3x, a8, 3x, g16.9, /)"
-            ),
-            "series_short": FortranRecordWriter(r"(4x, g16.9, /)"),
-            "series_ssf": FortranRecordWriter(r"(4x, a10, 3x, g16.9, /)"),
-            "v_table": FortranRecordWriter(
+            "table": record_writer(r"(t5, a, t55, 1PG14.7, /)"),
+            "series_long": record_writer(r"(1x, a, t20, a10, 3x, a8, 3x, g16.9, /)"),
+            "series_short": record_writer(r"(4x, g16.9, /)"),
+            "series_ssf": record_writer(r"(4x, a10, 3x, g16.9, /)"),
+            "v_table": record_writer(
                 r"(t5, 'From ', a10, ' ', a8, ' to ', a10, ' ', a8, '  volume = ', G18.12, /)"
             ),
-            "e_table_header": FortranRecordWriter(
+            "e_table_header": record_writer(
                 r"(t4, 'Flow', t19, 'Time delay (', a, ')', t40, 'Time ', a, ' (', a, ')', t60, 'Fraction of time ', a, ' threshold', /)"
             ),
-            "e_table_row": FortranRecordWriter(
+            "e_table_row": record_writer(
                 r"(t4, 'Flow', t19, 'Time delay (', a, ')', t40, 'Time ', a, ' (', a, ')', t60, 'Fraction of time ', a, ' threshold', /)"
             ),
-            "g_table_row": FortranRecordWriter(r"(t4, a, t82, g14.7, /)"),
-        }
-        fortran_format_instructions = {
-            "series_long": FortranRecordWriter(r"('l', a, t6, '[', a, a, ']42:65', /)"),
-            "series_short": FortranRecordWriter(r"('l', a, t6, '[', a, a, ']2:25', /)"),
-            "s_table_row": FortranRecordWriter(r"('l', a, t6, '[', a, a, ']51:69', /)"),
-            "g_table_row": FortranRecordWriter(r"('l', a, t6, '[', a, a, ']82:96', /)"),
-            "e_table_row": FortranRecordWriter(r"('l', a, t6, '[', a, a, ']59:78', /)"),
-            "v_table_row": FortranRecordWriter(r"('l', a, t6, '[', a, a, ']63:78', /)"),
+            "e_table_values": record_writer(
+                r"(t2, g14.7, t20, g14.7, t40, g14.7, t63, g14.7, /)"
+            ),
+            "g_table_row": record_writer(r"(t4, a, t82, g14.7, /)"),
         }
 
-        with (
-            (
-                open(ins_file_name, mode="w", encoding="utf-8")
-                if ins_file_name
-                else nullcontext()
-            ) as ins_file,
-            open(self.ofile, mode="w", encoding="utf-8") as fp,
-        ):
+        with open(self.ofile, mode="w", encoding="utf-8") as fp:
             # Time series first
-            if ins_file_name:
-                ins_file.write("pif $\n")
             for sern in series_name:
                 fp.write(f'\n TIME_SERIES "{sern.lower()}" ---->\n')
                 series = self._get_series(sern.upper())
                 start, end = self.series_dates[sern.upper()]
-                line_skip = 3
-                for rowno, (index, value) in enumerate(
-                    series.loc[start:end].dropna().items()
-                ):
-                    if series_format == "long":
-                        date = index.strftime(self.date_format)
-                        time = index.strftime("%H:%M:%S")
-                        if series.index.freqstr == "D":
-                            time = "12:00:00"
-
-                        if ins_file_name:
-                            ins_file.write(
-                                fortran_format_instructions["series_long"]
-                                .write([f"{line_skip}", sern.lower(), f"{rowno + 1}"])
-                                .rstrip()
-                                + "\n"
-                            )
-                        fp.write(
-                            fortran_format_data["series_long"]
-                            .write([sern.lower(), date, time, value])
-                            .rstrip()
-                            + "\n"
-                        )
+                values = series.loc[start:end].dropna()
+                if series_format == "long":
+                    data_columns = [
+                        sern.lower(),
+                        values.index.strftime(self.date_format),
+                        "12:00:00"
+                        if series.index.freqstr == "D"
+                        else values.index.strftime("%H:%M:%S"),
+                        values.to_numpy(),
+                    ]
+                elif series_format == "short":
+                    data_columns = [values.to_numpy()]
+                else:
+                    data_columns = [sern, values.to_numpy()]
+                data_writer = fortran_format_data[f"series_{series_format}"]
 
-                    elif series_format == "short":
-                        if ins_file_name:
-                            ins_file.write(
-                                fortran_format_instructions["series_short"]
-                                .write([f"{line_skip}", sern, f"{rowno + 1}"])
-                                .rstrip()
-                                + "\n"
-                            )
-                        fp.write(
-                            fortran_format_data["series_short"].write([value]).rstrip()
-                            + "\n"
-                        )
-                    elif series_format == "ssf":
-                        if ins_file_name:
-                            ins_file.write(
-                                fortran_format_instructions["series_long"]
-                                .write([f"{line_skip}", sern, f"{rowno + 1}"])
-                                .rstrip()
-                                + "\n"
-                            )
-                        fp.write(
-                            fortran_format_data["series_ssf"]
-                            .write([sern, value])
-                            .rstrip()
-                            + "\n"
-                        )
-                    line_skip = 1
+                # Write the rows in chunks, formatting a column at a time.
+                for first in range(0, len(values), _LIST_OUTPUT_CHUNK):
+                    last = min(first + _LIST_OUTPUT_CHUNK, len(values))
+                    records = data_writer.write_columns(
+                        [
+                            i if isinstance(i, str) else i[first:last]
+                            for i in data_columns
+                        ]
+                    )
+                    fp.write("".join(i.rstrip() + "\n" for i in records))
 
             for s_tab in s_table_name:
                 st = self._get_s_table(s_tab.upper()).dropna()
                 stab_meta = self.s_table_metadata[s_tab.upper()]
-                if ins_file_name:
-                    ins_file.write("l8\n")
                 fp.write(
                     f"""
  S_TABLE "{s_tab}" ---->
@@ -1576,22 +1910,15 @@ class Tables:
      Exponent in power transformation:                 {stab_meta["exponent"]}
 """
                 )
-                for index, value in st.items():
-                    if ins_file_name:
-                        ins_file.write("1l {s_tab}\n")
-                    fp.write(
-                        fortran_format_data["table"].write([index, value]).rstrip()
-                        + "\n"
-                    )
+                records = fortran_format_data["table"].write_columns(
+                    [list(st.index), st.to_numpy()]
+                )
+                fp.write("".join(i.rstrip() + "\n" for i in records))
 
-            for c_tab in c_table_name:
-                stats = self._get_c_table(c_tab).dropna()
-                ctab = self.c_table_metadata[c_tab.upper()]
-                if ins_file_name:
-                    ins_file.write("l9\n")
+            for c_tab, window, ctab, stats in self._c_table_windows(c_table_name):
                 fp.write(
                     f"""
- C_TABLE "{c_tab}" ---->
+ C_TABLE "{c_tab}"{window} ---->
     Observation time series name:                     "{ctab["obs_name"].lower()}"
     Simulation time series name:                      "{ctab["sim_name"].lower()}"
     Beginning date of series comparison:              {ctab["start_date"].strftime("%Y-%m-%d")}
@@ -1601,18 +1928,10 @@ class Tables:
     Number of series terms in this interval:          {ctab["num_terms"]}
 """
                 )
-                for index, value in stats.items():
-                    if ins_file_name:
-                        ins_file.write(
-                            fortran_format_instructions["table"]
-                            .write([index, value])
-                            .rstrip()
-                            + "\n"
-                        )
-                    fp.write(
-                        fortran_format_data["table"].write([index, value]).rstrip()
-                        + "\n"
-                    )
+                records = fortran_format_data["table"].write_columns(
+                    [list(stats.index), stats.to_numpy()]
+                )
+                fp.write("".join(i.rstrip() + "\n" for i in records))
 
             for v_tab in v_table_name:
                 fp.write(
@@ -1621,33 +1940,19 @@ class Tables:
      Volumes calculated from series "{self.v_table_metadata[v_tab.upper()]["source_name"]}" are as follows:-
 """
                 )
-                v_table = self._get_v_table(v_tab)
-                line_skip = 4
-                for vrow, (index, value) in enumerate(
-                    v_table.dropna().items(), start=1
-                ):
-                    if ins_file_name:
-                        ins_file.write(
-                            fortran_format_instructions["v_table_row"]
-                            .write([f"{line_skip}", v_tab.lower(), f"{vrow}"])
-                            .rstrip()
-                            + "\n"
-                        )
-                    fp.write(
-                        fortran_format_data["v_table"]
-                        .write(
-                            [
-                                index[0].strftime(self.date_format),
-                                index[0].strftime("%H:%M:%S"),
-                                index[1].strftime(self.date_format),
-                                index[1].strftime("%H:%M:%S"),
-                                value,
-                            ]
-                        )
-                        .rstrip()
-                        + "\n"
-                    )
-                    line_skip = 1
+                v_table = self._get_v_table(v_tab).dropna()
+                starts = v_table.index.get_level_values(0)
+                ends = v_table.index.get_level_values(1)
+                records = fortran_format_data["v_table"].write_columns(
+                    [
+                        starts.strftime(self.date_format),
+                        starts.strftime("%H:%M:%S"),
+                        ends.strftime(self.date_format),
+                        ends.strftime("%H:%M:%S"),
+                        v_table.to_numpy(),
+                    ]
+                )
+                fp.write("".join(i.rstrip() + "\n" for i in records))
 
             for e_tab_name in e_table_name:
                 e_tab = self._get_e_table(e_tab_name.upper())
@@ -1666,24 +1971,16 @@ class Tables:
                     .rstrip()
                     + "\n"
                 )
-                line_skip = 4
-                for row, (index, value) in enumerate(e_tab.dropna().items(), start=1):
-                    if ins_file_name:
-                        ins_file.write(
-                            fortran_format_instructions["e_table_row"]
-                            .write([f"{line_skip}", e_tab_name.lower(), f"{row}"])
-                            .rstrip()
-                            + "\n"
-                        )
-                    fp.write(
-                        FortranRecordWriter(
-                            "t2, g14.7, t20, g14.7, t40, g14.7, t63, g14.7, /"
-                        )
-                        .write([index[0], index[1], value, et_tot[index]])
-                        .rstrip()
-                        + "\n"
-                    )
-                    line_skip = 1
+                e_tab = e_tab.dropna()
+                records = fortran_format_data["e_table_values"].write_columns(
+                    [
+                        e_tab.index.get_level_values(0),
+                        e_tab.index.get_level_values(1),
+                        e_tab.to_numpy(),
+                        [et_tot[index] for index in e_tab.index],
+                    ]
+                )
+                fp.write("".join(i.rstrip() + "\n" for i in records))
 
             for g_tab in g_table_name:
                 src = self.g_table_metadata[g_tab.upper()]["source"]
@@ -1691,7 +1988,7 @@ class Tables:
                 start_date = self.g_table_metadata[g_tab.upper()]["start_date"]
                 end_date = self.g_table_metadata[g_tab.upper()]["end_date"]
 
-                g_table = self.g_table[g_tab.upper()].dropna()
+                g_table = self._get_g_table(g_tab)
                 sindex = sorted(g_table.index, key=natural_keys)
                 g_table = g_table.loc[sindex]
 
@@ -1706,7 +2003,7 @@ class Tables:
                     #    Flow-duration curve for series "mflow" (11/08/8672 to 11/07/8693)                     Value
                     #    99.50% of flows exceed:                                                         4.912684
                     fp.write(
-                        FortranRecordWriter(
+                        record_writer(
                             "t4, 'Flow duration curve for ', a, ' ', a, ':', a, t85, 'Value', /"
                         )
                         .write(
@@ -1720,31 +2017,23 @@ class Tables:
                         + "\n"
                     )
 
-                    line_skip = 4
-                    g_table = g_table.sort_index(ascending=False)
-                    for row, (index, value) in enumerate(
-                        g_table.dropna().items(), start=1
-                    ):
-                        if ins_file_name:
-                            ins_file.write(
-                                fortran_format_instructions["g_table_row"]
-                                .write([f"{line_skip}", g_tab.lower(), f"{row}"])
-                                .rstrip()
-                                + "\n"
-                            )
-                        fp.write(
-                            fortran_format_data["g_table_row"]
-                            .write([f"{index:>6.02%} of flows exceed:", value])
-                            .rstrip()
-                            + "\n"
-                        )
-                        line_skip = 1
+                    g_table = g_table.sort_index(ascending=False).dropna()
+                    records = fortran_format_data["g_table_row"].write_columns(
+                        [
+                            [
+                                f"{index:>6.02%} of flows exceed:"
+                                for index in g_table.index
+                            ],
+                            g_table.to_numpy(),
+                        ]
+                    )
+                    fp.write("".join(i.rstrip() + "\n" for i in records))
                 elif kind == "hydrologic_indices":
                     #  G_TABLE "mduration_p" ---->
                     #    Hydrologic Index and description (Olden and Poff, 2003)                               Value
                     #    MA16: Mean monthly flow May-Aug:                                                      4.912684
                     fp.write(
-                        FortranRecordWriter(
+                        record_writer(
                             "t4, 'Hydrologic index for ', a, ' ', a, ':', a, t85, 'Value', /"
                         )
                         .write(
@@ -1758,22 +2047,30 @@ class Tables:
                         + "\n"
                     )
 
-                    line_skip = 4
-                    for row, (index, value) in enumerate(g_table.items(), start=1):
-                        if ins_file_name:
-                            ins_file.write(
-                                fortran_format_instructions["g_table_row"]
-                                .write([f"{line_skip}", g_tab.lower(), f"{row}"])
-                                .rstrip()
-                                + "\n"
-                            )
-                        fp.write(
-                            FortranRecordWriter("t4, a, t82, g14.7, /")
-                            .write([index, value])
-                            .rstrip()
-                            + "\n"
-                        )
-                        line_skip = 1
+                    records = fortran_format_data["g_table_row"].write_columns(
+                        [
+                            [
+                                f"{index[0]} ({index[1]})"
+                                if isinstance(index, tuple)
+                                else index
+                                for index in g_table.index
+                            ],
+                            g_table.to_numpy(),
+                        ]
+                    )
+                    fp.write("".join(i.rstrip() + "\n" for i in records))
+
+        if ins_file_name:
+            self._write_instruction_file(
+                ins_file_name,
+                series_name=series_name,
+                series_format=series_format,
+                s_table_name=s_table_name,
+                c_table_name=c_table_name,
+                v_table_name=v_table_name,
+                e_table_name=e_table_name,
+                g_table_name=g_table_name,
+            )
 
     @validate_call
     def move(
@@ -1911,6 +2208,8 @@ class Tables:
     @validate_call
     def plot(self, series_name: Union[str, list], file: str, **kwargs):
         """Plot a time series."""
+        from matplotlib import pyplot as plt
+
         if isinstance(series_name, str):
             series_name = [series_name]
 
@@ -2030,48 +2329,56 @@ class Tables:
 
         if automatic_dates:
             mapping = {"year": "AS", "month": "MS", "day": "D"}
-            start_end = pd.date_range(
+            periods = pd.date_range(
                 start=series.index[0],
                 end=series.index[-1],
                 freq=mapping[automatic_dates],
             ).to_period()
-            start_end = [[i.start_time, i.end_time] for i in start_end]
+            start = periods.start_time
+            end = periods.end_time
         if date_file:
-            start_end = []
-            with open(date_file, encoding="ascii") as fpi:
-                for line in fpi:
-                    words = line.strip().split()
-                    start_end.append(
-                        [
-                            self._normalize_datetimes(words[0], words[1]),
-                            self._normalize_datetimes(words[2], words[3]),
-                        ]
-                    )
-
-        volume = []
-        for start, end in start_end:
-            nsend = pd.DatetimeIndex([start, end])
-            dfi = pd.DataFrame(
-                data=np.interp(
-                    nsend, series.index, np.array(series.values).astype(np.float64)
-                ),
-                index=nsend,
-            )
-            mask = (series.index > start) & (series.index < end)
-            dfi = dfi.merge(
-                series[mask], how="outer", left_index=True, right_index=True
-            )
-            dfi.iloc[0, 1] = dfi.iloc[0, 0]
-            dfi.iloc[-1, 1] = dfi.iloc[-1, 0]
-            dfi = pd.Series(dfi.iloc[:, 1])
-            dfindex = dfi.index.astype(np.int64) // 10**9
-            volume.append(np.trapz(dfi, x=dfindex) * float(factor))
-        start = [pd.to_datetime(i[0]) for i in start_end]
-        end = [pd.to_datetime(i[1]) for i in start_end]
-        series = pd.DataFrame(zip(start, end, volume))
-        series = series.set_index([0, 1])
-        series.index.names = ["start", "end"]
-        series.columns = [f"{series_name}"]
+            start, end = self._read_date_file(date_file)
+
+        # The volume of each interval is the trapezoidal integral of the
+        # series between the interpolated values at the start and end and the
+        # points of the series in between.  The area of every segment of the
+        # series is calculated once and summed for each interval.
+        values = np.array(series.values).astype(np.float64)
+        seconds = series.index.asi8 // 10**9
+        start_value = np.interp(start, series.index, values)
+        end_value = np.interp(end, series.index, values)
+        start_seconds = start.asi8 // 10**9
+        end_seconds = end.asi8 // 10**9
+
+        # The points strictly between start and end are first:last.
+        first = series.index.searchsorted(start, side="right")
+        last = series.index.searchsorted(end, side="left")
+        inside = first < last
+        first_inside = np.where(inside, first, 0)
+        last_inside = np.where(inside, last - 1, 0)
+
+        areas = np.diff(seconds) * (values[1:] + values[:-1]) / 2.0
+        areas = np.append(areas, 0.0)
+        between = np.add.reduceat(
+            areas, np.column_stack([first_inside, last_inside]).ravel()
+        )[::2]
+        between = np.where(first_inside < last_inside, between, 0.0)
+
+        volume = np.where(
+            inside,
+            (seconds[first_inside] - start_seconds)
+            * (start_value + values[first_inside])
+            / 2.0
+            + between
+            + (end_seconds - seconds[last_inside])
+            * (values[last_inside] + end_value)
+            / 2.0,
+            (end_seconds - start_seconds) * (start_value + end_value) / 2.0,
+        ) * float(factor)
+        series = pd.DataFrame(
+            {f"{series_name}": volume},
+            index=pd.MultiIndex.from_arrays([start, end], names=["start", "end"]),
+        )
         self._join(new_v_table_name, v_table=series)
         self.v_table_metadata[new_v_table_name.upper()] = {
             "source_name": series_name,
@@ -2091,6 +2398,8 @@ class Tables:
         time_2: Optional[str] = None,
     ):
         """Perform a USGS HYSEP baseflow separation."""
+        from hydrotoolbox import hydrotoolbox
+
         series = self._prepare_series(
             series_name,
             date_1=date_1,
@@ -2112,6 +2421,7 @@ class Tables:
     def _write_pest_file_table(
         self, obs_table_name, mod_table_name, obs_weight, get_function, obs_min_max=""
     ):
+        """Return the (model name, values, weights) of each observation table."""
         observation_data = []
         if isinstance(obs_table_name, str):
             obs_table_name = [obs_table_name]
@@ -2162,13 +2472,15 @@ class Tables:
                 lower=lower,
                 upper=upper,
             )
-            for index, (val, weight) in enumerate(
-                zip(obsval.dropna(), weights_df.dropna())
-            ):
-                modindex = f"{model.lower()}{index + 1}"
-                observation_data.append(
-                    f"{modindex:20} {val:15f} {weight:15f} {model.lower():20}"
-                )
+
+            # The observations and weights are paired in order after the
+            # missing values of each are dropped.
+            values = obsval.dropna().to_numpy(dtype="float64")
+            weights = weights_df.dropna().to_numpy(dtype="float64")
+            nvalues = min(len(values), len(weights))
+            observation_data.append(
+                (model.lower(), values[:nvalues], weights[:nvalues])
+            )
         return observation_data
 
     @validate_call
@@ -2478,60 +2790,54 @@ class Tables:
                     observation_groups += f"\n{obsgrp.lower()}"
                     nobsgp += 1
 
-        observation_data = ["", "* observation data"]
-
-        nobs = 0
-        series_data = self._write_pest_file_table(
-            observation_series_name,
-            model_series_name,
-            series_weights_equation,
-            self._get_series,
-            series_weights_min_max,
-        )
-        nobs += len(series_data)
-        observation_data.extend(series_data)
-
-        s_table_data = self._write_pest_file_table(
-            observation_s_table_name,
-            model_s_table_name,
-            s_table_weights_equation,
-            self._get_s_table,
-            s_table_weights_min_max,
-        )
-        nobs += len(s_table_data)
-        observation_data.extend(s_table_data)
-
-        v_table_data = self._write_pest_file_table(
-            observation_v_table_name,
-            model_v_table_name,
-            v_table_weights_equation,
-            self._get_v_table,
-            v_table_weights_min_max,
-        )
-        nobs += len(v_table_data)
-        observation_data.extend(v_table_data)
-
-        e_table_data = self._write_pest_file_table(
-            observation_e_table_name,
-            model_e_table_name,
-            e_table_weights_equation,
-            self._get_e_table,
-            e_table_weights_min_max,
-        )
-        nobs += len(e_table_data)
-        observation_data.extend(e_table_data)
-
-        g_table_data = self._write_pest_file_table(
-            observation_g_table_name,
-            model_g_table_name,
-            g_table_weights_equation,
-            self._get_g_table,
-            g_table_weights_min_max,
-        )
-        nobs += len(g_table_data)
-        observation_data.extend(g_table_data)
-
-        observation_data = "\n".join(observation_data)
+        observation_data = []
+        for obs_name, mod_name, weights_equation, get_function, weights_min_max in [
+            (
+                observation_series_name,
+                model_series_name,
+                series_weights_equation,
+                self._get_series,
+                series_weights_min_max,
+            ),
+            (
+                observation_s_table_name,
+                model_s_table_name,
+                s_table_weights_equation,
+                self._get_s_table,
+                s_table_weights_min_max,
+            ),
+            (
+                observation_v_table_name,
+                model_v_table_name,
+                v_table_weights_equation,
+                self._get_v_table,
+                v_table_weights_min_max,
+            ),
+            (
+                observation_e_table_name,
+                model_e_table_name,
+                e_table_weights_equation,
+                self._get_e_table,
+                e_table_weights_min_max,
+            ),
+            (
+                observation_g_table_name,
+                model_g_table_name,
+                g_table_weights_equation,
+                self._get_g_table,
+                g_table_weights_min_max,
+            ),
+        ]:
+            observation_data.extend(
+                self._write_pest_file_table(
+                    obs_name,
+                    mod_name,
+                    weights_equation,
+                    get_function,
+                    weights_min_max,
+                )
+            )
+        nobs = sum(len(values) for _, values, _ in observation_data)
 
         # Control data section
         #
@@ -2942,7 +3248,10 @@ pcf
 
             fpo.write("\n".join([i.rstrip() for i in observation_groups.split("\n")]))
 
-            fpo.write("\n".join([i.rstrip() for i in observation_data.split("\n")]))
+            # The observations are streamed to the file a chunk at a time.
+            fpo.write("\n* observation data")
+            for model, values, weights in observation_data:
+                fpo.writelines(_observation_lines(model, values, weights))
 
             fpo.write("\n".join([i.rstrip() for i in model_command_line.split("\n")]))
 
@@ -2956,11 +3265,15 @@ pcf
             else:
                 loop_list_output_arguments = self.list_output_arguments
 
-            for ins, (key, value) in zip(
-                new_instruction_file, loop_list_output_arguments.items()
+            # The instruction files only depend on the entities listed by
+            # LIST_OUTPUT, so the output files are not written again.
+            for ins, value in zip(
+                new_instruction_file, loop_list_output_arguments.values()
             ):
-                value.update({"ins_file_name": ins})
-                self.list_output(**value)
+                self._write_instruction_file(
+                    ins,
+                    **{key: item for key, item in value.items() if key != "file"},
+                )
 
                 fpo.write(f"{ins} {value['file']}\n")
 
@@ -3037,8 +3350,8 @@ pcf
                 yield data, lindex
                 data = []
 
-    def run(self, infile, running_context: Optional[str] = None):
-        """Parse a tsproc file."""
+    def _parse(self, infile, running_context: Optional[str] = None):
+        """Parse a tsproc file into the plan of blocks to run."""
         _not_rollable_duplicate_keywords = {
             "exceedance_time",
             "flow_duration",
@@ -3208,30 +3521,21 @@ pcf
                             break
                     break
 
+        listing = []
         runblocks = []
-        nnumbers = []
         for block, lnum in zip(blocks, lnumbers):
-            print("")
             context = False
             for line in block:
                 if line[0] == "start":
                     block_name = line[1]
                 if line[0] == "context":
                     context = True
-                    if block_name == "SETTINGS":
-                        print(f"# RUNNING SETTINGS block @ line {lnum}.")
-                    elif (
+                    runs = block_name != "SETTINGS" and (
                         line[1] in ["all", running_context] or running_context == "all"
-                    ):
-                        print(
-                            f"# RUNNING following block @ line {lnum} because CONTEXT '{line[1]}' matches running CONTEXT '{running_context}'."
-                        )
-                        runblocks.append(block)
-                        nnumbers.append(lnum)
-                    else:
-                        print(
-                            f"# SKIPPING following block @ line {lnum} because CONTEXT '{line[1]}' doesn't match running CONTEXT '{running_context}'."
-                        )
+                    )
+                    listing.append([block, lnum, line[1], runs])
+                    if runs:
+                        runblocks.append(self._block_parameters(block, lnum))
                     break
             if context is False:
                 raise ValueError(
@@ -3242,79 +3546,600 @@ pcf
                         """
                     )
                 )
-            for line in block:
-                if line[0] == "start":
-                    block_name = line[1]
-                    print(f"START {block_name}")
-                else:
-                    varl = " ".join(line[1:])
-                    if varl.strip():
-                        print(f"  {line[0].upper()} {varl}")
-            print(f"END {block_name}")
 
-        # Run the blocks.
-        for block, lnum in zip(runblocks, nnumbers):
-            keys = [i[0] for i in block if i[0] != "start"]
-            self.line_number = lnum
-            self.block_name = [i[1] for i in block if i[0] == "start"][0].upper()
-            if self.block_name in deprecated:
-                warning(
+        return {
+            "running_context": running_context,
+            "listing": listing,
+            "blocks": runblocks,
+        }
+
+    def _block_parameters(self, block, lnum):
+        """Check the keywords of a block and collect the parameters.
+
+        Returns the block name, line number, and the dictionary of lower case
+        keyword parameters used to call the block function.
+        """
+        keys = [i[0] for i in block if i[0] != "start"]
+        block_name = [i[1] for i in block if i[0] == "start"][0].upper()
+        args = [
+            i.lower() for i in self.funcs[block_name]["args"] if i.lower() != "context"
+        ]
+        kwds = {key.lower(): val for key, val in self.funcs[block_name]["kwds"].items()}
+        if any(elem not in keys for elem in args):
+            raise ValueError(
+                tsutils.error_wrapper(
                     f"""
-                    WARNING: The block "{self.block_name}" @ line number {lnum}
-                    is deprecated within tsblender. {deprecated[self.block_name]}
+                    All parameters in "{args}" are required for
+                    "{block_name}" at line {lnum}. You gave
+                    "{keys}".
                     """
                 )
-            args = [
-                i.lower()
-                for i in self.funcs[self.block_name]["args"]
-                if i.lower() != "context"
-            ]
-            kwds = {
-                key.lower(): val
-                for key, val in self.funcs[self.block_name]["kwds"].items()
-            }
-            if any(elem not in keys for elem in args):
-                raise ValueError(
-                    tsutils.error_wrapper(
-                        f"""
-                        All parameters in "{args}" are required for
-                        "{self.block_name}" at line {self.line_number}. You gave
-                        "{keys}".
-                        """
-                    )
+            )
+        if all(item in args + list(kwds.keys()) for item in keys):
+            raise ValueError(
+                tsutils.error_wrapper(
+                    f"""
+                    The available parameters for "{block_name}" at line
+                    "{lnum}" are "{args + list(kwds.keys())}" but
+                    you gave "{set(args + list(kwds.keys())) - set(keys)}"
+                    """
                 )
-            if all(item in args + list(kwds.keys()) for item in keys):
-                raise ValueError(
-                    tsutils.error_wrapper(
-                        f"""
-                        The available parameters for "{self.block_name}" at line
-                        "{self.line_number}" are "{args + list(kwds.keys())}" but
-                        you gave "{set(args + list(kwds.keys())) - set(keys)}"
-                        """
+            )
+        parameters = {
+            allv[0]: allv[1] if len(allv) == 2 else allv[1:] for allv in block
+        }
+        kwds.update(parameters)
+        parameters = {key.lower(): val for key, val in kwds.items() if val}
+        del parameters["start"]
+        del parameters["context"]
+        return [block_name, lnum, parameters]
+
+    def _compile(self, infile, running_context=None, cache_dir=None):
+        """Return the plan for a tsproc file, using the plan cache if given.
+
+        The plan is the unrolled list of blocks, the blocks that match the
+        running context, and their parameters.  If "cache_dir" is not None
+        the plan is stored in and retrieved from the plan cache in
+        "cache_dir".  The warnings printed while parsing are stored with the
+        plan and printed again when the plan comes from the cache.
+        """
+        if cache_dir is None:
+            return self._parse(infile, running_context)
+
+        from contextlib import redirect_stderr
+
+        from . import cache
+
+        key = cache.plan_key(infile, running_context)
+        plan = cache.load_plan(cache_dir, key)
+        if plan is not None:
+            print(plan.pop("warnings"), end="", file=sys.stderr)
+            return plan
+
+        warnings = io.StringIO()
+        try:
+            with redirect_stderr(warnings):
+                plan = self._parse(infile, running_context)
+        finally:
+            print(warnings.getvalue(), end="", file=sys.stderr)
+        cache.save_plan(cache_dir, key, {**plan, "warnings": warnings.getvalue()})
+        return plan
+
+    def _run_block(self, block_name, lnum, parameters):
+        """Run a single block of the plan."""
+        self.line_number = lnum
+        self.block_name = block_name
+        if block_name in deprecated:
+            warning(
+                f"""
+                WARNING: The block "{block_name}" @ line number {lnum}
+                is deprecated within tsblender. {deprecated[block_name]}
+                """
+            )
+
+        if os.path.exists("debug_tsblender"):
+            print(
+                f"\nPROCESSING: {block_name} @ line number {lnum} with arguments {parameters}"
+            )
+
+        if not self.write_files and block_name in ("PLOT", "WRITE_PEST_FILES"):
+            return
+
+        # The output so far is written before any output of the block.
+        self.log.flush()
+        self.log.event("block_start", block=block_name, line=lnum)
+        start = time.perf_counter()
+        try:
+            # Call the function with the args and kwds collected into the
+            # parameters dictionary.
+            if self.block_profile is None:
+                self.funcs[block_name]["f"](**parameters)
+            else:
+                from .profiling import measure
+
+                self.block_profile.append(
+                    measure(
+                        self,
+                        block_name,
+                        lnum,
+                        parameters,
+                        lambda: self.funcs[block_name]["f"](**parameters),
                     )
                 )
-            if self.block_name == "settings":
+        except Exception as exc:
+            self.log.event(
+                "block_end",
+                block=block_name,
+                line=lnum,
+                seconds=time.perf_counter() - start,
+                status="error",
+                error=f"{type(exc).__name__}: {exc}",
+            )
+            raise
+        self.log.event(
+            "block_end",
+            block=block_name,
+            line=lnum,
+            seconds=time.perf_counter() - start,
+            status="ok",
+        )
+
+    def _prune(self, blocks):
+        """Remove the blocks that are not needed for any output.
+
+        Prints an explanation for every removed block.
+        """
+        from .graph import live_blocks
+
+        live, outputs = live_blocks(blocks)
+        self.log.write("", "summary")
+        for index, (block_name, lnum, _) in enumerate(blocks):
+            if index in live:
                 continue
-            parameters = {
-                allv[0]: allv[1] if len(allv) == 2 else allv[1:] for allv in block
+            names = ", ".join(
+                f"{kind} '{name}'" for kind, name in sorted(outputs[index])
+            )
+            self.log.write(
+                f"# PRUNING {block_name} block @ line {lnum} because no LIST_OUTPUT, WRITE_PEST_FILES, or PLOT block uses its output ({names})."
+            )
+        self.log.write(
+            f"# PRUNING kept {len(live)} of {len(blocks)} blocks.", "summary"
+        )
+        return [block for index, block in enumerate(blocks) if index in live]
+
+    def _run_recorded(self, block_name, lnum, parameters):
+        """Run a block and return the entities that it created.
+
+        The result is the list of "_join" calls and the new metadata entries
+        made by the block.  "_add_recorded" adds them to another Tables
+        instance.
+        """
+        metadata = (
+            "v_table_metadata",
+            "c_table_metadata",
+            "s_table_metadata",
+            "e_table_metadata",
+            "g_table_metadata",
+        )
+        joined = []
+        join = self._join
+
+        def record(new_name, **tables):
+            joined.append((new_name, tables))
+            join(new_name, **tables)
+
+        self._join = record
+        before = {kind: set(getattr(self, kind)) for kind in metadata}
+        try:
+            self._run_block(block_name, lnum, parameters)
+        finally:
+            del self._join
+        new_metadata = {
+            kind: {
+                key: value
+                for key, value in getattr(self, kind).items()
+                if key not in before[kind]
             }
-            kwds.update(parameters)
-            parameters = {key.lower(): val for key, val in kwds.items() if val}
-            del parameters["start"]
-            del parameters["context"]
-
-            if os.path.exists("debug_tsblender"):
-                print(
-                    f"\nPROCESSING: {self.block_name} @ line number {self.line_number} with arguments {parameters}"
+            for kind in metadata
+        }
+        return joined, new_metadata
+
+    def _add_recorded(self, result):
+        """Add the entities returned by "_run_recorded"."""
+        joined, new_metadata = result
+        for new_name, tables in joined:
+            self._join(new_name, **tables)
+        for kind, entries in new_metadata.items():
+            getattr(self, kind).update(entries)
+
+    def _block_keys(self, blocks, cache_dir):
+        """Return the block cache key of each block.
+
+        The key of a block depends on the block name and parameters, the
+        content of the files that the block reads, and the keys of the blocks
+        that created the entities that the block reads.  The digests of the
+        files are kept in "cache_dir".
+        """
+        from .cache import block_key
+        from .graph import data_flow
+
+        producers, inputs, _ = data_flow(blocks)
+        keys = []
+        for index, (block_name, _, parameters) in enumerate(blocks):
+            keys.append(
+                block_key(
+                    block_name,
+                    parameters,
+                    files=sorted(
+                        name for kind, name in inputs[index] if kind == "file"
+                    ),
+                    upstream=[keys[i] for i in sorted(producers[index])],
+                    cache_dir=cache_dir,
                 )
+            )
+        return keys
 
-            # Call the function with the args and kwds collected into the
-            # parameters dictionary.
-            self.funcs[self.block_name]["f"](**parameters)
+    def _restore(self, block, key, cache_dir):
+        """Add the cached result of a block, return False if not cached."""
+        from .cache import load_block
+
+        result = load_block(cache_dir, key)
+        if result is None:
+            return False
+        self.log.write(
+            f"# RESTORED {block[0]} block @ line {block[1]} from the block cache."
+        )
+        self.log.event("block_restored", block=block[0], line=block[1])
+        self._add_recorded(result)
+        return True
+
+    def _entity_state(self, kind, name):
+        """Return the values of an entity in each of its stores.
+
+        A store that doesn't have the entity is left out, so the state of an
+        entity that doesn't exist is empty.
+        """
+        return {
+            store: getattr(self, store)[name]
+            for store in _ENTITY_STORES[kind]
+            if name in getattr(self, store)
+        }
+
+    def _set_entity_state(self, kind, name, state):
+        """Make an entity the same as the "state" from "_entity_state"."""
+        for store in _ENTITY_STORES[kind]:
+            if store in state:
+                getattr(self, store)[name] = state[store]
+            else:
+                getattr(self, store).pop(name, None)
+
+    def _run_parallel(self, blocks, jobs, keys=None, cache_dir=None):
+        """Run the blocks in up to "jobs" processes at the same time.
+
+        A block is started as soon as all of the blocks that it depends on
+        have finished.  See the "graph" module for the dependencies.  Blocks
+        that only create new entities are run by a pool of up to "jobs"
+        forked worker processes that live until all blocks are run, so the
+        files parsed and the hydrologic indices cached by a worker are used
+        by the later blocks that it runs.  A worker is sent the current
+        value of the entities that a block reads and writes only if its own
+        copy is out of date, and the new entities are sent back and added to
+        the tables.  Blocks that write files or change existing entities are
+        run in this process.  The workers are stopped before a SETTINGS
+        block so that later blocks see the new settings.  If a block fails no
+        new blocks are started and the error of the first failed block in
+        file order is raised.
+
+        If "keys" is given the results of blocks are taken from and stored in
+        the block cache in "cache_dir".
+        """
+        import multiprocessing
+        from multiprocessing.connection import wait
+
+        from .cache import save_block
+        from .graph import BARRIERS, LOCAL, data_flow, dependencies
+        from .runlog import RunLog
+
+        if "fork" not in multiprocessing.get_all_start_methods():
+            self._run_serial(blocks, keys, cache_dir)
+            return
+        context = multiprocessing.get_context("fork")
+        _preload()
+        self._plan_reads(blocks)
+        _, inputs, outputs = data_flow(blocks)
+
+        # The resource to the number of the block, counting from 1, that last
+        # changed it.  A worker has the same record of the entities that it
+        # has, a resource missing from both is as it was when the worker was
+        # started.
+        versions = {}
+        workers = []
+        idle = []
+
+        def work(conn):
+            # The events of the blocks are written to the run log by this
+            # process, the measurements if profiling are sent back with the
+            # results.
+            for other in workers:
+                other["conn"].close()
+            self.log = RunLog("quiet")
+            while True:
+                message = conn.recv()
+                if message is None:
+                    break
+                block, states = message
+                for (kind, name), state in states:
+                    self._set_entity_state(kind, name, state)
+                nprofile = len(self.block_profile or [])
+                try:
+                    result = self._run_recorded(*block)
+                    conn.send((True, result, (self.block_profile or [])[nprofile:]))
+                except Exception as exc:  # noqa: BLE001
+                    conn.send((False, exc, []))
+            conn.close()
+
+        def start_worker():
+            conn, child_conn = context.Pipe()
+            process = context.Process(target=work, args=(child_conn,))
+            process.start()
+            child_conn.close()
+            worker = {"process": process, "conn": conn, "versions": dict(versions)}
+            workers.append(worker)
+            return worker
+
+        def stop_workers():
+            for worker in workers:
+                with suppress(OSError):
+                    worker["conn"].send(None)
+                worker["conn"].close()
+                worker["process"].join()
+            workers.clear()
+            idle.clear()
+
+        def changed(index):
+            for resource in outputs[index]:
+                versions[resource] = index + 1
+
+        waiting = dict(enumerate(dependencies(blocks)))
+        done = set()
+        running = {}
+        errors = {}
+        try:
+            while waiting or running:
+                ready = [i for i, needs in waiting.items() if needs <= done]
+                while ready and not errors and len(running) < jobs:
+                    index = ready.pop(0)
+                    del waiting[index]
+                    block = blocks[index]
+                    if block[0] in LOCAL:
+                        if block[0] in BARRIERS:
+                            stop_workers()
+                        try:
+                            self._run_block(*block)
+                            changed(index)
+                            done.add(index)
+                        except Exception as exc:  # noqa: BLE001
+                            errors[index] = exc
+                    elif keys is not None and self._restore(
+                        block, keys[index], cache_dir
+                    ):
+                        changed(index)
+                        done.add(index)
+                    else:
+                        # The output so far is written before a fork so that
+                        # the worker doesn't write it again.
+                        self.log.flush(events=True)
+                        worker = idle.pop() if idle else start_worker()
+                        states = []
+                        for resource in inputs[index] | outputs[index]:
+                            if resource[0] == "file":
+                                continue
+                            if worker["versions"].get(resource) != versions.get(
+                                resource
+                            ):
+                                states.append((resource, self._entity_state(*resource)))
+                                worker["versions"][resource] = versions.get(resource)
+                        worker["conn"].send((block, states))
+                        self.log.event("block_start", block=block[0], line=block[1])
+                        running[worker["conn"]] = (index, worker, time.perf_counter())
+                        continue
+                    ready = [i for i, needs in waiting.items() if needs <= done]
+                if not running:
+                    if errors or not waiting:
+                        break
+                    continue
+                for conn in wait(list(running)):
+                    index, worker, start = running.pop(conn)
+                    try:
+                        success, result, measurements = conn.recv()
+                        if self.block_profile is not None:
+                            self.block_profile.extend(measurements)
+                        idle.append(worker)
+                    except EOFError:
+                        success = False
+                        result = RuntimeError(
+                            f"The process running block {blocks[index][0]} @ line "
+                            f"number {blocks[index][1]} exited unexpectedly."
+                        )
+                        workers.remove(worker)
+                        conn.close()
+                        worker["process"].join()
+                    self.log.event(
+                        "block_end",
+                        block=blocks[index][0],
+                        line=blocks[index][1],
+                        seconds=time.perf_counter() - start,
+                        status="ok" if success else "error",
+                        **(
+                            {}
+                            if success
+                            else {"error": f"{type(result).__name__}: {result}"}
+                        ),
+                    )
+                    if success:
+                        self._add_recorded(result)
+                        if keys is not None:
+                            save_block(cache_dir, keys[index], result)
+                        changed(index)
+                        for resource in outputs[index]:
+                            worker["versions"][resource] = versions[resource]
+                        done.add(index)
+                    else:
+                        errors[index] = result
+        finally:
+            stop_workers()
+        if errors:
+            raise errors[min(errors)]
+
+    def _run_serial(self, blocks, keys=None, cache_dir=None):
+        """Run the blocks one at a time in file order.
+
+        If "keys" is given the results of blocks are taken from and stored in
+        the block cache in "cache_dir".
+        """
+        from .cache import save_block
+        from .graph import LOCAL
+
+        self._plan_reads(blocks)
+        for index, block in enumerate(blocks):
+            if keys is None or block[0] in LOCAL:
+                self._run_block(*block)
+            elif not self._restore(block, keys[index], cache_dir):
+                save_block(cache_dir, keys[index], self._run_recorded(*block))
+
+    def run(
+        self,
+        infile,
+        running_context: Optional[str] = None,
+        plan_cache: bool = False,
+        cache_dir: Optional[str] = None,
+        jobs: int = 1,
+        prune: bool = False,
+        block_cache: bool = False,
+        file_cache: bool = False,
+        profile: Optional[str] = None,
+        log_level: Literal["quiet", "summary", "verbose"] = "verbose",
+        run_log: Optional[str] = None,
+    ):
+        """Parse and run a tsproc file."""
+        from .runlog import RunLog
+
+        self.log = RunLog(log_level, run_log)
+        try:
+            self._run_plan(
+                infile,
+                running_context,
+                plan_cache=plan_cache,
+                cache_dir=cache_dir,
+                jobs=jobs,
+                prune=prune,
+                block_cache=block_cache,
+                file_cache=file_cache,
+                profile=profile,
+            )
+        finally:
+            self.log.close()
+
+    def _write_listing(self, listing, running_context):
+        """Write every block of the tsproc file and if it is run or skipped."""
+        for block, lnum, context, runs in listing:
+            self.log.write("")
+            block_name = block[0][1]
+            if block_name == "SETTINGS":
+                self.log.write(f"# RUNNING SETTINGS block @ line {lnum}.")
+            elif runs:
+                self.log.write(
+                    f"# RUNNING following block @ line {lnum} because CONTEXT '{context}' matches running CONTEXT '{running_context}'."
+                )
+            else:
+                self.log.write(
+                    f"# SKIPPING following block @ line {lnum} because CONTEXT '{context}' doesn't match running CONTEXT '{running_context}'."
+                )
+            for line in block:
+                if line[0] == "start":
+                    self.log.write(f"START {block_name}")
+                else:
+                    varl = " ".join(line[1:])
+                    if varl.strip():
+                        self.log.write(f"  {line[0].upper()} {varl}")
+            self.log.write(f"END {block_name}")
+
+    def _run_plan(
+        self,
+        infile,
+        running_context,
+        plan_cache,
+        cache_dir,
+        jobs,
+        prune,
+        block_cache,
+        file_cache,
+        profile,
+    ):
+        """Parse and run a tsproc file, see "run"."""
+        start = time.perf_counter()
+        if profile:
+            self.block_profile = []
+        if plan_cache or block_cache or file_cache:
+            from .cache import default_cache_dir
+
+            cache_dir = default_cache_dir(cache_dir)
+        if file_cache:
+            self._file_cache_dir = cache_dir
+        plan = self._compile(
+            infile, running_context, cache_dir=cache_dir if plan_cache else None
+        )
+        running_context = plan["running_context"]
+
+        blocks = plan["blocks"]
+        self.log.event(
+            "run_start",
+            file=infile,
+            running_context=running_context,
+            blocks=len(blocks),
+        )
+        if self.log.keeps("verbose"):
+            self._write_listing(plan["listing"], running_context)
+        else:
+            self.log.write(
+                f"# RUNNING {len(blocks)} blocks with running CONTEXT '{running_context}'.",
+                "summary",
+            )
+
+        if prune:
+            blocks = self._prune(blocks)
+        keys = self._block_keys(blocks, cache_dir) if block_cache else None
+
+        # Run the blocks.
+        status = "error"
+        try:
+            if jobs > 1:
+                self._run_parallel(blocks, jobs, keys, cache_dir)
+            else:
+                self._run_serial(blocks, keys, cache_dir)
+            status = "ok"
+        finally:
+            if profile:
+                from .cache import tsblender_version
+                from .profiling import write_report
+
+                write_report(self.block_profile, profile, tsblender_version())
+                self.log.write("", "summary")
+                self.log.write(
+                    f"# PROFILE of {len(self.block_profile)} blocks written to '{profile}.txt' and '{profile}.json'.",
+                    "summary",
+                )
+            seconds = time.perf_counter() - start
+            self.log.event("run_end", seconds=seconds, status=status)
+        if not self.log.keeps("verbose"):
+            self.log.write(
+                f"# FINISHED {len(blocks)} blocks in {seconds:.2f} seconds.", "summary"
+            )
+        self.log.flush()
 
         if os.path.exists("debug_tsblender"):
             print("\nTIME SERIES")
-            print(self.series)
+            print(pd.DataFrame(self.series))
             print("\nS_TABLE")
             print(self.s_table)
             print("\nG_TABLE")
@@ -3329,8 +4154,175 @@ pcf
             print(self.c_table)
             print(self.e_table_metadata)
 
+    def add_series(self, name, series, index=None):
+        """Add a time series held in memory to the tables.
+
+        Parameters
+        ----------
+        name : str
+            The name of the new series.
+        series : pandas.Series or array_like
+            The values of the series.  A pandas Series with a DatetimeIndex is
+            used as is, any other array_like needs the "index".
+        index : array_like, optional
+            The dates of the values if "series" is not a pandas Series.
+        """
+        if not isinstance(series, pd.Series):
+            if index is None:
+                raise ValueError(
+                    tsutils.error_wrapper(
+                        f"""
+                        The dates of series "{name}" are needed in "index"
+                        when the values are not a pandas Series.
+                        """
+                    )
+                )
+            series = pd.Series(np.asarray(series), index=pd.DatetimeIndex(index))
+        self._join(name.upper(), series=series)
+
+    def execute(self, script, running_context=None, write_files=False):
+        """Run a tsproc script against the tables and return the results.
+
+        Unlike "run" the listing of the blocks is not printed and by default
+        no files are written: LIST_OUTPUT only records what it would list and
+        PLOT and WRITE_PEST_FILES are skipped.  The listed entities are
+        available as the PEST observations of the results, see
+        "observations".
+
+        Parameters
+        ----------
+        script : str or dict
+            The name of a tsproc file, the text of a tsproc script, or the
+            plan returned by "parse".
+        running_context : str, optional
+            The context to run.  The default is None which uses the context
+            specified in the SETTINGS block.  Not used if "script" is a plan.
+        write_files : bool, optional
+            If True, LIST_OUTPUT, PLOT, and WRITE_PEST_FILES write their files
+            as in "run".
+
+        Returns
+        -------
+        dict
+            See "results".
+        """
+        plan = (
+            script if isinstance(script, dict) else self._parse(script, running_context)
+        )
+        self.write_files = write_files
+        try:
+            self._run_serial(plan["blocks"])
+        finally:
+            self.write_files = True
+        return self.results()
+
+    def observations(self, file=None):
+        """Return the PEST observations listed by LIST_OUTPUT.
+
+        The observations are named like the instruction files written for
+        WRITE_PEST_FILES, "{name}1", "{name}2", ... in lower case, and are in
+        the order that LIST_OUTPUT lists them.  C_TABLEs and G_TABLEs other
+        than from FLOW_DURATION and HYDROLOGIC_INDICES are not observations.
+
+        Parameters
+        ----------
+        file : str, optional
+            Only the observations of the LIST_OUTPUT block with this "file".
+            The default is the observations of all LIST_OUTPUT blocks in the
+            order that they were run.
+
+        Returns
+        -------
+        pandas.Series
+            The float64 values of the observations indexed by name.
+        """
+        if file is None:
+            arguments = list(self.list_output_arguments.values())
+        else:
+            arguments = [self.list_output_arguments[file]]
+
+        names = []
+        values = []
+
+        def add(name, table):
+            names.extend(f"{name.lower()}{row}" for row in range(1, len(table) + 1))
+            values.append(table.to_numpy(dtype="float64"))
+
+        for argument in arguments:
+            for kind in ["series", "s_table", "v_table", "e_table", "g_table"]:
+                entity_names = argument[f"{kind}_name"]
+                if isinstance(entity_names, str):
+                    entity_names = [entity_names]
+                for name in entity_names:
+                    if kind == "series":
+                        start, end = self.series_dates[name.upper()]
+                        table = self._get_series(name).loc[start:end].dropna()
+                    elif kind == "g_table":
+                        metadata = self.g_table_metadata[name.upper()]
+                        if metadata["kind"] not in (
+                            "flow_duration",
+                            "hydrologic_indices",
+                        ):
+                            continue
+                        table = self._get_g_table(name)
+                    else:
+                        table = getattr(self, f"_get_{kind}")(name)
+                    add(name, table)
+        return pd.Series(
+            np.concatenate(values) if values else np.array([], dtype="float64"),
+            index=pd.Index(names, dtype=object),
+            name="observations",
+        )
+
+    def results(self):
+        """Return the series, tables, and PEST observations.
+
+        Returns
+        -------
+        dict
+            "series" is a DataFrame with a column for each series, "s_table",
+            "c_table", "v_table", "e_table", and "g_table" are dictionaries of
+            table name to the pandas Series of the table, and "observations"
+            is the Series returned by "observations".
+        """
+        results = {"series": pd.DataFrame(self.series)}
+        for kind in ["s_table", "c_table", "v_table", "e_table", "g_table"]:
+            results[kind] = dict(getattr(self, kind))
+        results["observations"] = self.observations()
+        return results
+
 
-def run(infile, running_context: Optional[str] = None):
+def _preload():
+    """Import every block implementation and the heavy dependencies.
+
+    Used before forking processes so that every process doesn't have to import
+    them again.
+    """
+    for value in list(vars(Tables).values()):
+        if isinstance(value, _LazyMethod):
+            value.load(Tables)
+
+    import hydrotoolbox.hydrotoolbox  # noqa: F401
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot
+    import scipy.signal  # noqa: F401
+
+
+def run(
+    infile,
+    running_context: Optional[str] = None,
+    plan_cache: bool = False,
+    cache_dir: Optional[str] = None,
+    jobs: int = 1,
+    prune: bool = False,
+    block_cache: bool = False,
+    file_cache: bool = False,
+    profile: Optional[str] = None,
+    log_level: Literal["quiet", "summary", "verbose"] = "verbose",
+    run_log: Optional[str] = None,
+):
     """
     Parse and run a tsproc or tsblender file.
 
@@ -3342,9 +4334,313 @@ def run(infile, running_context: Optional[str] = None):
         The context to run in the tsproc file.  The default is None which uses
         the context specified in the SETTINGS block in the tsproc/tsblender
         file.
+    plan_cache : bool, optional
+        If True, store the parsed, unrolled, and context filtered blocks in
+        the plan cache and on later runs skip parsing if the tsproc file,
+        running context, and tsblender version are unchanged.
+    cache_dir : str, optional
+        The cache directory.  The default is the value of the
+        TSBLENDER_CACHE_DIR environment variable or ".tsblender_cache" in the
+        current working directory.
+    jobs : int, optional
+        The number of blocks to run at the same time.  Blocks that do not
+        depend on each other through the series, tables, and files that they
+        read and write are run concurrently in up to "jobs" processes.  The
+        results are the same as running the blocks in file order.  The
+        default is 1 which runs the blocks one at a time in file order.
+    prune : bool, optional
+        If True, only run the blocks whose results are used, directly or
+        through other blocks, by a LIST_OUTPUT, WRITE_PEST_FILES, or PLOT
+        block.  A line is printed for every block that is not run.
+    block_cache : bool, optional
+        If True, store the series and tables created by each block in the
+        block cache and on later runs restore them instead of running the
+        block if the block, the content of the files that it reads, and all
+        of the blocks that it depends on are unchanged.  Blocks that write
+        files or change existing entities are always run.  Uses the
+        "cache_dir" directory.
+    file_cache : bool, optional
+        If True, store a binary copy of each parsed SSF, STATVAR, GSFLOW
+        gage, PLOTGEN, and UFORE hydrology file in the file cache and on later
+        runs load it instead of parsing the file again if the content of the
+        file is unchanged.  The least recently used copies are removed when
+        the total size is larger than the TSBLENDER_CACHE_MAX_MB environment
+        variable, default 1024 megabytes.  Uses the "cache_dir" directory.
+    profile : str, optional
+        If given, measure every block that is run and write the report as a
+        table, slowest blocks first, to "{profile}.txt" and as JSON to
+        "{profile}.json".  For each block the report has the block name, line
+        number, wall and CPU time in seconds, the increase of the peak
+        resident set size of the process in bytes, the number of rows of the
+        series and tables that the block reads and writes, and the size in
+        bytes of the files that it reads and writes.
+    log_level : str, optional
+        The amount of output.  "verbose", the default, lists every block of
+        the tsproc file and if it is run or skipped.  "summary" only prints
+        the number of blocks run and the time of the run.  "quiet" prints
+        nothing except the warnings and output of the blocks.
+    run_log : str, optional
+        If given, write a JSON object on each line of this file for the start
+        and end of the run and of every block with the "time" in seconds since
+        the epoch.  The end events have the "seconds" taken and a "status" of
+        "ok" or "error" with the "error" message.
     """
+    if jobs < 1:
+        raise ValueError(
+            tsutils.error_wrapper(
+                f"""
+                The "jobs" option must be 1 or greater.  You gave {jobs}.
+                """
+            )
+        )
     data = Tables()
-    data.run(infile, running_context)
+    data.run(
+        infile,
+        running_context,
+        plan_cache=plan_cache,
+        cache_dir=cache_dir,
+        jobs=jobs,
+        prune=prune,
+        block_cache=block_cache,
+        file_cache=file_cache,
+        profile=profile,
+        log_level=log_level,
+        run_log=run_log,
+    )
+
+
+def _run_realization(data, blocks, directory):
+    """Run the blocks in "directory" without printing anything.
+
+    Returns None or the error message if a block fails.
+    """
+    from contextlib import redirect_stderr, redirect_stdout
+
+    try:
+        os.chdir(directory)
+        with (
+            open(os.devnull, "w") as devnull,
+            redirect_stdout(devnull),
+            redirect_stderr(devnull),
+        ):
+            data._run_serial(blocks)
+    except Exception as exc:  # noqa: BLE001
+        return f"{type(exc).__name__}: {exc}"
+    return None
+
+
+def run_batch(
+    infile,
+    dirs,
+    running_context: Optional[str] = None,
+    jobs: Optional[int] = None,
+):
+    """
+    Run a tsproc or tsblender file in each of many realization directories.
+
+    The file is parsed once.  The blocks that read the same files in every
+    directory, for example the observations, and only depend on such blocks
+    are run once, then the rest of the blocks are run in each directory in
+    up to "jobs" processes at the same time.  Each directory
+    gets its own LIST_OUTPUT and other output files.  A failure in one
+    directory does not stop the others.  A summary with the status and time
+    of every directory is printed at the end.
+
+    Parameters
+    ----------
+    infile : str
+        The tsproc file to parse.  File names in the tsproc file are relative
+        to each realization directory.
+    dirs : list
+        The realization directories.  Glob patterns are expanded.
+    running_context : str, optional
+        The context to run in the tsproc file.  The default is None which uses
+        the context specified in the SETTINGS block in the tsproc/tsblender
+        file.
+    jobs : int, optional
+        The number of directories to run at the same time.  The default is
+        the number of CPUs.
+
+    Returns
+    -------
+    list
+        For each directory a dictionary with the "dir", "success", "seconds",
+        and "error" message of the run.
+    """
+    import glob
+    import multiprocessing
+    from multiprocessing.connection import wait
+
+    from .graph import shared_blocks
+
+    if isinstance(dirs, str):
+        dirs = [dirs]
+    dirs = [
+        name for pattern in dirs for name in sorted(glob.glob(pattern)) or [pattern]
+    ]
+    if not dirs:
+        raise ValueError(
+            tsutils.error_wrapper(
+                """
+                There are no realization directories to run.
+                """
+            )
+        )
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if jobs < 1:
+        raise ValueError(
+            tsutils.error_wrapper(
+                f"""
+                The "jobs" option must be 1 or greater.  You gave {jobs}.
+                """
+            )
+        )
+
+    data = Tables()
+    blocks = data._parse(infile, running_context)["blocks"]
+    cwd = os.getcwd()
+    results = []
+    if "fork" not in multiprocessing.get_all_start_methods():
+        # Every directory is run from the start in this process.
+        for directory in dirs:
+            start = time.perf_counter()
+            error = _run_realization(Tables(), blocks, directory)
+            os.chdir(cwd)
+            results.append((directory, error, time.perf_counter() - start))
+        nshared = 0
+        shared_seconds = 0.0
+    else:
+        context = multiprocessing.get_context("fork")
+        _preload()
+
+        # The shared blocks are run once and the forked processes start with
+        # their results.
+        start = time.perf_counter()
+        shared = shared_blocks(
+            blocks,
+            lambda name: (
+                len({os.path.realpath(os.path.join(i, name)) for i in dirs}) == 1
+            ),
+        )
+        try:
+            os.chdir(dirs[0])
+            data._run_serial(
+                [block for index, block in enumerate(blocks) if index in shared]
+            )
+        finally:
+            os.chdir(cwd)
+        nshared = len(shared)
+        shared_seconds = time.perf_counter() - start
+        model_blocks = [
+            block for index, block in enumerate(blocks) if index not in shared
+        ]
+
+        def child(directory, conn):
+            start = time.perf_counter()
+            error = _run_realization(data, model_blocks, directory)
+            conn.send((error, time.perf_counter() - start))
+            conn.close()
+
+        waiting = list(dirs)
+        running = {}
+        while waiting or running:
+            while waiting and len(running) < jobs:
+                directory = waiting.pop(0)
+                recv_conn, send_conn = context.Pipe(duplex=False)
+                process = context.Process(target=child, args=(directory, send_conn))
+                process.start()
+                send_conn.close()
+                running[recv_conn] = (directory, process, time.perf_counter())
+            for conn in wait(list(running)):
+                directory, process, start = running.pop(conn)
+                try:
+                    error, seconds = conn.recv()
+                except EOFError:
+                    error = "The process exited unexpectedly."
+                    seconds = time.perf_counter() - start
+                conn.close()
+                process.join()
+                results.append((directory, error, seconds))
+        results.sort(key=lambda result: dirs.index(result[0]))
+
+    print(
+        f"# BATCH ran {nshared} of {len(blocks)} blocks once for all {len(dirs)} directories in {shared_seconds:.2f} seconds."
+    )
+    for directory, error, seconds in results:
+        status = "FAILED" if error else "ok"
+        print(f"# BATCH {status:<6} {seconds:9.2f} seconds  {directory}")
+        if error:
+            print(f"#     {error}")
+    nfailed = sum(1 for _, error, _ in results if error)
+    print(
+        f"# BATCH {len(results) - nfailed} of {len(results)} directories succeeded, {nfailed} failed."
+    )
+    return [
+        {
+            "dir": directory,
+            "success": error is None,
+            "seconds": seconds,
+            "error": error,
+        }
+        for directory, error, seconds in results
+    ]
+
+
+def parse(infile, running_context: Optional[str] = None):
+    """
+    Parse a tsproc or tsblender file into a plan that can be run many times.
+
+    Parameters
+    ----------
+    infile : str
+        The tsproc file to parse.
+    running_context : str, optional
+        The context to run in the tsproc file.  The default is None which uses
+        the context specified in the SETTINGS block in the tsproc/tsblender
+        file.
+
+    Returns
+    -------
+    dict
+        The plan to pass to "evaluate" or "Tables.execute".
+    """
+    return Tables()._parse(infile, running_context)
+
+
+def evaluate(script, series=None, running_context: Optional[str] = None):
+    """
+    Run a tsproc script on series held in memory and return the results.
+
+    No LIST_OUTPUT, PLOT, or WRITE_PEST_FILES files are written.  The
+    entities that the LIST_OUTPUT blocks would list are returned as the PEST
+    observations.
+
+    Parameters
+    ----------
+    script : str or dict
+        The name of a tsproc file, the text of a tsproc script, or the plan
+        returned by "parse".
+    series : dict, optional
+        Series name to pandas Series with a DatetimeIndex.  Added to the tables
+        before the script is run.
+    running_context : str, optional
+        The context to run in the script.  The default is None which uses the
+        context specified in the SETTINGS block.  Not used if "script" is a
+        plan.
+
+    Returns
+    -------
+    dict
+        "series" is a DataFrame with a column for each series, "s_table",
+        "c_table", "v_table", "e_table", and "g_table" are dictionaries of
+        table name to the pandas Series of the table, and "observations" is a
+        Series of the PEST observations indexed by observation name.
+    """
+    data = Tables()
+    for name, values in (series or {}).items():
+        data.add_series(name, values)
+    return data.execute(script, running_context)
 
 
 def main():
@@ -3365,9 +4661,115 @@ def main():
 
     @cltoolbox.command("run")
     @tsutils.copy_doc(run)
-    def run_cli(infile, running_context=None):
+    def run_cli(
+        infile,
+        running_context=None,
+        plan_cache=False,
+        cache_dir=None,
+        jobs=1,
+        prune=False,
+        block_cache=False,
+        file_cache=False,
+        profile=None,
+        log_level="verbose",
+        run_log=None,
+    ):
         """Parse a tsproc file."""
-        run(infile, running_context)
+        run(
+            infile,
+            running_context,
+            plan_cache=plan_cache,
+            cache_dir=cache_dir,
+            jobs=jobs,
+            prune=prune,
+            block_cache=block_cache,
+            file_cache=file_cache,
+            profile=profile,
+            log_level=log_level,
+            run_log=run_log,
+        )
+
+    @cltoolbox.command("run-batch")
+    @cltoolbox.arg("dirs", nargs="+")
+    @cltoolbox.arg("jobs", type=int)
+    @tsutils.copy_doc(run_batch)
+    def run_batch_cli(infile, dirs=None, running_context=None, jobs=None):
+        """Run a tsproc file in each of many realization directories."""
+        results = run_batch(infile, dirs or [], running_context, jobs=jobs)
+        if not all(result["success"] for result in results):
+            sys.exit(1)
+
+    @cltoolbox.command("cache")
+    def cache_cli(clear=False, cache_dir=None):
+        """List or clear the tsblender cache.
+
+        Prints the number of entries and the size of the plan, block, file,
+        and file digest caches and the source of every parsed file in the file cache, most
+        recently used first.
+
+        Parameters
+        ----------
+        clear : bool, optional
+            If True, remove everything from the cache.
+        cache_dir : str, optional
+            The cache directory.  The default is the value of the
+            TSBLENDER_CACHE_DIR environment variable or ".tsblender_cache" in
+            the current working directory.
+        """
+        from .cache import cache_usage, clear_cache, default_cache_dir, parsed_files
+
+        cache_dir = default_cache_dir(cache_dir)
+        if clear:
+            clear_cache(cache_dir)
+        print(f"Cache directory: {cache_dir}")
+        for kind, (count, size) in cache_usage(cache_dir).items():
+            print(f"{kind:<8}{count:>8} entries{size:>14} bytes")
+        for used, size, source in parsed_files(cache_dir):
+            used = datetime.datetime.fromtimestamp(used)
+            print(f"  {used:%Y-%m-%d %H:%M:%S}{size:>14} {source}")
+
+    @cltoolbox.command("serve")
+    def serve_cli(socket_path=None):
+        """Start a warm tsblender server listening on a local UNIX socket.
+
+        The server imports tsblender and all of its dependencies once and then
+        forks a new process for each "tsblender client ..." request.
+
+        Parameters
+        ----------
+        socket_path : str, optional
+            The path of the UNIX socket.  The default is the value of the
+            TSBLENDER_SOCKET environment variable or "tsblender-{user}.sock"
+            in the temporary directory.
+        """
+        from .server import serve
+
+        serve(socket_path)
+
+    @cltoolbox.command("client")
+    def client_cli(infile, running_context=None, socket_path=None):
+        """Run a tsproc file on a warm "tsblender serve" server.
+
+        Same as "tsblender run ..." except that the script is run by the
+        server in the current working directory.  The exit status, standard
+        output and standard error of the run are returned to the client.
+
+        Parameters
+        ----------
+        infile : str
+            The tsproc file to parse.
+        running_context : str, optional
+            The context to run in the tsproc file.  The default is None which
+            uses the context specified in the SETTINGS block in the
+            tsproc/tsblender file.
+        socket_path : str, optional
+            The path of the UNIX socket.  The default is the value of the
+            TSBLENDER_SOCKET environment variable or "tsblender-{user}.sock"
+            in the temporary directory.
+        """
+        from .server import client
+
+        sys.exit(client(infile, running_context, socket_path))
 
     cltoolbox.main()
 
@@ -0,0 +1,88 @@
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tsblender import tsblender
+
+SCRIPT = """
+START SETTINGS
+  CONTEXT all
+END SETTINGS
+
+START SERIES_EQUATION
+  CONTEXT all
+  NEW_SERIES_NAME flow_cfs
+  EQUATION flow * 35.3147
+END SERIES_EQUATION
+
+START LIST_OUTPUT
+  CONTEXT all
+  FILE out.txt
+  SERIES_NAME flow_cfs
+  SERIES_FORMAT long
+END LIST_OUTPUT
+"""
+
+
+def test_evaluate(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    index = pd.date_range("2000-01-01", periods=100, freq="D")
+    flow = pd.Series(np.arange(100, dtype="float64") / 10.0, index=index)
+    flow.iloc[7] = np.nan
+
+    results = tsblender.evaluate(SCRIPT, series={"flow": flow})
+
+    # Nothing is written by LIST_OUTPUT.
+    assert list(tmp_path.iterdir()) == []
+    expected = flow * 35.3147
+    pd.testing.assert_series_equal(
+        results["series"]["FLOW_CFS"], expected, check_names=False
+    )
+    observations = results["observations"]
+    assert observations.index.tolist() == [f"flow_cfs{i}" for i in range(1, 100)]
+    np.testing.assert_array_equal(observations.to_numpy(), expected.dropna())
+
+
+def test_add_series():
+    data = tsblender.Tables()
+    index = pd.date_range("2000-01-01", periods=3, freq="D")
+    data.add_series("flow", [1, 2, 3], index=index)
+    assert data.series["FLOW"].dtype == "float64"
+    assert data.series_dates["FLOW"] == [index[0], index[-1]]
+    with pytest.raises(ValueError):
+        data.add_series("stage", [1, 2, 3])
+
+
+def test_observations_match_instruction_file(test_dir):
+    test_dir("garfoot_creek_test", "garfoot")
+    plan = tsblender.parse("garfoot_creek_tsblender.inp")
+    before = sorted(os.listdir("."))
+
+    data = tsblender.Tables()
+    data.execute(plan)
+    assert sorted(os.listdir(".")) == before
+
+    # The observations are named and ordered like the instruction file and
+    # have the values read by the instructions from the LIST_OUTPUT file.
+    observations = data.observations("tsp_SIMULATED_VALUES.txt")
+    reference = Path("tsblender_reference")
+    with open(reference / "tsp_SIMULATED_VALUES.txt") as fpi:
+        lines = fpi.read().split("\n")
+    with open(reference / "observation.ins") as fpi:
+        instructions = fpi.readlines()[1:]
+    names = []
+    values = []
+    line = -1
+    for instruction in instructions:
+        skip, name, first, last = re.match(
+            r"l(\d+) *\[(.*)\](\d+):(\d+)", instruction
+        ).groups()
+        line += int(skip)
+        names.append(name)
+        values.append(float(lines[line][int(first) - 1 : int(last)]))
+    assert observations.index.tolist() == names
+    np.testing.assert_allclose(observations.to_numpy(), values, rtol=1.0e-6)
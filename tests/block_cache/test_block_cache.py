@@ -0,0 +1,93 @@
+import os
+import pickle
+import time
+
+import pytest
+
+from tsblender import cache, tsblender
+
+
+def test_block_cache(tmp_path, capsys, flow_duration, compare_reference):
+    cache_dir = str(tmp_path / "cache")
+    outputs = [
+        "hi_test_flow_duration_obs_output.txt",
+        "hi_test_flow_duration_sim_output.txt",
+        "pest.pst",
+        "sim_vals_flowdur.ins",
+    ]
+
+    tsblender.run(
+        "black_earth_creek_flow_duration.inp", block_cache=True, cache_dir=cache_dir
+    )
+    assert "# RESTORED" not in capsys.readouterr().out
+    ncached = len(os.listdir(os.path.join(cache_dir, "blocks")))
+    assert ncached > 0
+
+    for fname in outputs:
+        os.remove(fname)
+    tsblender.run(
+        "black_earth_creek_flow_duration.inp", block_cache=True, cache_dir=cache_dir
+    )
+    assert capsys.readouterr().out.count("# RESTORED") == ncached
+    compare_reference(outputs)
+
+    # A changed model output file invalidates the blocks that depend on it,
+    # but the blocks on the observed series are still restored.
+    with open("gsflow_sumq_05406500.ssf", "a") as fpo:
+        fpo.write("\n")
+    tsblender.run(
+        "black_earth_creek_flow_duration.inp", block_cache=True, cache_dir=cache_dir
+    )
+    out = capsys.readouterr().out
+    assert 0 < out.count("# RESTORED") < ncached
+    assert "# RESTORED GET_MUL_SERIES_SSF block @ line 13" not in out
+    compare_reference(outputs)
+
+
+def test_block_cache_unloadable(tmp_path, capsys, flow_duration, compare_reference):
+    cache_dir = str(tmp_path / "cache")
+    tsblender.run(
+        "black_earth_creek_flow_duration.inp", block_cache=True, cache_dir=cache_dir
+    )
+
+    # Pickles from other versions of the libraries can fail with any error,
+    # here a ModuleNotFoundError.
+    blocks_dir = os.path.join(cache_dir, "blocks")
+    for fname in os.listdir(blocks_dir):
+        with open(os.path.join(blocks_dir, fname), "wb") as fpo:
+            fpo.write(b"cno_such_module\nresult\n.")
+    with pytest.raises(ModuleNotFoundError):
+        pickle.loads(b"cno_such_module\nresult\n.")
+    assert cache.load_block(cache_dir, fname[: -len(".pickle")]) is None
+
+    capsys.readouterr()
+    tsblender.run(
+        "black_earth_creek_flow_duration.inp", block_cache=True, cache_dir=cache_dir
+    )
+    assert "# RESTORED" not in capsys.readouterr().out
+    compare_reference()
+
+
+def test_file_digest(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    file = tmp_path / "data.txt"
+    file.write_text("first")
+    assert cache.file_digest(str(file), cache_dir) == cache.file_digest(
+        str(tmp_path / ".." / tmp_path.name / "data.txt")
+    )
+    # A file modified in the last second isn't remembered.
+    assert not os.path.exists(os.path.join(cache_dir, "digests"))
+
+    mtime_ns = time.time_ns() - 10 * 10**9
+    os.utime(file, ns=(mtime_ns, mtime_ns))
+    first = cache.file_digest(str(file), cache_dir)
+
+    # The same size and modification time in a later run isn't hashed again.
+    monkeypatch.setattr(cache, "_digests", {})
+    file.write_text("other")
+    os.utime(file, ns=(mtime_ns, mtime_ns))
+    assert cache.file_digest(str(file), cache_dir) == first
+
+    os.utime(file, ns=(mtime_ns + 1, mtime_ns + 1))
+    assert cache.file_digest(str(file), cache_dir) != first
+    assert cache.file_digest(str(tmp_path / "missing.txt"), cache_dir) == "missing"
@@ -0,0 +1,64 @@
+import difflib
+import shutil
+from pathlib import Path
+
+import pytest
+
+# The files written by the script of black_earth_creek_flow_duration_test.
+FLOW_DURATION_OUTPUTS = [
+    "hi_test_flow_duration_obs_output.txt",
+    "hi_test_flow_duration_sim_output.txt",
+    "pest.pst",
+    "sim_vals_flowdur.ins",
+]
+
+
+@pytest.fixture
+def test_dir(tmp_path, monkeypatch):
+    """Return a function that copies a test directory and changes to it.
+
+    The directory is copied into "tmp_path" and the working directory is
+    restored at the end of the test.
+    """
+
+    def copy(name, target=None):
+        target_dir = tmp_path / (target or name)
+        shutil.copytree(Path(__file__).parent / name, target_dir)
+        monkeypatch.chdir(target_dir)
+        return target_dir
+
+    return copy
+
+
+@pytest.fixture
+def flow_duration(test_dir):
+    """Change to a copy of black_earth_creek_flow_duration_test."""
+    return test_dir("black_earth_creek_flow_duration_test", "black_creek_flow_duration")
+
+
+@pytest.fixture
+def compare_reference():
+    """Return a function that compares files to those in tsblender_reference.
+
+    The number of lines of the unified diff of each file must be one of
+    "sizes".
+    """
+
+    def compare(fnames=FLOW_DURATION_OUTPUTS, sizes=(0, 34)):
+        for fname in fnames:
+            with open(fname) as file1:
+                file1_info = file1.readlines()
+            with open(str(Path("tsblender_reference") / fname)) as file2:
+                file2_info = file2.readlines()
+
+            diff = difflib.unified_diff(
+                file1_info,
+                file2_info,
+                fromfile="file1.py",
+                tofile="file2.py",
+                lineterm="",
+            )
+
+            assert len(list(diff)) in sizes, fname
+
+    return compare
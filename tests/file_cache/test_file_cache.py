@@ -0,0 +1,93 @@
+import pandas as pd
+
+from tsblender import cache, tsblender
+from tsblender.get_series import get_series_ssf
+
+SSF = """\
+A	01/01/2000	00:00:00	1.0
+B	01/01/2000	00:00:00	10.0
+A	01/02/2000	00:00:00	2.0
+B	01/02/2000	00:00:00	20.0
+A	01/03/2000	00:00:00	3.0
+B	01/03/2000	00:00:00	30.0
+"""
+
+
+def test_file_cache(tmp_path, monkeypatch):
+    reads = []
+    _read_ssf = get_series_ssf._read_ssf
+
+    def read_ssf(file):
+        reads.append(file)
+        return _read_ssf(file)
+
+    monkeypatch.setattr(get_series_ssf, "_read_ssf", read_ssf)
+    file = tmp_path / "both.ssf"
+    file.write_text(SSF)
+
+    data = tsblender.Tables()
+    data.get_series_ssf(file=str(file), site="A", new_series_name="a")
+    data.get_series_ssf(
+        file=str(file), site="B", new_series_name="b", date_1="01/02/2000"
+    )
+    assert len(reads) == 1
+    assert data._get_series("a").tolist() == [1.0, 2.0, 3.0]
+    assert data._get_series("b").tolist() == [20.0, 30.0]
+
+    # A file that changed is parsed again.
+    file.write_text(SSF + "A	01/04/2000	00:00:00	4.0\n")
+    data.get_series_ssf(file=str(file), site="A", new_series_name="c")
+    assert len(reads) == 2
+    assert data._get_series("c").tolist() == [1.0, 2.0, 3.0, 4.0]
+
+
+def test_sidecar_cache(tmp_path, monkeypatch):
+    reads = []
+    _read_ssf = get_series_ssf._read_ssf
+
+    def read_ssf(file):
+        reads.append(file)
+        return _read_ssf(file)
+
+    monkeypatch.setattr(get_series_ssf, "_read_ssf", read_ssf)
+    file = tmp_path / "both.ssf"
+    file.write_text(SSF)
+    cache_dir = tmp_path / "cache"
+
+    # Later runs load the binary copy instead of parsing the file.
+    for _ in range(2):
+        data = tsblender.Tables()
+        data._file_cache_dir = str(cache_dir)
+        data.get_series_ssf(file=str(file), site="B", new_series_name="b")
+        assert data._get_series("b").tolist() == [10.0, 20.0, 30.0]
+    assert len(reads) == 1
+    assert cache.parsed_files(cache_dir)[0][2] == str(file)
+
+    cache.clear_cache(cache_dir, "files")
+    assert cache.cache_usage(cache_dir)["files"] == (0, 0)
+
+
+def test_parsed_round_trip(tmp_path):
+    index = pd.date_range("2000-01-01", periods=3, name="Datetime")
+    frame = pd.DataFrame(
+        {
+            "site": pd.Categorical(["A", "B", "A"]),
+            "value": [1.0, None, 3.0],
+        },
+        index=index,
+    )
+    parsed = (pd.Index(["x_1", "y_2"]), index, frame)
+    for number in range(3):
+        cache.save_parsed(tmp_path, f"key{number}", parsed, max_size=1)
+    loaded = cache.load_parsed(tmp_path, "key2")
+    assert loaded[0].equals(parsed[0])
+    assert loaded[1].freqstr == "D"
+    pd.testing.assert_frame_equal(loaded[2], frame)
+
+    # Only the most recently used entry fits in one byte.
+    assert cache.load_parsed(tmp_path, "key0") is None
+    assert len(cache.parsed_files(tmp_path)) == 1
+
+    # Objects are not stored.
+    cache.save_parsed(tmp_path, "key3", pd.Series([object()]))
+    assert cache.load_parsed(tmp_path, "key3") is None
@@ -0,0 +1,146 @@
+import numpy as np
+import pytest
+from fortranformat import FortranRecordWriter
+
+from tsblender.fortran import record_writer
+
+# The formats used by LIST_OUTPUT.
+FORMATS = [
+    "(t5, a, t55, 1PG14.7, /)",
+    "(1x, a, t20, a10, 3x, a8, 3x, g16.9, /)",
+    "(4x, g16.9, /)",
+    "(4x, a10, 3x, g16.9, /)",
+    "(t5, 'From ', a10, ' ', a8, ' to ', a10, ' ', a8, '  volume = ', G18.12, /)",
+    (
+        "(t4, 'Flow', t19, 'Time delay (', a, ')', t40, 'Time ', a, ' (', a, ')', "
+        "t60, 'Fraction of time ', a, ' threshold', /)"
+    ),
+    "(t2, g14.7, t20, g14.7, t40, g14.7, t63, g14.7, /)",
+    "(t4, a, t82, g14.7, /)",
+    "t4, 'Flow duration curve for ', a, ' ', a, ':', a, t85, 'Value', /",
+    "('l', a, t6, '[', a, a, ']42:65', /)",
+    "('l', a, t6, '[', a, a, ']2:25', /)",
+]
+
+FLOATS = [
+    0.0,
+    -0.0,
+    1.0,
+    -1.0,
+    0.5,
+    -123.456,
+    0.1,
+    0.09999999995,
+    9.9999999995,
+    999999999.5,
+    1.0e-300,
+    -2.5e300,
+    5.0e-324,
+    1.7976931348623157e308,
+    1.0e100,
+    -1.0e-100,
+    float("nan"),
+    float("inf"),
+    float("-inf"),
+]
+
+STRINGS = [
+    "",
+    "flow",
+    "a_rather_long_series_name",
+    "a_name_that_is_longer_than_the_columns_of_the_record_and_then_some",
+]
+
+
+def _values(fmt):
+    """Return rows of values for the "A" and "G" edit descriptors of fmt."""
+    kinds = [i[0] for i in record_writer(fmt).operations if i[0] in ("A", "G")]
+    rng = np.random.default_rng(len(fmt))
+    rows = []
+    for number in range(len(FLOATS) * len(STRINGS)):
+        row = []
+        for column, kind in enumerate(kinds):
+            if kind == "A":
+                row.append(STRINGS[(number + column) % len(STRINGS)])
+            else:
+                row.append(FLOATS[(number * 7 + column) % len(FLOATS)])
+        rows.append(row)
+    rows.extend(
+        [
+            str(rng.integers(0, 10**6))
+            if kind == "A"
+            else rng.standard_normal() * 10.0 ** rng.integers(-12, 12)
+            for kind in kinds
+        ]
+        for _ in range(200)
+    )
+    return rows
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_write(fmt):
+    writer = FortranRecordWriter(fmt)
+    compiled = record_writer(fmt)
+    for row in _values(fmt):
+        assert compiled.write(row) == writer.write(row)
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_write_columns(fmt):
+    writer = FortranRecordWriter(fmt)
+    rows = _values(fmt)
+    expected = [writer.write(row) for row in rows]
+    assert record_writer(fmt).write_columns(list(zip(*rows))) == expected
+
+
+@pytest.mark.parametrize(
+    "fmt, values",
+    [
+        ("(a, 1x, a)", ["ab", "cd"]),
+        ("(a5, t2, a)", ["abcde", "X"]),
+        ("(t10, a, t3, a, /, a)", ["abcde", "X", "Z"]),
+        ("(a, tl2, a, tr3, a)", ["abcd", "X", "Y"]),
+        ("(a, 5x)", ["q"]),
+        ("(2a4, 2x, 2g10.3)", ["a", "b", 1.0, 2.0]),
+        ("(g14.7, 1PG14.7)", [1.5, 2.5, 3.5, 4.5]),
+        ("(4x, g16.9, /)", [1.5, 2.5]),
+        ("(t5, a, t55, 1PG14.7, /)", ["abc"]),
+        ("('it''s', a)", ["x"]),
+        ("(g14.7)", [3]),
+        ("(g14.7, a)", [None, None]),
+        ("(g14.7)", [None, 1.0, None]),
+        ("(1PG14.7, a)", [1.0, "x", 2.0, "y"]),
+        ("(4x, g16.9, /)", []),
+    ],
+)
+def test_positions(fmt, values):
+    expected = FortranRecordWriter(fmt).write(values)
+    assert record_writer(fmt).write(values) == expected
+    if values:
+        columns = [[i, i] for i in values]
+        assert record_writer(fmt).write_columns(columns) == [expected, expected]
+
+
+@pytest.mark.parametrize(
+    "descriptor", ["G16.9", "1PG14.7", "G18.12", "G12.1", "-3PG12.3", "3PG12.3"]
+)
+def test_g_value(descriptor):
+    rng = np.random.default_rng(0)
+    values = FLOATS + (
+        rng.uniform(0.09, 1.0, 500).tolist()
+        + (rng.standard_normal(500) * 10.0 ** rng.integers(-14, 14, 500)).tolist()
+    )
+    writer = FortranRecordWriter(f"({descriptor})")
+    compiled = record_writer(f"({descriptor})")
+    for value in values:
+        assert compiled.write([value]) == writer.write([value])
+
+
+@pytest.mark.parametrize("fmt", ["(a, (a))", "(t, a)", "(g14)", "(i5)"])
+def test_unsupported(fmt):
+    with pytest.raises(ValueError):
+        record_writer(fmt)
+
+
+def test_record_writer_is_cached():
+    assert record_writer(FORMATS[0]) is record_writer(FORMATS[0])
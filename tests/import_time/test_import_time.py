@@ -0,0 +1,57 @@
+import subprocess
+import sys
+
+# Modules that must only be imported when a block that needs them is run.
+HEAVY_MODULES = (
+    "fortranformat",
+    "hydrotoolbox",
+    "matplotlib",
+    "scipy.signal",
+    "tstoolbox",
+    "tsblender.get_series",
+    "tsblender.series",
+)
+
+# Import time budget, in seconds, for the modules that are part of tsblender
+# itself, not counting the required third party libraries.
+BUDGET = 0.5
+
+
+def _import_times():
+    proc = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            "from tsblender import tsblender; tsblender.Tables()",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(self_us) / 1.0e6
+    return times
+
+
+def test_heavy_modules_not_imported():
+    times = _import_times()
+    loaded = [
+        name for name in times for heavy in HEAVY_MODULES if name.startswith(heavy)
+    ]
+    assert not loaded
+
+
+def test_import_time_budget():
+    times = _import_times()
+    own = sum(
+        value
+        for name, value in times.items()
+        if name.startswith("tsblender") and "toolbox_utils" not in name
+    )
+    assert own < BUDGET, f"tsblender import took {own:.3f} seconds"
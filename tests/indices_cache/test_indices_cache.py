@@ -0,0 +1,143 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from hydrotoolbox import hydrotoolbox
+
+from tsblender import indices_cache, tsblender
+
+# Running the blocks with the cache must be at least this many times faster
+# than calculating the indices of each block from scratch.  Timings depend on
+# the load of the machine, so the benchmark only runs if the environment
+# variable TSBLENDER_BENCHMARKS is set.
+SPEEDUP = 1.5
+
+# The index codes of each HYDROLOGIC_INDICES block.
+BLOCKS = {
+    "g_ma": ("MA", "1 2 3 5 8 12 41"),
+    "g_fl": ("FL", "1 2 3"),
+    "g_fh": ("FH", "1 2 3 5 6 7 8 9"),
+    "g_dl": ("DL", "1 2 6 12 16 17"),
+    "g_dh": ("DH", "1 2 6 12 15 16 17 18 19 20 21"),
+    "g_ta": ("TA", "1 2"),
+    "g_tl": ("TL", "1 2"),
+}
+
+BLOCK = """
+START HYDROLOGIC_INDICES
+  CONTEXT all
+  SERIES_NAME flow
+  NEW_G_TABLE_NAME {name}
+  {kind} {codes}
+  DRAINAGE_AREA 41.6
+END HYDROLOGIC_INDICES
+"""
+
+
+def _flow(years=10):
+    rng = np.random.default_rng(11)
+    index = pd.date_range("1990-10-01", f"{1990 + years}-09-30", freq="D")
+    seasonal = 30 + 20 * np.sin(2 * np.pi * index.dayofyear / 365.25)
+    return pd.Series(seasonal * rng.gamma(2.0, 0.5, len(index)), index=index)
+
+
+def _script():
+    script = "START SETTINGS\n  CONTEXT all\n  DATE_FORMAT mm/dd/yyyy\nEND SETTINGS\n"
+    for name, (kind, codes) in BLOCKS.items():
+        script += BLOCK.format(name=name, kind=kind, codes=codes)
+    return script
+
+
+def test_indices_cache():
+    flow = _flow()
+    data = tsblender.Tables()
+    data.add_series("flow", flow)
+    data.execute(_script())
+
+    # All blocks use the same entry of the cache.
+    assert len(data._indices_cache) == 1
+    for name, (kind, codes) in BLOCKS.items():
+        expected = hydrotoolbox.indices(
+            [f"{kind}{code}" for code in codes.split()],
+            input_ts=flow.rename("FLOW"),
+            drainage_area=41.6,
+        )
+        g_table = data.g_table[name.upper()]
+        assert g_table.index.tolist() == list(expected)
+        np.testing.assert_allclose(g_table.to_numpy(), list(expected.values()))
+
+
+def test_indices_cache_new_series():
+    data = tsblender.Tables()
+    data.add_series("flow", _flow(4))
+    data.execute(_script())
+    first = data.g_table["G_MA"]
+
+    # A new series with the same name is not taken from the cache.
+    data.erase_entity(series_name="flow")
+    data.add_series("flow", _flow(4) * 2)
+    for name in BLOCKS:
+        data.erase_entity(g_table_name=name)
+    data.execute(_script())
+    assert data.g_table["G_MA"]["MA1: Mean of all daily flows"] == pytest.approx(
+        2 * first["MA1: Mean of all daily flows"]
+    )
+
+
+@pytest.mark.skipif(
+    not os.environ.get("TSBLENDER_BENCHMARKS"),
+    reason="Set TSBLENDER_BENCHMARKS to run the timing benchmarks.",
+)
+def test_indices_cache_speedup():
+    flow = _flow(30)
+
+    start = time.perf_counter()
+    for kind, codes in BLOCKS.values():
+        hydrotoolbox.indices(
+            [f"{kind}{code}" for code in codes.split()],
+            input_ts=flow.rename("FLOW"),
+            drainage_area=41.6,
+        )
+    separate = time.perf_counter() - start
+
+    data = tsblender.Tables()
+    data.add_series("flow", flow)
+    start = time.perf_counter()
+    data.execute(_script())
+    cached = time.perf_counter() - start
+
+    assert separate / cached > SPEEDUP, (
+        f"cached {cached:.3f} seconds, separate {separate:.3f} seconds"
+    )
+
+
+def test_indices_cache_copies():
+    data = tsblender.Tables()
+    data.add_series("flow", _flow(4))
+    data.execute(_script())
+    cached = next(iter(data._indices_cache.values()))["indices"]
+
+    # Changing a kept result in place doesn't change it for the next caller.
+    threshold = cached.MA2()
+    first = cached.event_statistics(threshold, ">")
+    first[0].iloc[:] = -1
+    assert (cached.event_statistics(threshold, ">")[0] >= 0).all()
+    assert hydrotoolbox.ind.Indices is indices_cache.indices.Indices
+
+
+def test_indices_cache_unsupported_version(monkeypatch):
+    monkeypatch.setattr(indices_cache, "HYDROTOOLBOX_VERSIONS", ((0,), (1,)))
+    flow = _flow(4)
+    data = tsblender.Tables()
+    data.add_series("flow", flow)
+    data.execute(_script())
+
+    # Without the cache the indices are the same as from hydrotoolbox.
+    assert next(iter(data._indices_cache.values()))["indices"] is None
+    expected = hydrotoolbox.indices(
+        ["MA1", "MA2"], input_ts=flow.rename("FLOW"), drainage_area=41.6
+    )
+    for label, value in expected.items():
+        assert data.g_table["G_MA"][label] == pytest.approx(value)
@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+import pytest
+from hydrotoolbox.indices.indices import Indices
+
+from tsblender import tsblender
+from tsblender.indices_years import INDICES, YearMatrix, calculate
+
+SCRIPT = """
+START SETTINGS
+  CONTEXT all
+  DATE_FORMAT mm/dd/yyyy
+END SETTINGS
+
+START HYDROLOGIC_INDICES
+  CONTEXT all
+  SERIES_NAME flow
+  NEW_G_TABLE_NAME g_years
+  MA {ma}
+  DL 1 2
+  PERIOD water_year
+END HYDROLOGIC_INDICES
+
+START LIST_OUTPUT
+  CONTEXT all
+  FILE out.txt
+  G_TABLE_NAME g_years
+END LIST_OUTPUT
+"""
+
+
+def _flow(years=6):
+    rng = np.random.default_rng(3)
+    index = pd.date_range("1990-10-01", f"{1990 + years}-09-30", freq="D")
+    seasonal = 30 + 20 * np.sin(2 * np.pi * index.dayofyear / 365.25)
+    flow = pd.Series(seasonal * rng.gamma(2.0, 0.5, len(index)), index=index)
+    flow.iloc[rng.choice(len(index), 40, replace=False)] = np.nan
+    flow.iloc[100] = -1.0
+    return flow
+
+
+def _by_year(table, code):
+    return table[table.index.get_level_values(0).str.startswith(f"{code}:")]
+
+
+def test_indices_years():
+    flow = _flow()
+    matrix = YearMatrix(flow)
+    table = calculate(matrix, list(INDICES))
+    years = list(range(1991, 1997))
+    assert matrix.years.tolist() == years
+
+    # Compare with the intermediate results of hydrotoolbox for every year.
+    upstream = Indices(flow.to_frame())
+    data = upstream.data
+    q25 = data.quantile(0.25)
+    q75 = data.quantile(0.75)
+    median = data.median()
+
+    def check(code, expected):
+        np.testing.assert_allclose(
+            _by_year(table, code).to_numpy(), np.asarray(expected, dtype="float64")
+        )
+
+    check("MA1", upstream.data_yearly_mean)
+    check("MA2", upstream.data_yearly.median())
+    check("MA3", upstream.data_yearly.std() / upstream.data_yearly_mean * 100)
+    monthly_min = upstream.data_monthly_min
+    check("ML1", monthly_min[monthly_min.index.month == 1])
+    monthly_max = upstream.data_monthly_max
+    check("MH7", monthly_max[monthly_max.index.month == 7])
+    check(
+        "MA14",
+        data[data.index.month == 3]
+        .groupby(data[data.index.month == 3].index.year)
+        .mean(),
+    )
+    check("DL1", upstream.data_yearly_min)
+    check("DH1", upstream.data_yearly_max)
+    check("DL3", upstream._preroll(7, "min"))
+    check("DH5", upstream._preroll(90, "max"))
+    check("FL1", upstream.event_statistics(q25, "<")[0])
+    check("FH3", upstream.event_statistics(3 * median, ">")[2])
+    check("FH6", upstream.event_statistics(3 * median, ">")[0])
+    nnp, _, days = upstream.event_statistics(q75, ">")
+    check("DH15", days / nnp)
+    water_year = data.index.year + (data.index.month >= 10)
+    check("TL1", data.groupby(water_year).idxmin().dt.dayofyear)
+    check("TH1", data.groupby(water_year).idxmax().dt.dayofyear)
+
+
+def test_indices_years_order():
+    table = calculate(YearMatrix(_flow(2), period="year"), ["MA12", "MA2", "DH1"])
+    assert table.index.get_level_values(0).unique().tolist() == [
+        "DH1: Maximum 1-day mean flow",
+        "MA2: Median of daily flows",
+        "MA12: Mean daily flow: January",
+    ]
+    assert table.index.get_level_values(1).unique().tolist() == [1990, 1991, 1992]
+
+
+def test_indices_years_short_window():
+    # Sixty days have no 90-day window, as in "hydrotoolbox.indices".
+    flow = _flow().iloc[:60]
+    table = calculate(YearMatrix(flow), ["DL4", "DL5", "DH4", "DH5"])
+    assert table.index.get_level_values(1).unique().tolist() == [1991]
+    for code in ("DL4", "DH4"):
+        assert _by_year(table, code).notna().all()
+    for code in ("DL5", "DH5"):
+        assert _by_year(table, code).isna().all()
+    assert np.isnan(Indices(flow.to_frame())._preroll(90, "min")).all()
+
+
+def test_hydrologic_indices_period(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data = tsblender.Tables()
+    data.add_series("flow", _flow())
+    data.execute(SCRIPT.format(ma="1 12 2"), write_files=True)
+
+    with open("out.txt") as fpi:
+        rows = [line for line in fpi.read().splitlines() if "(" in line]
+    assert len(rows) == 5 * 6
+    assert rows[0].split()[:4] == ["DL1:", "Minimum", "1-day", "mean"]
+    assert "(1991)" in rows[0]
+    assert rows[-1].split("(")[0].strip() == "MA12: Mean daily flow: January"
+
+    # The observations are in the order of the rows of LIST_OUTPUT.
+    g_table = data.g_table["G_YEARS"]
+    observations = data.observations()
+    assert observations.index.tolist() == [f"g_years{i}" for i in range(1, 31)]
+    np.testing.assert_allclose(
+        observations.to_numpy(), [float(row.split()[-1]) for row in rows], rtol=1e-6
+    )
+    np.testing.assert_allclose(observations.to_numpy(), g_table.to_numpy())
+
+
+def test_hydrologic_indices_period_codes():
+    data = tsblender.Tables()
+    data.add_series("flow", _flow())
+    with pytest.raises(ValueError):
+        data.execute(SCRIPT.format(ma="1 41"))
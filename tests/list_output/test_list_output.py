@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fortranformat import FortranRecordWriter
+
+from tsblender import tsblender
+from tsblender.fortran import a_edit, g_edit
+
+VALUES = [
+    0.0,
+    -0.0,
+    1.0,
+    -1.0,
+    0.1,
+    0.09999999995,
+    0.099999999949,
+    999999999.4,
+    999999999.5,
+    9.9999999995,
+    0.5,
+    1.5e-300,
+    -2.5e300,
+    123456789.0,
+    1.0e100,
+    -1.0e-100,
+    float("nan"),
+    float("inf"),
+    float("-inf"),
+]
+
+
+@pytest.mark.parametrize(
+    "descriptor",
+    ["G16.9", "G14.7", "1PG14.7", "G18.12", "G10.3", "2PG12.5", "-1PG13.6"],
+)
+def test_g_edit(descriptor):
+    scale, _, edit = descriptor.rpartition("P")
+    width, digits = (int(i) for i in edit[1:].split("."))
+    rng = np.random.default_rng(42)
+    values = (
+        VALUES
+        + (rng.standard_normal(2000) * 10.0 ** rng.integers(-12, 12, 2000)).tolist()
+    )
+    writer = FortranRecordWriter(f"({descriptor})")
+    expected = [writer.write([i]) for i in values]
+    assert g_edit(values, width, digits, int(scale or 0)).tolist() == expected
+
+
+def test_a_edit():
+    writer = FortranRecordWriter("(a10)")
+    strings = ["", "abc", "0123456789", "0123456789abc"]
+    assert a_edit(strings, 10) == [writer.write([i]) for i in strings]
+
+
+@pytest.mark.parametrize("series_format", ["long", "short", "ssf"])
+@pytest.mark.parametrize("name", ["flow", "a_rather_long_series_name"])
+def test_list_output(tmp_path, series_format, name):
+    index = pd.date_range("2000-01-01", periods=500, freq="6h")
+    series = pd.Series(np.exp(np.arange(len(index)) / 7.0) - 20.0, index=index)
+    series.iloc[[3, 30]] = np.nan
+
+    data = tsblender.Tables()
+    data._join(name.upper(), series=series)
+    data.series_dates[name.upper()] = [index[0], index[-1]]
+    data.list_output(
+        file=str(tmp_path / "out.txt"),
+        series_name=name,
+        series_format=series_format,
+        ins_file_name=str(tmp_path / "out.ins"),
+    )
+
+    # Written one record at a time like tsproc.
+    writers = {
+        "long": FortranRecordWriter("(1x, a, t20, a10, 3x, a8, 3x, g16.9, /)"),
+        "short": FortranRecordWriter("(4x, g16.9, /)"),
+        "ssf": FortranRecordWriter("(4x, a10, 3x, g16.9, /)"),
+    }
+    instruction = FortranRecordWriter(
+        "('l', a, t6, '[', a, a, ']2:25', /)"
+        if series_format == "short"
+        else "('l', a, t6, '[', a, a, ']42:65', /)"
+    )
+    lines = [f'\n TIME_SERIES "{name}" ---->\n']
+    ins_lines = ["pif $\n"]
+    for row, (date, value) in enumerate(series.dropna().items(), start=1):
+        record = {
+            "long": [name, date.strftime(data.date_format), date.strftime("%H:%M:%S")],
+            "short": [],
+            "ssf": [name],
+        }[series_format]
+        lines.append(writers[series_format].write([*record, value]).rstrip() + "\n")
+        ins_lines.append(
+            instruction.write([f"{3 if row == 1 else 1}", name, f"{row}"]).rstrip()
+            + "\n"
+        )
+    assert (tmp_path / "out.txt").read_text().splitlines() == "".join(
+        lines
+    ).splitlines()
+    assert (tmp_path / "out.ins").read_text().splitlines() == "".join(
+        ins_lines
+    ).splitlines()
+
+
+def test_instruction_file(tmp_path):
+    index = pd.date_range("2000-01-01", periods=200000, freq="h")
+    series = pd.Series(np.arange(len(index), dtype="float64"), index=index)
+    series.iloc[::7] = np.nan
+
+    data = tsblender.Tables()
+    data._join("FLOW", series=series)
+    data.series_dates["FLOW"] = [index[0], index[-1]]
+    data._write_instruction_file(str(tmp_path / "out.ins"), series_name="flow")
+
+    # Only the instructions are written, not the output of LIST_OUTPUT.
+    assert [i.name for i in tmp_path.iterdir()] == ["out.ins"]
+    nrows = series.count()
+    expected = ["pif $", "l3   [flow1]42:65"] + [
+        f"l1   [flow{row}]42:65" for row in range(2, nrows + 1)
+    ]
+    assert (tmp_path / "out.ins").read_text().splitlines() == expected
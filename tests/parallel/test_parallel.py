@@ -0,0 +1,130 @@
+import json
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from tsblender import tsblender
+from tsblender.graph import dependencies
+
+
+def test_dependencies():
+    blocks = [
+        ["GET_SERIES_SSF", 1, {"file": "a.ssf", "site": "1", "new_series_name": "a"}],
+        ["GET_SERIES_SSF", 2, {"file": "a.ssf", "site": "2", "new_series_name": "b"}],
+        ["SERIES_CLEAN", 3, {"series_name": "a", "new_series_name": "a_clean"}],
+        ["SERIES_EQUATION", 4, {"new_series_name": "c", "equation": "b*2"}],
+        ["LIST_OUTPUT", 5, {"file": "out.txt", "series_name": ["a_clean"]}],
+        ["LIST_OUTPUT", 6, {"file": "out2.txt", "series_name": ["c"]}],
+        ["ERASE_ENTITY", 7, {"series_name": "b"}],
+        ["NEW_SERIES_UNIFORM", 8, {"new_series_name": "b"}],
+    ]
+    assert dependencies(blocks) == [
+        set(),
+        set(),
+        {0},
+        {1},
+        {2},
+        {3, 4},
+        {1, 3},
+        {3, 6},
+    ]
+
+
+def test_parallel(flow_duration, compare_reference):
+    tsblender.run("black_earth_creek_flow_duration.inp", jobs=4)
+    compare_reference()
+
+
+EQUATIONS = """
+START SETTINGS
+  CONTEXT all
+  DATE_FORMAT mm/dd/yyyy
+END SETTINGS
+
+START SERIES_EQUATION
+  CONTEXT all
+  NEW_SERIES_NAME b
+  EQUATION flow * 2
+END SERIES_EQUATION
+
+START SERIES_EQUATION
+  CONTEXT all
+  NEW_SERIES_NAME c
+  EQUATION flow * 3
+END SERIES_EQUATION
+
+START SERIES_EQUATION
+  CONTEXT all
+  NEW_SERIES_NAME d
+  EQUATION b + c + {extra}
+END SERIES_EQUATION
+"""
+
+
+def _slow_tables(seconds):
+    data = tsblender.Tables()
+    data.add_series(
+        "flow", pd.Series(1.0, index=pd.date_range("2000-01-01", periods=10))
+    )
+    equation = data.funcs["SERIES_EQUATION"]["f"]
+
+    def slow(**kwds):
+        with open("pids.txt", "a") as fpo:
+            fpo.write(f"{os.getpid()}\n")
+        time.sleep(seconds)
+        equation(**kwds)
+
+    data.funcs["SERIES_EQUATION"]["f"] = slow
+    return data
+
+
+def _events(run_log):
+    with open(run_log) as fpi:
+        events = [json.loads(line) for line in fpi]
+    return {
+        (i["event"], i["line"]): i
+        for i in events
+        if i["event"] in ("block_start", "block_end")
+    }
+
+
+def test_parallel_overlap(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open("equations.inp", "w") as fpo:
+        fpo.write(EQUATIONS.format(extra="1"))
+    data = _slow_tables(1.0)
+
+    data.run("equations.inp", jobs=2, log_level="quiet", run_log="run.jsonl")
+
+    # The blocks that create "b" and "c" run at the same time, "d" after both.
+    events = _events("run.jsonl")
+    b_start, b_end = events["block_start", 7]["time"], events["block_end", 7]["time"]
+    c_start, c_end = events["block_start", 13]["time"], events["block_end", 13]["time"]
+    assert c_start < b_end and b_start < c_end
+    assert events["block_start", 19]["time"] >= max(b_end, c_end)
+    assert data._get_series("d").tolist() == [6.0] * 10
+
+    # The three blocks ran in the pool of two workers.
+    with open("pids.txt") as fpi:
+        pids = set(fpi.read().split())
+    assert len(pids) == 2
+    assert str(os.getpid()) not in pids
+
+
+def test_parallel_error(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open("equations.inp", "w") as fpo:
+        fpo.write(EQUATIONS.format(extra="unknown_name"))
+    data = _slow_tables(0.0)
+
+    with pytest.raises(Exception, match="unknown_name"):
+        data.run("equations.inp", jobs=2, log_level="quiet", run_log="run.jsonl")
+
+    # The error is reported for the block that failed in the worker.
+    events = _events("run.jsonl")
+    assert events["block_end", 19]["status"] == "error"
+    assert events["block_end", 19]["block"] == "SERIES_EQUATION"
+    assert events["block_end", 7]["status"] == "ok"
+    assert "d" not in data.series and "D" not in data.series
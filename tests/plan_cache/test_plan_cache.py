@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from tsblender import cache, tsblender
+
+
+def test_plan_cache(tmp_path, monkeypatch, flow_duration, compare_reference):
+    cache_dir = str(tmp_path / "cache")
+
+    tsblender.run(
+        "black_earth_creek_flow_duration.inp", plan_cache=True, cache_dir=cache_dir
+    )
+    assert len(os.listdir(os.path.join(cache_dir, "plans"))) == 1
+
+    def no_parse(*args, **kwds):
+        raise AssertionError("The plan should have come from the cache.")
+
+    monkeypatch.setattr(tsblender.Tables, "_parse", no_parse)
+    for fname in ["hi_test_flow_duration_sim_output.txt", "pest.pst"]:
+        os.remove(fname)
+    tsblender.run(
+        "black_earth_creek_flow_duration.inp", plan_cache=True, cache_dir=cache_dir
+    )
+    compare_reference()
+
+    # A different running context is a different plan.
+    with pytest.raises(AssertionError):
+        tsblender.run(
+            "black_earth_creek_flow_duration.inp",
+            running_context="other",
+            plan_cache=True,
+            cache_dir=cache_dir,
+        )
+
+
+def test_plan_cache_warnings(tmp_path, monkeypatch, capsys, test_dir):
+    test_dir("garfoot_creek_test")
+    cache_dir = str(tmp_path / "cache")
+
+    plan = tsblender.Tables()._compile(
+        "garfoot_creek_tsblender.inp", cache_dir=cache_dir
+    )
+    warnings = capsys.readouterr().err
+    assert '"WRITE_PEST_FILES" block can have a' in warnings
+
+    def no_parse(*args, **kwds):
+        raise AssertionError("The plan should have come from the cache.")
+
+    monkeypatch.setattr(tsblender.Tables, "_parse", no_parse)
+    cached = tsblender.Tables()._compile(
+        "garfoot_creek_tsblender.inp", cache_dir=cache_dir
+    )
+    assert capsys.readouterr().err == warnings
+    assert cached == plan
+
+
+def test_plan_cache_source(tmp_path, monkeypatch, request, flow_duration):
+    # A copy of the package source stands in for an editable install.
+    package_dir = tmp_path / "package"
+    package_dir.mkdir()
+    (package_dir / "tsblender.py").write_text("# parser\n")
+    monkeypatch.setattr(cache, "__file__", str(package_dir / "cache.py"))
+    cache.source_digest.cache_clear()
+    request.addfinalizer(cache.source_digest.cache_clear)
+
+    key = cache.plan_key("black_earth_creek_flow_duration.inp")
+    (package_dir / "tsblender.py").write_text("# changed parser\n")
+    cache.source_digest.cache_clear()
+    assert cache.plan_key("black_earth_creek_flow_duration.inp") != key
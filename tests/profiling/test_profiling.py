@@ -0,0 +1,89 @@
+import filecmp
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from tsblender import tsblender
+from tsblender.profiling import report_table
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_profile(capsys, jobs, test_dir):
+    test_dir("garfoot_creek_test", "garfoot")
+    tsblender.run("garfoot_creek_tsblender.inp", jobs=jobs, profile="profile")
+
+    assert (
+        "# PROFILE of 63 blocks written to 'profile.txt' and 'profile.json'."
+        in capsys.readouterr().out
+    )
+    with open("profile.json") as fpi:
+        report = json.load(fpi)
+    blocks = sorted(report["blocks"], key=lambda block: block["line"])
+    assert len(blocks) == 63
+    statvar = blocks[0]
+    assert statvar["block"] == "GET_MUL_SERIES_STATVAR"
+    assert statvar["line"] == 12
+    assert statvar["bytes_read"] == os.path.getsize("statvar.dat")
+    assert statvar["rows_read"] == 0
+    assert statvar["rows_written"] > 0
+    assert all(block["wall_seconds"] >= 0 for block in blocks)
+    list_output = [block for block in blocks if block["block"] == "LIST_OUTPUT"]
+    assert list_output[-1]["bytes_written"] == os.path.getsize(
+        "tsp_SIMULATED_VALUES.txt"
+    )
+
+    with open("profile.txt") as fpi:
+        table = fpi.read().splitlines()
+    assert table[0].split()[:4] == ["Block", "Line", "Wall", "s"]
+    assert len(table) == 65
+    assert table[-1].startswith("63 blocks, ")
+
+    # Profiling doesn't change the results.
+    for fname in ["tsp_SIMULATED_VALUES.txt", "observation.ins", "pest.pst"]:
+        assert filecmp.cmp(fname, Path("tsblender_reference") / fname, shallow=False)
+
+
+def test_report_table():
+    entries = [
+        {
+            "block": "SERIES_CLEAN",
+            "line": 10,
+            "wall_seconds": 0.5,
+            "cpu_seconds": 0.25,
+            "peak_rss_delta_bytes": None,
+            "rows_read": 100,
+            "rows_written": 90,
+            "bytes_read": 0,
+            "bytes_written": 0,
+        },
+        {
+            "block": "GET_SERIES_SSF",
+            "line": 2,
+            "wall_seconds": 1.5,
+            "cpu_seconds": 1.25,
+            "peak_rss_delta_bytes": 4096,
+            "rows_read": 0,
+            "rows_written": 100,
+            "bytes_read": 2000,
+            "bytes_written": 0,
+        },
+    ]
+    lines = report_table(entries).splitlines()
+    assert [line.split()[0] for line in lines[1:3]] == [
+        "GET_SERIES_SSF",
+        "SERIES_CLEAN",
+    ]
+    assert lines[1].split()[1:] == [
+        "2",
+        "1.5000",
+        "1.2500",
+        "4096",
+        "0",
+        "100",
+        "2000",
+        "0",
+    ]
+    assert lines[2].split()[4] == "-"
+    assert lines[3] == "2 blocks, 2.0000 wall seconds, 1.5000 CPU seconds."
@@ -0,0 +1,35 @@
+from tsblender import tsblender
+from tsblender.graph import live_blocks
+
+
+def test_live_blocks():
+    blocks = [
+        ["GET_SERIES_SSF", 1, {"file": "a.ssf", "site": "1", "new_series_name": "a"}],
+        ["GET_SERIES_SSF", 2, {"file": "a.ssf", "site": "2", "new_series_name": "b"}],
+        ["SERIES_CLEAN", 3, {"series_name": "a", "new_series_name": "a_clean"}],
+        ["ERASE_ENTITY", 4, {"series_name": "a"}],
+        ["ERASE_ENTITY", 5, {"series_name": "b"}],
+        ["LIST_OUTPUT", 6, {"file": "out.txt", "series_name": ["a_clean"]}],
+    ]
+    live, outputs = live_blocks(blocks)
+    assert live == {0, 2, 3, 5}
+    assert outputs[1] == {("series", "B")}
+
+
+def test_prune(capsys, test_dir, compare_reference):
+    test_dir("garfoot_creek_test", "garfoot")
+    tsblender.run("garfoot_creek_tsblender.inp", prune=True)
+
+    out = capsys.readouterr().out
+    assert "# PRUNING kept 13 of 63 blocks." in out
+    assert "# PRUNING EXCEEDANCE_TIME block @ line 157" in out
+
+    compare_reference(
+        [
+            "tsp_SIMULATED_VALUES.txt",
+            "tsp_OBSERVATIONS.txt",
+            "observation.ins",
+            "pest.pst",
+        ],
+        sizes=(0,),
+    )
@@ -0,0 +1,69 @@
+import filecmp
+import shutil
+from pathlib import Path
+
+from tsblender import tsblender
+from tsblender.graph import shared_blocks
+
+
+def test_shared_blocks():
+    blocks = [
+        ["SETTINGS", 1, {"date_format": "mm/dd/yyyy"}],
+        ["GET_SERIES_SSF", 2, {"file": "obs.ssf", "site": "1", "new_series_name": "o"}],
+        ["GET_SERIES_SSF", 3, {"file": "sim.ssf", "site": "1", "new_series_name": "s"}],
+        ["SERIES_CLEAN", 4, {"series_name": "o", "new_series_name": "o_clean"}],
+        ["SERIES_CLEAN", 5, {"series_name": "s", "new_series_name": "s_clean"}],
+        ["SERIES_EQUATION", 6, {"new_series_name": "d", "equation": "o_clean-s"}],
+        ["LIST_OUTPUT", 7, {"file": "out.txt", "series_name": ["o_clean"]}],
+        ["ERASE_ENTITY", 8, {"series_name": "s"}],
+        ["SERIES_CLEAN", 9, {"series_name": "o", "new_series_name": "s"}],
+    ]
+    assert shared_blocks(blocks, lambda name: name == "obs.ssf") == {0, 1, 3}
+
+
+def test_run_batch(tmp_path, capsys, monkeypatch):
+    source = Path(__file__).parent.parent / "garfoot_creek_test"
+    monkeypatch.chdir(tmp_path)
+    shutil.copy(source / "garfoot_creek_tsblender.inp", tmp_path)
+
+    # The observations are links to the same files, the model output is
+    # different in every realization and missing from the last one.
+    common = tmp_path / "common"
+    common.mkdir()
+    for ssf in source.glob("*.ssf"):
+        shutil.copy(ssf, common)
+    for realization in ["realization_1", "realization_2", "realization_3"]:
+        (tmp_path / realization).mkdir()
+        for ssf in common.iterdir():
+            (tmp_path / realization / ssf.name).symlink_to(ssf)
+        for name in ["groups.dat", "parameters.dat", "par2par_base.tpl"]:
+            shutil.copy(source / name, tmp_path / realization)
+    for realization in ["realization_1", "realization_2"]:
+        shutil.copy(source / "statvar.dat", tmp_path / realization)
+
+    results = tsblender.run_batch(
+        "garfoot_creek_tsblender.inp", ["realization_*"], jobs=2
+    )
+
+    assert [result["dir"] for result in results] == [
+        "realization_1",
+        "realization_2",
+        "realization_3",
+    ]
+    assert [result["success"] for result in results] == [True, True, False]
+    assert "statvar.dat" in results[2]["error"]
+    out = capsys.readouterr().out
+    assert "# BATCH ran 39 of 63 blocks once for all 3 directories" in out
+    assert "# BATCH 2 of 3 directories succeeded, 1 failed." in out
+    for realization in ["realization_1", "realization_2"]:
+        for fname in [
+            "tsp_SIMULATED_VALUES.txt",
+            "tsp_OBSERVATIONS.txt",
+            "observation.ins",
+            "pest.pst",
+        ]:
+            assert filecmp.cmp(
+                tmp_path / realization / fname,
+                source / "tsblender_reference" / fname,
+                shallow=False,
+            )
@@ -0,0 +1,84 @@
+import json
+import os
+
+import pytest
+
+from tsblender import tsblender
+
+
+@pytest.fixture
+def garfoot(test_dir):
+    return test_dir("garfoot_creek_test", "garfoot")
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_summary(garfoot, capsys, jobs):
+    tsblender.run(
+        "garfoot_creek_tsblender.inp",
+        jobs=jobs,
+        prune=True,
+        log_level="summary",
+        run_log="run.jsonl",
+    )
+
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == "# RUNNING 63 blocks with running CONTEXT 'all'."
+    assert "# PRUNING kept 13 of 63 blocks." in lines
+    assert not any(line.startswith("# PRUNING EXCEEDANCE_TIME") for line in lines)
+    assert lines[-1].startswith("# FINISHED 13 blocks in ")
+
+    with open("run.jsonl") as fpi:
+        events = [json.loads(line) for line in fpi]
+    assert events[0]["event"] == "run_start"
+    assert events[0]["blocks"] == 63
+    assert events[-1]["event"] == "run_end"
+    assert events[-1]["status"] == "ok"
+    starts = [(i["block"], i["line"]) for i in events if i["event"] == "block_start"]
+    ends = [(i["block"], i["line"]) for i in events if i["event"] == "block_end"]
+    assert len(starts) == 13
+    assert sorted(starts) == sorted(ends)
+    assert all(
+        i["status"] == "ok" and i["seconds"] >= 0
+        for i in events
+        if i["event"] == "block_end"
+    )
+    assert [i["time"] for i in events if i["event"] != "block_end"] == sorted(
+        i["time"] for i in events if i["event"] != "block_end"
+    )
+
+
+def test_quiet(garfoot, capsys):
+    tsblender.run("garfoot_creek_tsblender.inp", prune=True, log_level="quiet")
+    assert capsys.readouterr().out == ""
+    assert os.path.exists("pest.pst")
+
+
+def test_error_event(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open("bad.inp", "w") as fpo:
+        fpo.write(
+            "START GET_SERIES_SSF\n"
+            " CONTEXT all\n"
+            " FILE missing.ssf\n"
+            " SITE 1\n"
+            " NEW_SERIES_NAME flow\n"
+            "END GET_SERIES_SSF\n"
+        )
+    with pytest.raises(FileNotFoundError):
+        tsblender.run("bad.inp", log_level="quiet", run_log="run.jsonl")
+    with open("run.jsonl") as fpi:
+        events = [json.loads(line) for line in fpi]
+    assert [i["event"] for i in events] == [
+        "run_start",
+        "block_start",
+        "block_end",
+        "run_end",
+    ]
+    assert events[2]["status"] == "error"
+    assert "missing.ssf" in events[2]["error"]
+    assert events[3]["status"] == "error"
+
+
+def test_log_level():
+    with pytest.raises(ValueError):
+        tsblender.run("garfoot_creek_tsblender.inp", log_level="loud")
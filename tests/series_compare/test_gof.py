@@ -0,0 +1,107 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from tstoolbox.functions.gof import gof
+
+from tsblender.series.series_compare import GOF_LABELS, gof_statistics
+
+# The fused statistics of a multi-decade hourly pair must be at least this
+# many times faster than calling gof for each statistic.  Only checked if the
+# environment variable TSBLENDER_BENCHMARKS is set.
+SPEEDUP = 10.0
+
+GOF_STATS = {
+    "bias": "me",
+    "standard_error": "rmse",
+    "relative_standard_error": "nrmse_mean",
+    "nash_sutcliffe": "nse",
+    "volumetric_efficiency": "ve",
+}
+
+
+def _pair(periods, freq="h"):
+    rng = np.random.default_rng(42)
+    index = pd.date_range("1990-01-01", periods=periods, freq=freq)
+    obs = pd.Series(rng.gamma(2.0, 10.0, periods), index=index, name="obs")
+    sim = (obs * rng.normal(1.0, 0.2, periods)).rename("sim")
+    obs.iloc[rng.choice(periods, periods // 50, replace=False)] = np.nan
+    sim.iloc[rng.choice(periods, periods // 50, replace=False)] = np.nan
+    sim.iloc[7] = np.inf
+    return sim, obs
+
+
+def _separate(sim, obs, exponent=2):
+    stats = {
+        GOF_LABELS[key]: gof(stats=name, sim_col=sim, obs_col=obs)[0][1]
+        for key, name in GOF_STATS.items()
+    }
+    frame = pd.concat([sim, obs], axis="columns").replace(np.inf, np.nan).dropna()
+    sim, obs = frame.iloc[:, 0], frame.iloc[:, 1]
+    stats["Relative bias:"] = stats["Bias:"] / obs.mean()
+    base = obs.mean()
+    stats["Coefficient of efficiency:"] = 1 - (
+        np.sum(abs(obs - sim)) ** exponent / np.sum(abs(obs - base)) ** exponent
+    )
+    stats["Index of agreement:"] = 1 - (
+        np.sum(abs(obs - sim)) ** exponent
+        / np.sum(np.abs(sim - base) + np.abs(obs - base)) ** exponent
+    )
+    return stats
+
+
+@pytest.mark.parametrize("exponent", [1, 2])
+def test_gof_statistics(exponent):
+    sim, obs = _pair(5000)
+    # Shift the observed series so that the dates only partly overlap.
+    obs.index = obs.index + pd.Timedelta(hours=100)
+
+    fused = gof_statistics(sim, obs, list(GOF_LABELS), exponent=exponent)
+
+    assert list(fused) == list(GOF_LABELS.values())
+    expected = _separate(sim, obs, exponent=exponent)
+    for label, value in fused.items():
+        assert value == pytest.approx(expected[label], rel=1e-12), label
+
+
+def test_gof_statistics_base():
+    sim, obs = _pair(1000, freq="D")
+    base = obs.rolling(30, min_periods=1).mean()
+
+    fused = gof_statistics(
+        sim, obs, ["coefficient_of_efficiency", "index_of_agreement"], base=base
+    )
+
+    frame = pd.concat([sim, obs, base], axis="columns").replace(np.inf, np.nan)
+    sim, obs, base = (column for _, column in frame.dropna().items())
+    assert fused["Coefficient of efficiency:"] == pytest.approx(
+        1 - np.sum(abs(obs - sim)) ** 2 / np.sum(abs(obs - base)) ** 2
+    )
+    assert fused["Index of agreement:"] == pytest.approx(
+        1
+        - np.sum(abs(obs - sim)) ** 2
+        / np.sum(np.abs(sim - base) + np.abs(obs - base)) ** 2
+    )
+
+
+@pytest.mark.skipif(
+    not os.environ.get("TSBLENDER_BENCHMARKS"),
+    reason="Set TSBLENDER_BENCHMARKS to run the timing benchmarks.",
+)
+def test_gof_statistics_speedup():
+    # Thirty years of hourly values.
+    sim, obs = _pair(30 * 8766)
+
+    start = time.perf_counter()
+    _separate(sim, obs)
+    separate = time.perf_counter() - start
+
+    start = time.perf_counter()
+    gof_statistics(sim, obs, list(GOF_LABELS))
+    fused = time.perf_counter() - start
+
+    assert separate / fused > SPEEDUP, (
+        f"fused {fused:.3f} seconds, separate {separate:.3f} seconds"
+    )
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tsblender import tsblender
+from tsblender.series.series_compare import (
+    GOF_LABELS,
+    PERIODS,
+    gof_statistics,
+    window_statistics,
+)
+
+SCRIPT = """
+START SETTINGS
+  CONTEXT all
+  DATE_FORMAT mm/dd/yyyy
+END SETTINGS
+
+START SERIES_COMPARE
+  CONTEXT all
+  SERIES_NAME_SIM sim
+  SERIES_NAME_OBS obs
+  NEW_C_TABLE_NAME {name}
+  BIAS yes
+  NASH_SUTCLIFFE yes
+  INDEX_OF_AGREEMENT yes
+  EXPONENT 2
+{extra}
+END SERIES_COMPARE
+"""
+
+
+def _pair(periods=1500):
+    rng = np.random.default_rng(7)
+    index = pd.date_range("1990-10-01", periods=periods, freq="D")
+    obs = pd.Series(rng.gamma(2.0, 10.0, periods), index=index, name="obs")
+    sim = (obs * rng.normal(1.0, 0.3, periods)).rename("sim")
+    obs.iloc[rng.choice(periods, periods // 20, replace=False)] = np.nan
+    return sim, obs
+
+
+@pytest.mark.parametrize("period", list(PERIODS))
+def test_window_statistics(period):
+    sim, obs = _pair()
+    base = obs.rolling(30, min_periods=1).mean()
+
+    windows, stats = window_statistics(
+        sim, obs, list(GOF_LABELS), period=period, base=base
+    )
+
+    assert windows["num_terms"].sum() == obs.count()
+    for label, window in windows.iterrows():
+        dates = slice(window["start_date"], window["end_date"])
+        expected = gof_statistics(
+            sim[dates], obs[dates], list(GOF_LABELS), base=base[dates]
+        )
+        for key, value in expected.items():
+            assert stats.loc[label, key] == pytest.approx(value, rel=1e-9)
+
+
+def test_window_statistics_labels():
+    sim, obs = _pair()
+    windows, _ = window_statistics(sim, obs, ["bias"], period="season")
+    assert windows.index[:3].tolist() == ["1990_SON", "1991_DJF", "1991_MAM"]
+    windows, _ = window_statistics(sim, obs, ["bias"], period="water_year")
+    assert windows.index[:2].tolist() == ["1991", "1992"]
+
+    # Windows without values are left out.
+    windows, stats = window_statistics(
+        sim,
+        obs,
+        ["bias"],
+        window_dates=pd.to_datetime(["1980-01-01", "1985-01-01", "1991-01-01"]),
+    )
+    assert windows.index.tolist() == ["2"]
+    assert windows["start_date"].iloc[0] == pd.Timestamp("1990-10-01")
+    assert windows["end_date"].iloc[0] == pd.Timestamp("1990-12-31")
+    assert stats.index.tolist() == ["2"]
+
+
+def test_series_compare_windows():
+    sim, obs = _pair()
+    script = SCRIPT.format(
+        name="c_windows", extra="  WINDOW_DATES 10/01/1991,01/01/1992,10/01/1992"
+    )
+    for name, dates in [
+        ("c_1", "  DATE_1 10/01/1991\n  DATE_2 12/31/1991"),
+        ("c_2", "  DATE_1 01/01/1992\n  DATE_2 09/30/1992"),
+    ]:
+        script += SCRIPT.format(name=name, extra=dates).split("END SETTINGS")[1]
+
+    results = tsblender.evaluate(script, series={"sim": sim, "obs": obs})
+
+    windows = results["c_table"]["C_WINDOWS"]
+    for label, name in [("1", "C_1"), ("2", "C_2")]:
+        pd.testing.assert_series_equal(
+            windows.loc[label], results["c_table"][name], check_names=False
+        )
+
+
+def test_series_compare_period_and_window_dates():
+    sim, obs = _pair()
+    script = SCRIPT.format(
+        name="c_windows", extra="  PERIOD year\n  WINDOW_DATES 10/01/1991,01/01/1992"
+    )
+    with pytest.raises(ValueError):
+        tsblender.evaluate(script, series={"sim": sim, "obs": obs})
+
+
+def test_series_compare_windows_nan():
+    sim, obs = _pair()
+    # Nash-Sutcliffe is 0/0 in the first water year.
+    sim[:"1991-09-30"] = 0.0
+    obs[:"1991-09-30"] = 0.0
+    script = SCRIPT.format(name="c_windows", extra="  PERIOD water_year")
+
+    results = tsblender.evaluate(script, series={"sim": sim, "obs": obs})
+
+    c_table = results["c_table"]["C_WINDOWS"]
+    windows = c_table.index.get_level_values(0).unique()
+    assert windows.tolist() == ["1991", "1992", "1993", "1994", "1995"]
+    assert len(c_table) == 3 * len(windows)
+    assert np.isnan(c_table.loc[("1991", "Nash-Sutcliffe coefficient:")])
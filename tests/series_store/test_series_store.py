@@ -0,0 +1,46 @@
+import pandas as pd
+
+from tsblender import tsblender
+
+
+def test_series_store():
+    data = tsblender.Tables()
+    short = pd.Series([1, 2, 3], index=pd.date_range("2000-01-01", periods=3))
+    long = pd.DataFrame(
+        {"x": [1.5, 2.5, 3.5, 4.5]}, index=pd.date_range("1999-12-31", periods=4)
+    )
+    data._join("short", series=short)
+    data._join("long", series=long)
+
+    # Each series keeps its own index and is a float64 copy.
+    stored = data._get_series("Short")
+    assert stored.dtype == "float64"
+    assert stored.name == "SHORT"
+    assert stored.index.equals(short.index)
+    short.iloc[0] = 100
+    assert stored.iloc[0] == 1
+    assert data.current_series == {"SHORT": "D", "LONG": "D"}
+    assert data.series_dates["LONG"] == [long.index[0], long.index[-1]]
+
+    data.erase_entity(series_name="short")
+    assert "SHORT" not in data.current_series
+    assert "SHORT" not in data.series_dates
+    assert data._get_series("long").tolist() == [1.5, 2.5, 3.5, 4.5]
+
+
+def test_table_store():
+    data = tsblender.Tables()
+    s_table = pd.DataFrame([3.0, pd.NA, 1.0], index=["sum", "mean", "maximum"])
+    g_table = pd.DataFrame({"x": [0.5, 2]}, index=["MA1", "MA2"])
+    data._join("stab", s_table=s_table)
+    data._join("gtab", g_table=g_table)
+
+    # Each table keeps its own rows in the order that it was created.
+    assert data._get_s_table("stab").to_dict() == {"sum": 3.0, "maximum": 1.0}
+    assert data.s_table["STAB"].dtype == "float64"
+    assert data._get_g_table("GTAB").index.tolist() == ["MA1", "MA2"]
+
+    data.s_table_metadata["STAB"] = {}
+    data.erase_entity(s_table_name="stab")
+    assert data.s_table == {}
+    assert list(data.g_table) == ["GTAB"]
@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from tsblender.server import client
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, "fork"), reason="The server requires os.fork."
+)
+
+
+def test_client(tmp_path, capsys, flow_duration, compare_reference):
+    socket_path = str(tmp_path / "tsblender.sock")
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            "from tsblender.server import serve; import sys; serve(sys.argv[1])",
+            socket_path,
+        ]
+    )
+    try:
+        for _ in range(600):
+            if os.path.exists(socket_path):
+                break
+            time.sleep(0.1)
+
+        status = client("black_earth_creek_flow_duration.inp", socket_path=socket_path)
+        assert status == 0
+        assert "RUNNING" in capsys.readouterr().out
+
+        status = client("does_not_exist.inp", socket_path=socket_path)
+        assert status == 1
+        assert "does_not_exist.inp" in capsys.readouterr().err
+    finally:
+        server.terminate()
+        server.wait()
+
+    compare_reference()
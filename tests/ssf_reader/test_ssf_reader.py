@@ -0,0 +1,137 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tsblender import tsblender
+
+SSF = """\
+B	01/02/2000	12:00:00	20.0
+A	1/3/2000	12:00:00	3.0
+A	1/1/2000	12:00:00	1.0
+B	01/01/2000	12:00:00	10.0
+A	1/2/2000	12:00:00	2.0
+A	1/2/2000	12:00:00	99.0
+B	01/03/2000	12:00:00	30.0
+C	01/01/2000	24:00:00	5.0
+C	01/02/2000	24:00:00	6.0
+"""
+
+
+# Reading a few sites of a large SSF file must be at least this many times
+# faster than the pivot of all sites that it replaced.  Only checked if the
+# environment variable TSBLENDER_BENCHMARKS is set.
+SPEEDUP = 3.0
+
+
+def _write_ssf(file, sites, days):
+    dates = pd.date_range("1980-01-01", periods=days, freq="D")
+    values = np.random.default_rng(11).gamma(2.0, 10.0, (sites, days))
+    with open(file, "w") as fpo:
+        for number in range(sites):
+            fpo.writelines(
+                f"S{number:03}\t{date}\t12:00:00\t{value:.4f}\n"
+                for date, value in zip(dates.strftime("%m/%d/%Y"), values[number])
+            )
+
+
+def _pivot_read(file, sites):
+    """Read sites the way the SSF reader did before, with a pivot of all sites."""
+    ts = pd.read_csv(
+        file,
+        header=None,
+        index_col=0,
+        sep=r"\s+",
+        parse_dates=[[1, 2]],
+        dtype={0: str},
+        engine="c",
+    )
+    ts = ts.pivot_table(
+        index=ts.index, values=ts.columns.drop(ts.columns[0]), columns=ts.columns[0]
+    )
+    ts.columns = [i[1] for i in ts.columns]
+    ts = ts.set_axis(ts.index.to_period(ts.index[1] - ts.index[0]).to_timestamp())
+    return {site: ts[site] for site in sites}
+
+
+def test_ssf_reader(tmp_path):
+    file = tmp_path / "sites.ssf"
+    file.write_text(SSF)
+
+    data = tsblender.Tables()
+    data.get_series_ssf(file=str(file), site=["A", "C"], new_series_name=["a", "c"])
+
+    # Rows are sorted by date, the first of duplicate dates is kept, and the
+    # index is converted to the start of each period.
+    a = data._get_series("a")
+    assert a.tolist() == [1.0, 2.0, 3.0]
+    assert a.index.equals(pd.date_range("2000-01-01", periods=3))
+    c = data._get_series("c")
+    assert c.tolist() == [5.0, 6.0]
+    assert c.index.equals(pd.date_range("2000-01-02", periods=2))
+    assert "B" not in data.series
+
+
+def test_ssf_reader_one_row(tmp_path):
+    file = tmp_path / "sites.ssf"
+    file.write_text(SSF + "D\t01/02/2000\t12:00:00\t7.0\n")
+
+    # A site with one date takes the period of the dates of all sites, 12
+    # hours, and a site with one date in the window is kept as is.
+    data = tsblender.Tables()
+    data.get_series_ssf(file=str(file), site="D", new_series_name="d")
+    data.get_series_ssf(
+        file=str(file),
+        site="A",
+        new_series_name="a",
+        date_1="01/02/2000",
+        date_2="01/02/2000",
+        time_2="23:00:00",
+    )
+    d = data._get_series("d")
+    assert d.tolist() == [7.0]
+    assert d.index.equals(pd.DatetimeIndex(["2000-01-02 12:00"]))
+    a = data._get_series("a")
+    assert a.tolist() == [2.0]
+    assert a.index.equals(pd.DatetimeIndex(["2000-01-02 12:00"]))
+
+
+def _read_sites(file, sites):
+    data = tsblender.Tables()
+    data.get_series_ssf(file=str(file), site=sites, new_series_name=sites)
+    return {site: data._get_series(site) for site in sites}
+
+
+def test_ssf_reader_many_sites(tmp_path):
+    file = tmp_path / "sites.ssf"
+    _write_ssf(file, 20, 400)
+    sites = ["S003", "S017"]
+
+    expected = _pivot_read(file, sites)
+    for site, series in _read_sites(file, sites).items():
+        np.testing.assert_allclose(series.to_numpy(), expected[site].to_numpy())
+        assert series.index.equals(expected[site].index)
+
+
+@pytest.mark.skipif(
+    not os.environ.get("TSBLENDER_BENCHMARKS"),
+    reason="Set TSBLENDER_BENCHMARKS to run the timing benchmarks.",
+)
+def test_ssf_reader_speedup(tmp_path):
+    file = tmp_path / "sites.ssf"
+    _write_ssf(file, 200, 5000)
+    sites = ["S003", "S017", "S150"]
+
+    start = time.perf_counter()
+    _pivot_read(file, sites)
+    pivot = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _read_sites(file, sites)
+    columns = time.perf_counter() - start
+
+    assert pivot / columns > SPEEDUP, (
+        f"columns {columns:.3f} seconds, pivot {pivot:.3f} seconds"
+    )
@@ -0,0 +1,83 @@
+import pandas as pd
+
+from tsblender import tsblender
+
+STATVAR = """\
+3
+sub_cfs 1
+sub_cfs 2
+basin_ppt 1
+1 2000 1 1 0 0 0 1.0 10.0 bad
+2 2000 1 2 0 0 0 2.0 20.0 bad
+3 2000 1 3 0 0 0 3.0 30.0 bad
+4 2000 1 4 0 0 0 4.0 40.0 bad
+"""
+
+
+def test_statvar_reader(tmp_path):
+    file = tmp_path / "statvar.dat"
+    file.write_text(STATVAR)
+
+    # The "basin_ppt 1" column is not a number, but is never parsed.
+    data = tsblender.Tables()
+    data.get_series_statvar(
+        file=str(file),
+        variable_name=["sub_cfs", "sub_cfs"],
+        location_id=[2, 1],
+        new_series_name=["b", "a"],
+        date_1="01/02/2000",
+        date_2="01/03/2000",
+    )
+    assert data._get_series("a").tolist() == [2.0, 3.0]
+    assert data._get_series("b").tolist() == [20.0, 30.0]
+    assert data._get_series("a").index.equals(
+        pd.date_range("2000-01-02", periods=2, name="Datetime")
+    )
+
+
+ROLLED = """
+START SETTINGS
+  CONTEXT all
+  DATE_FORMAT mm/dd/yyyy
+END SETTINGS
+
+START GET_SERIES_STATVAR
+  CONTEXT all
+  FILE {file}
+  VARIABLE_NAME sub_cfs sub_cfs
+  LOCATION_ID 1 2
+  NEW_SERIES_NAME a b
+  DATE_1 01/02/2000
+  DATE_2 01/03/2000
+END GET_SERIES_STATVAR
+
+START GET_SERIES_STATVAR
+  CONTEXT all
+  FILE {file}
+  VARIABLE_NAME sub_cfs
+  LOCATION_ID 1
+  NEW_SERIES_NAME c
+END GET_SERIES_STATVAR
+"""
+
+
+def test_statvar_reader_parses_once(tmp_path, monkeypatch):
+    file = tmp_path / "statvar.dat"
+    file.write_text(STATVAR.replace("bad", "5.0"))
+    calls = []
+    read_csv = pd.read_csv
+
+    def counting_read_csv(*args, **kwds):
+        calls.append(kwds.get("usecols"))
+        return read_csv(*args, **kwds)
+
+    monkeypatch.setattr(pd, "read_csv", counting_read_csv)
+
+    # The rolled block is unrolled into a block for each variable, and all
+    # three blocks use one parse of the dates and one of the values.
+    results = tsblender.evaluate(ROLLED.format(file=file))
+
+    assert len(calls) == 2
+    assert results["series"]["A"].dropna().tolist() == [2.0, 3.0]
+    assert results["series"]["B"].dropna().tolist() == [20.0, 30.0]
+    assert results["series"]["C"].tolist() == [1.0, 2.0, 3.0, 4.0]
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from tsblender import tsblender
+
+
+def trapz_volume(series, start, end):
+    """Integrate the series from start to end one interval at a time."""
+    ends = pd.DatetimeIndex([start, end])
+    points = pd.concat(
+        [
+            pd.Series(np.interp(ends, series.index, series), ends),
+            series[(series.index > start) & (series.index < end)],
+        ]
+    ).sort_index()
+    return np.trapz(points, x=points.index.asi8 // 10**9)
+
+
+def test_volume_calculation(tmp_path):
+    index = pd.date_range("2000-01-01", periods=24 * 70, freq="h")
+    series = pd.Series(np.sin(np.arange(len(index)) / 10.0) + 2.0, index=index)
+    series = series.drop(index[[5, 6, 7, 500]])
+    date_file = tmp_path / "dates.dat"
+    date_file.write_text(
+        "01/01/2000 24:00:00 01/31/2000 23:59:59\n"
+        "1/5/2000 6 1/5/2000 6:30\n"
+        "12/31/1999 00:00 01/02/2000 12\n"
+    )
+
+    data = tsblender.Tables()
+    data._join("flow", series=series)
+    data.volume_calculation(
+        series_name="flow",
+        new_v_table_name="vol",
+        flow_time_units="days",
+        date_file=str(date_file),
+        factor=2,
+    )
+    volume = data._get_v_table("vol")
+    start = pd.to_datetime(
+        ["2000-01-02", "2000-01-05 06:00", "1999-12-31"], format="ISO8601"
+    )
+    end = pd.to_datetime(
+        ["2000-01-31 23:59:59", "2000-01-05 06:30", "2000-01-02 12:00"],
+        format="ISO8601",
+    )
+    assert volume.index.get_level_values("start").equals(start.rename("start"))
+    assert volume.index.get_level_values("end").equals(end.rename("end"))
+    expected = [2 * trapz_volume(series, *i) for i in zip(start, end)]
+    np.testing.assert_allclose(volume.to_numpy(), expected, rtol=1e-12)
+
+    data.volume_calculation(
+        series_name="flow",
+        new_v_table_name="monthly",
+        flow_time_units="days",
+        automatic_dates="month",
+    )
+    monthly = data._get_v_table("monthly")
+    expected = [trapz_volume(series, *i) for i in monthly.index]
+    np.testing.assert_allclose(monthly.to_numpy(), expected, rtol=1e-12)
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tsblender import tsblender
+
+VALUES = [
+    0.0,
+    -0.0,
+    1.0,
+    -123.456,
+    0.0000004,
+    0.0000005,
+    999999999.5,
+    1.0e100,
+    -1.0e-100,
+    float("nan"),
+    float("inf"),
+    float("-inf"),
+]
+
+
+def _expected(model, values, weights):
+    """Format the observation lines one at a time like the PEST control file."""
+    return "".join(
+        "\n" + f"{f'{model}{index + 1}':20} {val:15f} {weight:15f} {model:20}".rstrip()
+        for index, (val, weight) in enumerate(zip(values, weights))
+    )
+
+
+@pytest.mark.parametrize(
+    "model", ["flow", "a_rather_long_model_name", "a_model_name_of_twenty", "q%d"]
+)
+def test_observation_lines(monkeypatch, model):
+    monkeypatch.setattr(tsblender, "_WRITE_PEST_FILES_CHUNK", 7)
+    rng = np.random.default_rng(0)
+    values = np.array(
+        VALUES + (rng.standard_normal(100) * 10.0 ** rng.integers(-8, 8, 100)).tolist()
+    )
+    weights = np.abs(values[::-1])
+    lines = list(tsblender._observation_lines(model, values, weights))
+    assert len(lines) == -(-len(values) // 7)
+    assert "".join(lines) == _expected(model, values, weights)
+
+
+def test_write_pest_file_table():
+    index = pd.date_range("2000-01-01", periods=1000, freq="D")
+    series = pd.Series(np.sin(np.arange(len(index))) * 10.0, index=index)
+    series.iloc[[5, 50, 500]] = np.nan
+
+    data = tsblender.Tables()
+    data._join("OBS", series=series)
+    observation_data = data._write_pest_file_table(
+        "obs", "MOD", "1.0/(@_abs_value + 1.0)", data._get_series, "0.2 0.8"
+    )
+
+    weights = (1.0 / (series.abs() + 1.0)).clip(lower=0.2, upper=0.8)
+    assert len(observation_data) == 1
+    model, values, table_weights = observation_data[0]
+    assert model == "mod"
+    assert "".join(
+        tsblender._observation_lines(model, values, table_weights)
+    ) == _expected("mod", series.dropna(), weights.dropna())